@@ -0,0 +1,145 @@
+"""
+Microbenchmarks of the hot kernels on fixed synthetic inputs.
+
+Every benchmark is a function registered with @benchmark that prepares its inputs and returns the callable
+to time, so the setup is not measured. Benchmarks whose optional dependencies are missing raise ImportError
+from the setup and are reported as skipped by benchmarks/run.py.
+"""
+import os
+import random
+import tempfile
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+# simulation extends sys.path for the detector and FOV calculator modules, it has to be imported first
+from cam_control.simulation import CamSimulation
+from cam_control.player_detect import PlayerDetector
+from cam_control.player_sim import Grid, SoccerMatch, SoccerSimulation
+from cam_control.tsp_solver.neighbor import NeighborSolver
+from cam_simulation.diplomagm.main_without_app import FOVCalculator
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+N_PLAYERS = 22
+N_FRAMES = 1500
+
+
+def benchmark(name: str) -> Callable:
+    def decorator(setup: Callable) -> Callable:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def synthetic_tracks(n_frames: int = N_FRAMES, n_players: int = N_PLAYERS, seed: int = 0) -> pd.DataFrame:
+    """
+    Random walks of the players on a 100 x 100 field in the layout of soccer_sim.csv.
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.clip(rng.uniform(0, 100, (1, n_players, 2)) + rng.normal(0, 0.3, (n_frames, n_players, 2))
+                        .cumsum(axis=0), 0, 100)
+    frames = np.repeat(np.arange(n_frames), n_players)
+    return pd.DataFrame({
+        "Period": 1, "Frame": frames, "Time [s]": frames * 0.04,
+        "Team": np.tile(np.repeat(["Team A", "Team B"], n_players // 2), n_frames),
+        "Player": np.tile(np.arange(n_players), n_frames),
+        "X": positions[..., 0].ravel(), "Y": positions[..., 1].ravel(),
+        "Ball_x": np.repeat(positions[:, 0, 0], n_players), "Ball_y": np.repeat(positions[:, 0, 1], n_players),
+    })
+
+
+def synthetic_players(n_players: int = N_PLAYERS, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).uniform(0, 100, (n_players, 2))
+
+
+@benchmark("fov_calculator.get_points_of_fov")
+def fov_points():
+    fov_calculator = FOVCalculator()
+    camera_properties = {"yaw": 30.0, "pitch": 20.0, "zoom": 1.0}
+    return lambda: fov_calculator.get_points_of_fov(camera_properties)
+
+
+@benchmark("player_detector.which_players_inside_fov")
+def players_inside_fov():
+    detector = PlayerDetector()
+    fov_points = FOVCalculator().get_points_of_fov({"yaw": 30.0, "pitch": 20.0, "zoom": 1.0})[0]
+    players = synthetic_players()
+    return lambda: detector.which_players_inside_fov(players, fov_points)
+
+
+@benchmark("soccer_simulation.get_positions")
+def soccer_positions():
+    soccer_sim = SoccerSimulation(synthetic_tracks())
+    ticks = iter(range(1 << 62))
+    return lambda: soccer_sim.get_positions(next(ticks) % N_FRAMES)
+
+
+@benchmark("neighbor_solver.determine_next_position")
+def neighbor_next_position():
+    players = synthetic_players()
+    solver = NeighborSolver(n_observed_agents=len(players), eps=2)
+    return lambda: solver.determine_next_position((50.0, 50.0), players)
+
+
+def _static_tsp_inputs(n_players: int = 10):
+    from tsp.static_tsp import StaticTSPSolver
+
+    players = synthetic_players(n_players)
+    track = pd.DataFrame({"frame": 2, "id": np.arange(1, n_players + 1), "x": players[:, 0], "y": players[:, 1]})
+    return StaticTSPSolver(top_view_center=np.array([50.0, 50.0])), track
+
+
+@benchmark("static_tsp_solver._find_dist")
+def static_tsp_distances():
+    solver, track = _static_tsp_inputs(n_players=N_PLAYERS)
+    coordinates = solver._get_coord_list(track)
+    return lambda: solver._find_dist(coordinates)
+
+
+@benchmark("static_tsp_solver.solve")
+def static_tsp_solve():
+    solver, track = _static_tsp_inputs()
+    return lambda: solver.solve(track, frame_index=2)
+
+
+@benchmark("coordinate_transform.transform_coordinates")
+def transform_coordinates():
+    from coordinate_transform.transform import CoordinateTransform
+
+    rng = np.random.default_rng(0)
+    n_frames, n_boxes = 100, N_PLAYERS
+    x1, y1 = rng.uniform(0, 2100, n_frames * n_boxes), rng.uniform(150, 650, n_frames * n_boxes)
+    boxes = pd.DataFrame({
+        "frame": np.repeat(np.arange(1, n_frames + 1), n_boxes), "id": np.tile(np.arange(n_boxes), n_frames),
+        "x1": x1, "y1": y1, "x2": x1 + 20, "y2": y1 + 50,
+    })
+    transformer = CoordinateTransform(105, 68, [(60, 152), (47, 724), (1620, 125), (2139, 668)])
+    output = os.path.join(tempfile.mkdtemp(), "track_df_new_coords.csv")
+    return lambda: transformer.transform_coordinates(boxes.copy(), file_save_name=output)
+
+
+@benchmark("soccer_match.simulate")
+def soccer_match():
+    formations = pd.read_csv("simulation/formation442.csv", header=None, names=["area_x", "area_y", "x", "y"])
+    formation1 = list(formations.iloc[:11][["x", "y"]].itertuples(index=False, name=None))
+    formation2 = list(formations.iloc[11:][["x", "y"]].itertuples(index=False, name=None))
+
+    def simulate():
+        # the match draws from the global random generators
+        np.random.seed(0)
+        random.seed(0)
+        return SoccerMatch(Grid(100, 100), "Team A", formation1, "Team B", formation2).simulate()
+
+    return simulate
+
+
+@benchmark("cam_simulation.episode")
+def episode():
+    def simulate():
+        sim = CamSimulation(random_seed=0, plot=False, dataset="mock", max_ticks=300)
+        sim.log_angles = sim.log_players = False
+        return sim.simulate()
+
+    return simulate
@@ -0,0 +1,120 @@
+"""
+Runs the microbenchmarks of benchmarks/kernels.py and optionally compares them with a saved baseline.
+
+    python -m benchmarks.run                      # only reports the timings
+    python -m benchmarks.run --save               # stores the current timings as the baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json  # fails on a kernel slower than threshold x baseline
+    python -m benchmarks.run -k soccer --repeat 3
+
+Every kernel is called in loops of at least min_seconds, the best of repeat loops per call is reported, as
+timeit does, because it is the least disturbed by other processes. Baselines are machine specific, so they are
+not part of the repository: save one on the benchmark machine and compare with it there.
+"""
+import argparse
+import json
+import os
+import sys
+from time import perf_counter
+from typing import Callable, Dict
+
+from loguru import logger
+
+from benchmarks.kernels import BENCHMARKS
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def time_kernel(kernel: Callable, repeat: int = 5, min_seconds: float = 0.2) -> Dict:
+    """
+    Returns:
+        Dict: Best and median seconds per call over repeat loops and the number of calls per loop.
+    """
+    kernel()
+    number = 1
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            kernel()
+        if perf_counter() - start >= min_seconds or number >= 1 << 20:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            kernel()
+        timings.append((perf_counter() - start) / number)
+    timings.sort()
+    return {"best": timings[0], "median": timings[len(timings) // 2], "number": number}
+
+
+def run(pattern: str = None, repeat: int = 5, min_seconds: float = 0.2) -> Dict[str, Dict]:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        try:
+            kernel = setup()
+        except ImportError as error:
+            logger.warning("Skipping {}: {}", name, error)
+            continue
+        results[name] = time_kernel(kernel, repeat=repeat, min_seconds=min_seconds)
+        logger.info("{:<45} {:>12.1f} us", name, 1e6 * results[name]["best"])
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> bool:
+    """
+    Logs the ratio of every kernel to its baseline, returns False if a kernel is slower than threshold times it.
+    """
+    passed = True
+    for name, result in results.items():
+        if name not in baseline:
+            logger.info("{:<45} {:>12.1f} us  no baseline", name, 1e6 * result["best"])
+            continue
+        ratio = result["best"] / baseline[name]["best"]
+        regressed = ratio > threshold
+        passed &= not regressed
+        (logger.error if regressed else logger.info)(
+            "{:<45} {:>12.1f} us  {:>6.2f}x baseline{}", name, 1e6 * result["best"], ratio,
+            "  REGRESSION" if regressed else "")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the hot kernels")
+    parser.add_argument("-k", dest="pattern", help="only run the benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="minimum duration of a timing loop")
+    parser.add_argument("--threshold", type=float, default=1.5, help="slowdown ratio that counts as a regression")
+    parser.add_argument("--baseline", help="compare with the timings in this file, fail on a regression")
+    parser.add_argument("--save", action="store_true",
+                        help=f"store the timings in the --baseline file, {BASELINE_PATH} by default")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO", filter=lambda record: record["name"] == __name__)
+    results = run(args.pattern, repeat=args.repeat, min_seconds=args.min_seconds)
+
+    baseline_path = args.baseline or BASELINE_PATH
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+    if args.save:
+        with open(baseline_path, "w") as file:
+            json.dump({**baseline, **results}, file, indent=2, sort_keys=True)
+        logger.info("Baseline of {} benchmarks saved to {}", len(results), baseline_path)
+        return
+    if args.baseline is None:
+        return
+    if not baseline:
+        logger.error("No baseline in {}, save one with --save", args.baseline)
+        sys.exit(1)
+    if not compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
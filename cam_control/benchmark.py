@@ -0,0 +1,112 @@
+import argparse
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Dict, Iterable
+
+import pandas as pd
+from loguru import logger
+
+# simulation extends sys.path for the strategy and detector modules, it has to be imported first
+from cam_control.simulation import CamSimulation
+from cam_control.registry import DATASETS, SOLVERS, STRATEGIES
+
+STAGES = ("fov", "players", "detection", "solver", "strategy")
+
+
+def run_episode(strategy: str, solver: str, dataset: str, seed: int, visit_mode: str = "aim",
+                max_ticks: int = 1000, frame_stride: int = 50) -> Dict:
+    """
+    Runs one episode without plotting, seed picks the random seed and the starting frame.
+
+    Returns:
+        Dict: Combination, score in ticks, whether every player was visited, ticks per second of wall-clock time,
+        mean milliseconds per tick of every stage and staleness statistics.
+    """
+    sim = CamSimulation(random_seed=seed, start_from_frame=seed * frame_stride, plot=False, strategy=strategy,
+                        visit_mode=visit_mode, solver=solver, dataset=dataset, max_ticks=max_ticks)
+    sim.log_angles = sim.log_players = False
+
+    start = perf_counter()
+    ticks = sim.simulate()
+    seconds = perf_counter() - start
+    result = {"strategy": strategy, "solver": solver, "dataset": dataset, "seed": seed, "ticks": ticks,
+              "finished": sim.finished, "ticks_per_sec": ticks / seconds}
+    for stage in STAGES:
+        result[f"{stage}_ms"] = 1000 * sim.stage_seconds[stage] / max(ticks, 1)
+    staleness = sim.staleness_metric.summary()
+    result.update({key: staleness[key] for key in ("mean_coverage", "mean_staleness", "revisit_p90")})
+    return result
+
+
+def _run_episode(args) -> Dict:
+    return run_episode(*args)
+
+
+def _quiet_logger(level: str = "ERROR") -> None:
+    logger.remove()
+    logger.add(sys.stderr, level=level)
+
+
+def run_benchmark(strategies: Iterable[str], solvers: Iterable[str], datasets: Iterable[str], seeds: Iterable[int],
+                  visit_mode: str = "aim", max_ticks: int = 1000, frame_stride: int = 50,
+                  n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Runs every strategy x solver x dataset combination for every seed, in n_jobs processes.
+
+    Returns:
+        pd.DataFrame: One row per episode, see run_episode.
+    """
+    jobs = [(strategy, solver, dataset, seed, visit_mode, max_ticks, frame_stride)
+            for strategy, solver, dataset, seed in itertools.product(strategies, solvers, datasets, seeds)]
+    logger.info(f"Running {len(jobs)} episodes in {n_jobs} processes")
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_quiet_logger) as executor:
+            results = list(executor.map(_run_episode, jobs))
+    else:
+        results = [_run_episode(job) for job in jobs]
+    return pd.DataFrame(results)
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per combination: score distribution in ticks, share of finished episodes, ticks per second and
+    stage latencies, sorted by the mean score.
+    """
+    grouped = results.groupby(["strategy", "solver", "dataset"])
+    summary = grouped["ticks"].describe()[["count", "mean", "std", "min", "50%", "max"]]
+    summary["finished"] = grouped["finished"].mean()
+    summary["ticks_per_sec"] = grouped["ticks_per_sec"].mean()
+    for column in ("mean_coverage", "mean_staleness", "revisit_p90"):
+        summary[column] = grouped[column].mean()
+    for stage in STAGES:
+        summary[f"{stage}_ms"] = grouped[f"{stage}_ms"].mean()
+    return summary.sort_values("mean")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark registered strategies, solvers and datasets")
+    parser.add_argument("--strategies", nargs="+", default=sorted(STRATEGIES), choices=sorted(STRATEGIES))
+    parser.add_argument("--solvers", nargs="+", default=sorted(SOLVERS), choices=sorted(SOLVERS))
+    parser.add_argument("--datasets", nargs="+", default=["soccer_sim"], choices=sorted(DATASETS))
+    parser.add_argument("--seeds", type=int, default=10, help="number of seeds per combination")
+    parser.add_argument("--visit-mode", default="aim", choices=["aim", "fov"])
+    parser.add_argument("--max-ticks", type=int, default=1000)
+    parser.add_argument("--frame-stride", type=int, default=50, help="starting frame step between seeds")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--output", help="CSV file for the per-episode results")
+    args = parser.parse_args()
+
+    _quiet_logger("INFO")
+    results = run_benchmark(args.strategies, args.solvers, args.datasets, range(args.seeds),
+                            visit_mode=args.visit_mode, max_ticks=args.max_ticks, frame_stride=args.frame_stride,
+                            n_jobs=args.jobs)
+    if args.output:
+        results.to_csv(args.output, index=False)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.2f}".format):
+        logger.success(f"Benchmark results:\n{summarize(results)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,19 @@ def calc_fov_middle(fov_corners: np.array) -> Tuple[float, float]:
     return middle_of_fov_point.x, middle_of_fov_point.y
 
 
+def calc_fov_middles(fov_corners: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calc_fov_middle: centroids of FOV tetragons of shape (..., 4, 2+), returns shape (..., 2).
+    """
+    x, y = fov_corners[..., 0], fov_corners[..., 1]
+    x_next, y_next = np.roll(x, -1, axis=-1), np.roll(y, -1, axis=-1)
+    cross = x * y_next - x_next * y
+    area = cross.sum(axis=-1) / 2
+    middle_x = ((x + x_next) * cross).sum(axis=-1) / (6 * area)
+    middle_y = ((y + y_next) * cross).sum(axis=-1) / (6 * area)
+    return np.stack([middle_x, middle_y], axis=-1)
+
+
 def calc_princ_axis_intersection(fov_corners: np.array) -> Tuple[float, float]:
     furthest_corners = [1, 2]
     corner1, corner2 = np.array(fov_corners)[furthest_corners]
@@ -42,6 +42,12 @@ class FOVCalculator:
         self.path_to_camera = self.path_to_folders + 'lists of panoramic systems/hse_1_camera.json'
         self.panoramic_systems = self._init_panoramic_system()
         self.zoom_coef = 1
+        self.base_focal_length = self.get_focal_length()
+        # footprints of given poses are calculated by the vectorized kernel, it gives the corners of
+        # calculatePanoramicSystemFOV in half of its time and leaves the panoramic system at the rig pose
+        from cam_control.fov_batch import BatchFOVCalculator
+        self.batch_fov = BatchFOVCalculator.from_fov_calculator(self)
+        self.cam_pos = np.asarray(self.get_cam_pos(), dtype=float)
 
     def _init_panoramic_system(self, yaw=None, pitch=None) -> List[PanoramicSystem]:
         field, list_of_panoramic_systems = initModel(self.path_to_field,self.path_to_camera)
@@ -61,12 +67,9 @@ class FOVCalculator:
         if camera_properties is not None:
             yaw = camera_properties.get('yaw')
             pitch = camera_properties.get('pitch')
+            # zoom is relative to the focal length from the rig file, zooming in narrows the FOV
             zoom_coef = camera_properties.get('zoom', 1)
-            panoramic_system.changeProperties(id=0, pitch=pitch, yaw=yaw, roll=1e-5)
-            cam = panoramic_system.getListOfCameras()[0]
-            focal_length = cam.getLensFocalLength()
-
-            cam.setLensFocalLength(focal_length / zoom_coef)
+            return self.batch_fov.get_points_of_fov(self.cam_pos, yaw, pitch, zoom_coef)[None]
 
         return np.array(panoramic_system.calculatePanoramicSystemFOV())
 
@@ -0,0 +1,133 @@
+import numpy as np
+
+# Layout of the last axis of a camera state array
+STATE_SIZE = 6
+YAW, PITCH, ZOOM, YAW_RATE, PITCH_RATE, SETTLE = range(STATE_SIZE)
+
+
+class CameraDynamics:
+    """
+    Pan-tilt-zoom head dynamics.
+
+    Pan and tilt are driven by a motor with limited angular velocity and acceleration: the head accelerates
+    towards the commanded angle and brakes in time to stop on it. Zoom moves with a limited speed. After every
+    slew faster than max_tracking_speed the image needs settle_time to stabilize before it can be used for
+    detection, slow moves such as following a running player keep the image usable.
+
+    The state is an array of shape (..., STATE_SIZE) indexed with the YAW, PITCH, ZOOM, YAW_RATE, PITCH_RATE
+    and SETTLE constants (angles in degrees, rates in degrees per second, settle in remaining seconds), so that
+    any number of cameras or candidate command sequences are integrated at once.
+
+    Args:
+        max_angular_speed (float): Maximum pan and tilt speed in degrees per second.
+        max_angular_acceleration (float): Maximum pan and tilt acceleration in degrees per second squared.
+        max_zoom_speed (float): Maximum zoom change per second.
+        settle_time (float): Time in seconds the image needs to stabilize after a slew.
+        max_tracking_speed (float): Fastest pan and tilt speed in degrees per second that keeps the image usable.
+        dt (float): Duration of one simulation tick in seconds.
+        zoom_range (Tuple[float, float]): Minimum and maximum zoom.
+    """
+
+    def __init__(self, max_angular_speed: float = 60.0, max_angular_acceleration: float = 120.0,
+                 max_zoom_speed: float = 2.0, settle_time: float = 0.2, max_tracking_speed: float = 15.0,
+                 dt: float = 1 / 25, zoom_range=(1.0, 30.0)):
+        self.max_angular_speed = max_angular_speed
+        self.max_angular_acceleration = max_angular_acceleration
+        self.max_zoom_speed = max_zoom_speed
+        self.settle_time = settle_time
+        self.max_tracking_speed = max_tracking_speed
+        self.dt = dt
+        self.zoom_range = zoom_range
+
+    def initial_state(self, yaw, pitch, zoom=1.0) -> np.ndarray:
+        """
+        Camera at rest and settled at the given pose, arguments are scalars or broadcastable arrays.
+        """
+        yaw, pitch, zoom = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (yaw, pitch, zoom)))
+        state = np.zeros(yaw.shape + (STATE_SIZE,))
+        state[..., YAW] = yaw % 360.0
+        state[..., PITCH] = pitch
+        state[..., ZOOM] = zoom
+        return state
+
+    def step(self, state: np.ndarray, command: np.ndarray) -> np.ndarray:
+        """
+        Integrates one tick.
+
+        Args:
+            state (np.ndarray): Camera state of shape (..., STATE_SIZE).
+            command (np.ndarray): Commanded absolute (yaw, pitch, zoom) of shape (..., 3), broadcastable with state.
+
+        Returns:
+            np.ndarray: New state, the input state is not modified.
+        """
+        state = np.asarray(state, dtype=float)
+        command = np.asarray(command, dtype=float)
+        shape = np.broadcast_shapes(state.shape[:-1], command.shape[:-1])
+        new_state = np.array(np.broadcast_to(state, shape + (STATE_SIZE,)))
+
+        angles = new_state[..., [YAW, PITCH]]
+        rates = new_state[..., [YAW_RATE, PITCH_RATE]]
+        error = command[..., :2] - angles
+        error[..., 0] = (error[..., 0] + 180.0) % 360.0 - 180.0
+
+        # fastest speed that still allows to brake on the commanded angle
+        acceleration_step = self.max_angular_acceleration * self.dt
+        desired_rates = np.sign(error) * np.minimum(
+            self.max_angular_speed, np.sqrt(2 * self.max_angular_acceleration * np.abs(error)))
+        new_rates = rates + np.clip(desired_rates - rates, -acceleration_step, acceleration_step)
+        travel = (rates + new_rates) / 2 * self.dt
+
+        # the head stops on the commanded angle instead of overshooting it in a discrete step
+        arrived = (np.abs(travel) >= np.abs(error)) & (travel * error >= 0)
+        angles = np.where(arrived, angles + error, angles + travel)
+        new_rates = np.where(arrived, 0.0, new_rates)
+
+        zoom = new_state[..., ZOOM]
+        zoom_step = self.max_zoom_speed * self.dt
+        new_zoom = np.clip(zoom + np.clip(command[..., 2] - zoom, -zoom_step, zoom_step), *self.zoom_range)
+
+        slewing = np.any(np.abs(new_rates) > self.max_tracking_speed, axis=-1) \
+            | (np.abs(new_zoom - zoom) >= zoom_step)
+        new_state[..., YAW] = angles[..., 0] % 360.0
+        new_state[..., PITCH] = angles[..., 1]
+        new_state[..., ZOOM] = new_zoom
+        new_state[..., YAW_RATE] = new_rates[..., 0]
+        new_state[..., PITCH_RATE] = new_rates[..., 1]
+        new_state[..., SETTLE] = np.where(slewing, self.settle_time,
+                                          np.maximum(new_state[..., SETTLE] - self.dt, 0.0))
+        return new_state
+
+    def rollout(self, state: np.ndarray, commands: np.ndarray) -> np.ndarray:
+        """
+        Integrates command sequences, e.g. a batch of candidate sequences from one state.
+
+        Args:
+            state (np.ndarray): Initial state of shape (..., STATE_SIZE).
+            commands (np.ndarray): Commanded (yaw, pitch, zoom) of shape (..., T, 3), broadcastable with state.
+
+        Returns:
+            np.ndarray: States after every tick of shape (..., T, STATE_SIZE).
+        """
+        commands = np.asarray(commands, dtype=float)
+        states = []
+        for tick in range(commands.shape[-2]):
+            state = self.step(state, commands[..., tick, :])
+            states.append(state)
+        return np.stack(states, axis=-2)
+
+    @staticmethod
+    def pose(state: np.ndarray) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (yaw, pitch, zoom) of shape (..., 3).
+        """
+        return state[..., [YAW, PITCH, ZOOM]]
+
+    @staticmethod
+    def settled(state: np.ndarray) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: True where the image is stable, shape (...).
+        """
+        return state[..., SETTLE] <= 0
@@ -0,0 +1,248 @@
+import sys
+import threading
+from collections import defaultdict
+from time import perf_counter
+from typing import Dict, Tuple
+
+import numpy as np
+from loguru import logger
+
+from cam_control.camera_dynamics import CameraDynamics
+from cam_control.data_type import Point2D
+from cam_control.player_detect import PlayerDetector
+from cam_control.player_sim import framerate
+
+# shares of the tick period every stage of the cycle may take
+DEFAULT_BUDGET_SHARES = {"pose": 0.05, "tracker": 0.25, "detection": 0.1, "plan": 0.5}
+
+
+class SimulatedPTZCamera:
+    """
+    Stand-in pan-tilt-zoom head. Every command is one tick of the device: without dynamics the head jumps to the
+    commanded pose, with CameraDynamics it moves towards it with limited speed and the image is unusable until
+    it settles.
+    """
+
+    def __init__(self, yaw: float, pitch: float, zoom: float = 1.0, camera_dynamics: CameraDynamics = None):
+        self.camera_dynamics = camera_dynamics
+        self._lock = threading.Lock()
+        if camera_dynamics is not None:
+            self._state = camera_dynamics.initial_state(yaw, pitch, zoom)
+        self._pose = (yaw, pitch, zoom)
+
+    def command(self, yaw: float, pitch: float, zoom: float) -> None:
+        with self._lock:
+            if self.camera_dynamics is None:
+                self._pose = (yaw, pitch, zoom)
+                return
+            self._state = self.camera_dynamics.step(self._state, (yaw, pitch, zoom))
+            self._pose = tuple(float(value) for value in self.camera_dynamics.pose(self._state))
+
+    def pose(self) -> Tuple[float, float, float]:
+        with self._lock:
+            return self._pose
+
+    def settled(self) -> bool:
+        with self._lock:
+            return self.camera_dynamics is None or bool(self.camera_dynamics.settled(self._state))
+
+
+class ReplayTracker:
+    """
+    Stand-in tracker feed replaying the frames of a dataset, one frame per controller tick. Ticks missed by the
+    controller are skipped in the feed as well, and the last frame is repeated at the end of the dataset.
+    """
+
+    def __init__(self, player_sim, start_frame: int = 0):
+        self.player_sim = player_sim
+        self.start_frame = start_frame
+        self.n_agents = player_sim.n_agents
+
+    def read(self, tick: int) -> np.ndarray:
+        return self.player_sim.get_positions(self._frame(tick), True)
+
+    def read_ball(self, tick: int) -> np.ndarray:
+        return self.player_sim.get_ball_position(self._frame(tick))
+
+    def _frame(self, tick: int) -> int:
+        frame = self.start_frame + tick
+        if self.player_sim.n_frames is not None:
+            frame = min(frame, self.player_sim.n_frames - 1)
+        return frame
+
+
+class CameraController:
+    """
+    Drives a PTZ camera from a tracker feed on a fixed clock.
+
+    Every tick reads the camera pose and the tracked players, detects the players inside the FOV, lets the
+    solver and the strategy plan and commands the new pose. Ticks are scheduled on absolute deadlines of
+    1 / framerate seconds. Every stage has a time budget: an overrun is counted, and when there is not enough
+    time left for planning the planning is skipped and the last commanded pose is sent again. A tick that ends
+    after its deadline is a deadline miss, the controller then skips the slots it has overrun instead of
+    running late ticks back to back.
+
+    Args:
+        camera: PTZ camera with command(yaw, pitch, zoom), pose() and settled(), see SimulatedPTZCamera.
+        tracker: Player feed with read(tick), read_ball(tick) and n_agents, see ReplayTracker.
+        solver: Solver that picks the next target, e.g. NeighborSolver.
+        strategy (CameraMovementStrategy): Strategy that moves the camera to the target.
+        fov_calculator (FOVCalculator): Calculator of the FOV corners.
+        framerate (float): Ticks per second.
+        budget_shares (Dict[str, float]): Shares of the tick period of the "pose", "tracker", "detection" and
+            "plan" stages.
+
+    Attributes:
+        tick (int): Index of the next tick slot, skipped slots included.
+        deadline_misses (int): Ticks that ended after their deadline.
+        skipped_ticks (int): Slots skipped after deadline misses.
+        skipped_plans (int): Ticks that reused the last pose instead of planning.
+        stage_overruns (Dict[str, int]): Ticks on which a stage exceeded its budget.
+        max_cycle_seconds (float): Longest tick.
+    """
+
+    def __init__(self, camera, tracker, solver, strategy, fov_calculator, framerate: float = framerate,
+                 budget_shares: Dict[str, float] = None):
+        self.camera = camera
+        self.tracker = tracker
+        self.solver = solver
+        self.strategy = strategy
+        self.fov_calculator = fov_calculator
+        self.player_detector = PlayerDetector()
+
+        self.period = 1.0 / framerate
+        self.budgets = {stage: share * self.period
+                        for stage, share in {**DEFAULT_BUDGET_SHARES, **(budget_shares or {})}.items()}
+
+        self.target = None
+        self.last_command = camera.pose()
+        self.tick = 0
+        self.deadline_misses = 0
+        self.skipped_ticks = 0
+        self.skipped_plans = 0
+        self.stage_overruns = defaultdict(int)
+        self.max_cycle_seconds = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_simulation(cls, sim, **kwargs) -> "CameraController":
+        """
+        Controller of a stand-in camera and tracker built from the rig, dataset, solver and strategy of a
+        CamSimulation, starting from its current frame.
+        """
+        yaw, pitch = sim.fov_calculator.get_rotation_coords()
+        camera = SimulatedPTZCamera(yaw, pitch, camera_dynamics=sim.camera_dynamics)
+        tracker = ReplayTracker(sim.player_sim, start_frame=sim.time)
+        return cls(camera, tracker, sim.solver, sim.strategy, sim.fov_calculator, **kwargs)
+
+    def move(self, target: Point2D = None) -> None:
+        """
+        Aims the camera at a fixed target instead of the solver target, None gives the control back to the solver.
+        """
+        self.target = None if target is None else np.asarray(target, dtype=float)
+
+    def step(self) -> bool:
+        """
+        Runs one tick without waiting for its slot.
+
+        Returns:
+            bool: False if the planning was skipped and the last pose was reused.
+        """
+        cycle_start = perf_counter()
+        yaw, pitch, zoom = self.camera.pose()
+        camera_properties = {"yaw": yaw % 360.0, "pitch": pitch % 360.0, "zoom": zoom}
+        fov_points = self.fov_calculator.get_points_of_fov(camera_properties)[0]
+        stage_start = self._check_budget("pose", cycle_start)
+
+        positions = self.tracker.read(self.tick)
+        stage_start = self._check_budget("tracker", stage_start)
+
+        hidden = None if self.camera.settled() else np.ones(len(positions), dtype=bool)
+        players_inside_fov = self.player_detector.which_players_inside_fov(positions, fov_points, hidden=hidden)
+        inside_fov = None
+        if self.solver.visit_mode == "fov":
+            inside_fov = np.zeros(len(positions), dtype=bool)
+            inside_fov[players_inside_fov] = True
+        stage_start = self._check_budget("detection", stage_start)
+
+        planned = stage_start - cycle_start + self.budgets["plan"] <= self.period
+        if planned:
+            self.strategy.observe(positions, self.solver.visited_agents, zoom=zoom)
+            target = self.solver.determine_next_position(self.strategy.intermediate_target_pos, positions,
+                                                         hidden=hidden, inside_fov=inside_fov,
+                                                         ball=self.tracker.read_ball(self.tick))
+            if self.target is not None:
+                target = self.target
+            delta_yaw, delta_pitch = self.strategy.move(fov_points, yaw, pitch, to=target)
+            if self.strategy.zoom_command is not None:
+                zoom = self.strategy.zoom_command
+            self.last_command = (yaw + delta_yaw, pitch + delta_pitch, zoom)
+            self._check_budget("plan", stage_start)
+        else:
+            self.skipped_plans += 1
+            logger.debug("Tick {}: no time left to plan, holding pose {}", self.tick, self.last_command)
+        self.camera.command(*self.last_command)
+
+        self.max_cycle_seconds = max(self.max_cycle_seconds, perf_counter() - cycle_start)
+        self.tick += 1
+        return planned
+
+    def run(self, n_ticks: int = None) -> None:
+        """
+        Runs ticks on their slots until stop() is called or n_ticks slots have passed.
+        """
+        next_deadline = perf_counter() + self.period
+        while not self._stop_event.is_set() and (n_ticks is None or self.tick < n_ticks):
+            self.step()
+            now = perf_counter()
+            if now > next_deadline:
+                # the next tick starts right away in the slot that is running now
+                self.deadline_misses += 1
+                missed_slots = int((now - next_deadline) / self.period)
+                logger.debug("Deadline missed by {:.1f} ms, skipping {} ticks",
+                             1000 * (now - next_deadline), missed_slots)
+                self.skipped_ticks += missed_slots
+                self.tick += missed_slots
+                next_deadline += missed_slots * self.period
+            self._stop_event.wait(max(next_deadline - perf_counter(), 0.0))
+            next_deadline += self.period
+
+    def start(self, n_ticks: int = None) -> None:
+        """
+        Runs the controller on a dedicated thread.
+        """
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, args=(n_ticks,), name="camera-controller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def join(self, timeout: float = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict:
+        return {"ticks": self.tick, "deadline_misses": self.deadline_misses, "skipped_ticks": self.skipped_ticks,
+                "skipped_plans": self.skipped_plans, "stage_overruns": dict(self.stage_overruns),
+                "max_cycle_ms": 1000 * self.max_cycle_seconds}
+
+    def _check_budget(self, stage: str, stage_start: float) -> float:
+        now = perf_counter()
+        if now - stage_start > self.budgets[stage]:
+            self.stage_overruns[stage] += 1
+        return now
+
+
+if __name__ == '__main__':
+    from cam_control.simulation import CamSimulation
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+    controller = CameraController.from_simulation(CamSimulation(plot=False))
+    controller.start(n_ticks=10 * framerate)
+    controller.join()
+    logger.success(f"Controller stats: {controller.stats()}, "
+                   f"unvisited players: {controller.solver.get_number_of_unvisited_agents()}")
@@ -0,0 +1,92 @@
+"""
+Compact binary log of a CamSimulation episode, written without any plotting in the loop.
+
+The file starts with a magic line and a JSON header (number of players, record layout and the static scene:
+field, camera position, aim radius, framerate), followed by one fixed size float32 record per tick with the
+pose, FOV corners, player positions, visited mask, aim point (center of the FOV) and target point. Records are
+buffered and appended in chunks, and read back as a memory map, see cam_control.render for the video renderer.
+"""
+import json
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+MAGIC = b"CAMLOG1\n"
+HEADER_LENGTH = np.dtype("<u4")
+
+
+def record_dtype(n_players: int) -> np.dtype:
+    return np.dtype([
+        ("tick", "<i4"), ("frame", "<i4"), ("pose", "<f4", 3), ("fov", "<f4", (4, 2)),
+        ("positions", "<f4", (n_players, 2)), ("visited", "?", n_players), ("aim", "<f4", 2), ("target", "<f4", 2),
+    ])
+
+
+class EpisodeLogWriter:
+    """
+    Appends per-tick records to an episode log.
+
+    Args:
+        path (str): Log file, overwritten.
+        n_players (int): Number of players of the dataset.
+        scene (Dict): Static scene of the episode, stored in the header.
+        chunk_ticks (int): Number of records buffered before they are written.
+    """
+
+    def __init__(self, path: str, n_players: int, scene: Dict, chunk_ticks: int = 1024):
+        self.path = path
+        self.dtype = record_dtype(n_players)
+        self.buffer = np.zeros(chunk_ticks, dtype=self.dtype)
+        self.count = 0
+        self.n_records = 0
+        header = json.dumps({"n_players": n_players, "scene": scene}).encode()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.file.write(np.array(len(header), dtype=HEADER_LENGTH).tobytes())
+        self.file.write(header)
+
+    def write(self, tick: int, frame: int, pose: Tuple[float, float, float], fov: np.ndarray, positions: np.ndarray,
+              visited: np.ndarray, aim: Tuple[float, float], target: Tuple[float, float]) -> None:
+        record = self.buffer[self.count]
+        record["tick"] = tick
+        record["frame"] = frame
+        record["pose"] = pose
+        record["fov"] = np.asarray(fov)[:, :2]
+        record["positions"] = np.asarray(positions)[:, :2]
+        record["visited"] = np.asarray(visited) > 0
+        record["aim"] = np.asarray(aim, dtype=float)[:2]
+        record["target"] = np.asarray(target, dtype=float)[:2]
+        self.count += 1
+        if self.count == len(self.buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        self.file.write(self.buffer[:self.count].tobytes())
+        self.n_records += self.count
+        self.count = 0
+        self.file.flush()
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+
+def read_episode_log(path: str) -> Tuple[Dict, np.ndarray]:
+    """
+    Returns:
+        Tuple[Dict, np.ndarray]: Header and the records as a read-only memory map.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an episode log")
+        header_length = int(np.frombuffer(file.read(HEADER_LENGTH.itemsize), dtype=HEADER_LENGTH)[0])
+        header = json.loads(file.read(header_length))
+    offset = len(MAGIC) + HEADER_LENGTH.itemsize + header_length
+    dtype = record_dtype(header["n_players"])
+    if os.path.getsize(path) == offset:
+        return header, np.zeros(0, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode="r", offset=offset)
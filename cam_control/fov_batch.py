@@ -0,0 +1,166 @@
+from typing import Tuple
+
+import numpy as np
+
+from cam_control.data_type import Point3D
+
+# Value that PanoramicSystem.calculatePanoramicSystemFOV uses for rays that never hit the ground
+EARTH_CIRCUMFERENCE = 40000000
+# FOVCalculator.get_points_of_fov always applies this roll, keep it to get identical corners
+DEFAULT_ROLL = 1e-5
+
+
+def batch_rotation_matrix(pitch, yaw, roll=0.0) -> np.ndarray:
+    """
+    Vectorized version of rotation_matrix.getRotationMatrix: Rz(yaw) @ Ry(pitch) @ Rx(roll).
+
+    Args:
+        pitch: Pitch angles in degrees, any shape.
+        yaw: Yaw angles in degrees, broadcastable with pitch.
+        roll: Roll angles in degrees, broadcastable with pitch.
+
+    Returns:
+        np.ndarray: Rotation matrices of shape (..., 3, 3).
+    """
+    pitch, yaw, roll = np.broadcast_arrays(*(np.radians(np.asarray(angle, dtype=float))
+                                             for angle in (pitch, yaw, roll)))
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    cr, sr = np.cos(roll), np.sin(roll)
+
+    rotation = np.empty(pitch.shape + (3, 3))
+    rotation[..., 0, 0] = cy * cp
+    rotation[..., 0, 1] = cy * sp * sr - sy * cr
+    rotation[..., 0, 2] = cy * sp * cr + sy * sr
+    rotation[..., 1, 0] = sy * cp
+    rotation[..., 1, 1] = sy * sp * sr + cy * cr
+    rotation[..., 1, 2] = sy * sp * cr - cy * sr
+    rotation[..., 2, 0] = -sp
+    rotation[..., 2, 1] = cp * sr
+    rotation[..., 2, 2] = cp * cr
+    return rotation
+
+
+def aim_angles(cam_pos: np.ndarray, targets: np.ndarray, target_height: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Yaw and pitch that point the optical axis of a camera at given targets.
+
+    Args:
+        cam_pos (np.ndarray): Camera positions of shape (..., 3).
+        targets (np.ndarray): Ground positions of shape (..., 2), broadcastable with cam_pos[..., :2].
+        target_height (float): Height of the aimed point above the ground.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Yaw in [0, 360) and pitch (positive looks down), both in degrees.
+    """
+    cam_pos = np.asarray(cam_pos, dtype=float)
+    targets = np.asarray(targets, dtype=float)
+    dx = targets[..., 0] - cam_pos[..., 0]
+    dy = targets[..., 1] - cam_pos[..., 1]
+    yaw = np.degrees(np.arctan2(dy, dx)) % 360.0
+    pitch = np.degrees(np.arctan2(cam_pos[..., 2] - target_height, np.hypot(dx, dy)))
+    return yaw, pitch
+
+
+class BatchFOVCalculator:
+    """
+    Vectorized ray-plane intersection of the camera FOV pyramid with the ground, for many poses at once.
+
+    Reproduces PanoramicSystem.calculatePanoramicSystemFOV for a panoramic system with a single camera,
+    but for arrays of positions, angles and focal lengths, so that thousands of candidate poses can be
+    evaluated in one call. Corners are returned in the same order: a, b, c, d where b and c are the
+    furthest ones.
+
+    Args:
+        sensor_width (float): Width of the image sensor in mm.
+        sensor_height (float): Height of the image sensor in mm.
+        focal_length (float): Focal length of the lens in mm at zoom 1.
+        cam_offset (Point3D): Position of the camera inside the panoramic system in mm.
+        cam_rotation (np.ndarray): Rotation matrix of the camera inside the panoramic system.
+    """
+
+    def __init__(self, sensor_width: float, sensor_height: float, focal_length: float,
+                 cam_offset: Point3D = (0.0, 0.0, 0.0), cam_rotation: np.ndarray = None):
+        self.sensor_width = sensor_width
+        self.sensor_height = sensor_height
+        self.focal_length = focal_length
+        self.cam_offset = np.asarray(cam_offset, dtype=float) / 1000.0
+        self.cam_rotation = np.eye(3) if cam_rotation is None else np.asarray(cam_rotation, dtype=float)
+        # Sign pattern of the corner rays a, b, c, d in the camera frame
+        self._corner_signs = np.array([[1.0, -1.0], [1.0, 1.0], [-1.0, 1.0], [-1.0, -1.0]])
+
+    @classmethod
+    def from_fov_calculator(cls, fov_calculator) -> "BatchFOVCalculator":
+        """
+        Build a batch calculator with the camera of the rig loaded by FOVCalculator.
+        """
+        camera = fov_calculator.panoramic_systems[0].getListOfCameras()[0]
+        image_sensor = fov_calculator.get_image_sensor()
+        return cls(sensor_width=image_sensor["width"], sensor_height=image_sensor["height"],
+                   focal_length=fov_calculator.get_focal_length(), cam_offset=camera.getCoordinates(),
+                   cam_rotation=camera.getRotationMatrix())
+
+    def get_angles_of_view(self, zoom=1.0, focal_length=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Horizontal and vertical angles of view in degrees.
+        """
+        focal_length = self._effective_focal_length(zoom, focal_length)
+        return (np.degrees(2 * np.arctan(self.sensor_width / 2 / focal_length)),
+                np.degrees(2 * np.arctan(self.sensor_height / 2 / focal_length)))
+
+    def get_corner_rays(self, yaw, pitch, zoom=1.0, focal_length=None, roll=DEFAULT_ROLL) -> np.ndarray:
+        """
+        Directions of the four corner rays in world coordinates.
+
+        Returns:
+            np.ndarray: Array of shape (..., 4, 3), not normalized (x component is 1 in the camera frame).
+        """
+        return self._corner_rays(self._effective_focal_length(zoom, focal_length),
+                                 batch_rotation_matrix(pitch, yaw, roll))
+
+    def get_points_of_fov(self, cam_pos: np.ndarray, yaw, pitch, zoom=1.0, focal_length=None,
+                          roll=DEFAULT_ROLL) -> np.ndarray:
+        """
+        Calculates FOV corners on the ground for a batch of poses.
+
+        Args:
+            cam_pos (np.ndarray): Panoramic system positions in meters, shape (..., 3) or (3,).
+            yaw: Yaw angles in degrees.
+            pitch: Pitch angles in degrees.
+            zoom: Zoom coefficients, effective focal length is focal_length * zoom.
+            focal_length: Focal lengths in mm, defaults to the one the calculator was built with.
+            roll: Roll angles in degrees.
+
+        Returns:
+            np.ndarray: FOV corners of shape (..., 4, 3), where ... is the broadcast shape of the inputs.
+        """
+        cam_pos = np.asarray(cam_pos, dtype=float)
+        system_rotation = batch_rotation_matrix(pitch, yaw, roll)
+        origin = cam_pos + system_rotation @ self.cam_offset
+        rays = self._corner_rays(self._effective_focal_length(zoom, focal_length), system_rotation)
+        return self._intersect_ground(origin, rays)
+
+    def _corner_rays(self, focal_length: np.ndarray, system_rotation: np.ndarray) -> np.ndarray:
+        half_width = self.sensor_width / 2 / focal_length
+        half_height = self.sensor_height / 2 / focal_length
+        half_width, half_height = np.broadcast_arrays(half_width, half_height)
+
+        rays = np.empty(half_width.shape + (4, 3))
+        rays[..., 0] = 1.0
+        rays[..., 1] = self._corner_signs[:, 0] * half_width[..., None]
+        rays[..., 2] = self._corner_signs[:, 1] * half_height[..., None]
+
+        rotation = system_rotation @ self.cam_rotation
+        return rays @ np.swapaxes(rotation, -1, -2)
+
+    def _intersect_ground(self, origin: np.ndarray, rays: np.ndarray) -> np.ndarray:
+        origin = np.asarray(origin)[..., None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance = -origin[..., 2] / rays[..., 2]
+        distance = np.where(distance < 0, EARTH_CIRCUMFERENCE, distance)
+        return origin + distance[..., None] * rays
+
+    def _effective_focal_length(self, zoom, focal_length):
+        focal_length = self.focal_length if focal_length is None else focal_length
+        return np.asarray(focal_length, dtype=float) * np.asarray(zoom, dtype=float)
@@ -0,0 +1,163 @@
+"""
+Golden episodes: reference runs of CamSimulation that optimized code paths have to reproduce.
+
+An episode is recorded tick by tick through the recorder hook of CamSimulation (frame, pose, FOV corners,
+solver target and visited mask) together with the final score, and stored as .npz with the configuration it
+was run with. Replaying runs the same configuration with a backend, a set of CamSimulation keyword arguments
+that switch fast paths on, and reports the first tick on which a field differs by more than its tolerance.
+
+    python -m cam_control.golden record             # on the reference code
+    python -m cam_control.golden replay reference   # after changing the code
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+from loguru import logger
+
+from cam_control.simulation import CamSimulation
+
+GOLDEN_DIR = "cam_control/cache/golden"
+# absolute tolerance of every recorded field, the score has to match exactly
+TOLERANCES = {"frame": 0, "pose": 1e-6, "fov": 1e-6, "target": 1e-6, "visited": 0, "score": 0}
+# CamSimulation keyword arguments of the alternative code paths
+BACKENDS = {
+    "reference": {},
+}
+EPISODES = [
+    {"random_seed": seed, "start_from_frame": 100 * seed, "strategy": strategy, "visit_mode": visit_mode,
+     "solver": solver, "dataset": "soccer_sim", "max_ticks": 1000}
+    for seed in range(2)
+    for strategy, visit_mode, solver in [("follower", "aim", "neighbor"), ("follower", "fov", "neighbor"),
+                                         ("follower", "fov", "set_cover"), ("mpc", "fov", "neighbor")]
+]
+
+
+class EpisodeRecorder:
+    """
+    Collects the per-tick decisions of a CamSimulation, set as its recorder.
+    """
+
+    def __init__(self):
+        self.ticks: Dict[str, List] = {field: [] for field in ("frame", "pose", "fov", "target", "visited")}
+        self.score = None
+
+    def record(self, frame: int, pose: Tuple[float, float, float], fov: np.ndarray, target: np.ndarray,
+               visited: np.ndarray) -> None:
+        self.ticks["frame"].append(frame)
+        self.ticks["pose"].append(pose)
+        self.ticks["fov"].append(np.asarray(fov)[:, :2])
+        self.ticks["target"].append(np.asarray(target, dtype=float)[:2])
+        self.ticks["visited"].append(np.asarray(visited) > 0)
+
+    def finish(self, score: int) -> None:
+        self.score = score
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {field: np.array(values) for field, values in self.ticks.items()}
+        arrays["score"] = np.array(self.score)
+        return arrays
+
+
+def run_episode(config: Dict, backend: Dict = None) -> Dict[str, np.ndarray]:
+    recorder = EpisodeRecorder()
+    sim = CamSimulation(plot=False, recorder=recorder, **config, **(backend or {}))
+    sim.log_angles = sim.log_players = False
+    sim.simulate()
+    return recorder.arrays()
+
+
+def save_episode(path: str, config: Dict, arrays: Dict[str, np.ndarray]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, config=json.dumps(config), **arrays)
+
+
+def load_episode(path: str) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    with np.load(path) as data:
+        arrays = {field: data[field] for field in data.files if field != "config"}
+        return json.loads(str(data["config"])), arrays
+
+
+def first_divergence(reference: Dict[str, np.ndarray], candidate: Dict[str, np.ndarray],
+                     tolerances: Dict[str, float] = None) -> Dict:
+    """
+    Returns:
+        Dict: Tick, field, error and both values of the first field that differs by more than its tolerance,
+        None if the episodes match.
+    """
+    tolerances = {**TOLERANCES, **(tolerances or {})}
+    n_ticks = min(len(reference["frame"]), len(candidate["frame"]))
+    first = None
+    for field in ("frame", "pose", "fov", "target", "visited"):
+        ref, cand = reference[field][:n_ticks].astype(float), candidate[field][:n_ticks].astype(float)
+        error = np.abs(ref - cand).reshape(n_ticks, -1).max(axis=1, initial=0.0)
+        if field == "pose":
+            # yaw wraps around
+            yaw_error = np.abs((ref[:, 0] - cand[:, 0] + 180.0) % 360.0 - 180.0)
+            error = np.maximum(yaw_error, np.abs(ref[:, 1:] - cand[:, 1:]).max(axis=1))
+        diverged = np.flatnonzero(error > tolerances[field])
+        if len(diverged) and (first is None or diverged[0] < first["tick"]):
+            tick = int(diverged[0])
+            first = {"tick": tick, "field": field, "error": float(error[tick]),
+                     "reference": reference[field][tick].tolist(), "candidate": candidate[field][tick].tolist()}
+    if first is None and len(reference["frame"]) != len(candidate["frame"]):
+        first = {"tick": n_ticks, "field": "ticks", "error": abs(len(reference["frame"]) - len(candidate["frame"])),
+                 "reference": len(reference["frame"]), "candidate": len(candidate["frame"])}
+    if first is None and abs(int(reference["score"]) - int(candidate["score"])) > tolerances["score"]:
+        first = {"tick": n_ticks, "field": "score", "error": abs(int(reference["score"]) - int(candidate["score"])),
+                 "reference": int(reference["score"]), "candidate": int(candidate["score"])}
+    return first
+
+
+def record(episodes: List[Dict] = EPISODES, golden_dir: str = GOLDEN_DIR) -> None:
+    for i, config in enumerate(episodes):
+        arrays = run_episode(config)
+        path = os.path.join(golden_dir, f"episode_{i:03d}.npz")
+        save_episode(path, config, arrays)
+        logger.info("Recorded {} ticks with score {} to {}", len(arrays["frame"]), int(arrays["score"]), path)
+
+
+def replay(backend: str, golden_dir: str = GOLDEN_DIR, tolerances: Dict[str, float] = None) -> bool:
+    """
+    Replays every golden episode with the backend, returns False if any of them diverges.
+    """
+    paths = sorted(glob.glob(os.path.join(golden_dir, "*.npz")))
+    if not paths:
+        raise FileNotFoundError(f"No golden episodes in {golden_dir}, record them first")
+    passed = True
+    for path in paths:
+        config, reference = load_episode(path)
+        divergence = first_divergence(reference, run_episode(config, BACKENDS[backend]), tolerances)
+        if divergence is None:
+            logger.info("{}: identical to the reference", os.path.basename(path))
+        else:
+            passed = False
+            logger.error("{} ({}): {} diverges on tick {} by {:.3g}, reference {}, candidate {}",
+                         os.path.basename(path), config, divergence["field"], divergence["tick"],
+                         divergence["error"], divergence["reference"], divergence["candidate"])
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay golden episodes")
+    parser.add_argument("command", choices=["record", "replay"])
+    parser.add_argument("backend", nargs="?", default="reference", choices=sorted(BACKENDS))
+    parser.add_argument("--golden-dir", default=GOLDEN_DIR)
+    parser.add_argument("--tolerance", nargs=2, action="append", metavar=("FIELD", "VALUE"), default=[],
+                        help="override the tolerance of a field")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO", filter=lambda record: record["name"] == __name__)
+    if args.command == "record":
+        record(golden_dir=args.golden_dir)
+    elif not replay(args.backend, args.golden_dir, {field: float(value) for field, value in args.tolerance}):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
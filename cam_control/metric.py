@@ -1,3 +1,6 @@
+from typing import Dict, Tuple
+
+import numpy as np
 from loguru import logger as log
 
 
@@ -15,3 +18,170 @@ class Metric:
     def get_score(self):
         log.success(f"Metric score: {self.iter}\nFor:\n # of players: {self.n_players}\n")
         return self.iter
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of the last size values, older values are overwritten.
+    """
+
+    def __init__(self, size: int, dtype=float):
+        self.buffer = np.zeros(size, dtype=dtype)
+        self.count = 0
+
+    def append(self, value) -> None:
+        self.buffer[self.count % len(self.buffer)] = value
+        self.count += 1
+
+    def values(self) -> np.ndarray:
+        """
+        Stored values from the oldest to the newest.
+        """
+        if self.count <= len(self.buffer):
+            return self.buffer[:self.count].copy()
+        start = self.count % len(self.buffer)
+        return np.concatenate([self.buffer[start:], self.buffer[:start]])
+
+
+class P2Quantile:
+    """
+    Streaming estimate of the q-quantile with the P-square algorithm (Jain and Chlamtac, 1985): five markers
+    whose heights are adjusted with piecewise-parabolic interpolation, O(1) memory and time per value.
+    """
+
+    def __init__(self, q: float):
+        self.q = q
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self.increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        heights, positions = self.heights, self.positions
+        if self.count <= 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in range(1, 4):
+            offset = self.desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def value(self) -> float:
+        if self.count == 0:
+            return np.nan
+        if self.count <= 5:
+            return float(np.quantile(self.heights, self.q))
+        return self.heights[2]
+
+    def _parabolic(self, i: int, step: int) -> float:
+        heights, positions = self.heights, self.positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+                (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i])
+                / (positions[i + 1] - positions[i])
+                + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1])
+                / (positions[i] - positions[i - 1]))
+
+
+class StalenessMetric:
+    """
+    Streaming per-player staleness statistics for long patrols.
+
+    Every tick is updated with the players seen on it. Per player it keeps the ticks since last seen and the
+    count, mean and maximum of the revisit intervals (ticks from one sighting to the next after the player was
+    out of sight). Revisit interval quantiles over all players are estimated with P2Quantile, and the coverage
+    fraction (share of players seen) and the mean staleness of the last window ticks are kept in ring buffers.
+    The cost of a tick depends on the number of players only, not on the length of the episode.
+
+    Args:
+        n_players (int): Number of players.
+        window (int): Number of recent ticks kept in the ring buffers.
+        quantiles (Tuple[float, ...]): Quantiles of the revisit intervals to estimate.
+    """
+
+    def __init__(self, n_players: int, window: int = 1500, quantiles: Tuple[float, ...] = (0.5, 0.9, 0.99)):
+        self.n_players = n_players
+        self.tick = 0
+        self.last_seen = np.zeros(n_players, dtype=int)
+        self.ever_seen = np.zeros(n_players, dtype=bool)
+        self.full_sweep_tick = None
+
+        self.revisit_count = np.zeros(n_players, dtype=int)
+        self.revisit_sum = np.zeros(n_players)
+        self.revisit_max = np.zeros(n_players, dtype=int)
+        self.revisit_quantiles = {q: P2Quantile(q) for q in quantiles}
+
+        self.coverage_sum = 0.0
+        self.coverage = RingBuffer(window)
+        self.mean_staleness = RingBuffer(window)
+
+    def update(self, seen: np.ndarray) -> None:
+        """
+        Args:
+            seen (np.ndarray): Flags of shape (n_players,), True for players seen on this tick.
+        """
+        seen = np.asarray(seen, dtype=bool)
+        self.tick += 1
+
+        intervals = self.tick - self.last_seen[seen]
+        revisited = self.ever_seen[seen] & (intervals > 1)
+        players = np.flatnonzero(seen)[revisited]
+        intervals = intervals[revisited]
+        self.revisit_count[players] += 1
+        self.revisit_sum[players] += intervals
+        self.revisit_max[players] = np.maximum(self.revisit_max[players], intervals)
+        for interval in intervals.tolist():
+            for quantile in self.revisit_quantiles.values():
+                quantile.update(interval)
+
+        self.last_seen[seen] = self.tick
+        self.ever_seen |= seen
+        if self.full_sweep_tick is None and self.ever_seen.all():
+            self.full_sweep_tick = self.tick
+
+        coverage = seen.mean() if self.n_players else 1.0
+        self.coverage_sum += coverage
+        self.coverage.append(coverage)
+        self.mean_staleness.append(self.staleness().mean() if self.n_players else 0.0)
+
+    def staleness(self) -> np.ndarray:
+        """
+        Ticks since every player was last seen, players never seen count from the start of the episode.
+        """
+        return self.tick - self.last_seen
+
+    def summary(self) -> Dict:
+        revisit_mean = np.divide(self.revisit_sum, self.revisit_count, out=np.full(self.n_players, np.nan),
+                                 where=self.revisit_count > 0)
+        return {
+            "ticks": self.tick,
+            "full_sweep_tick": self.full_sweep_tick,
+            "mean_coverage": self.coverage_sum / self.tick if self.tick else np.nan,
+            "max_staleness": int(self.staleness().max()) if self.n_players else 0,
+            "mean_staleness": float(self.staleness().mean()) if self.n_players else 0.0,
+            "revisit_mean": float(np.nanmean(revisit_mean)) if self.revisit_count.any() else np.nan,
+            "revisit_max": int(self.revisit_max.max()) if self.n_players else 0,
+            **{f"revisit_p{round(100 * q)}": quantile.value() for q, quantile in self.revisit_quantiles.items()},
+        }
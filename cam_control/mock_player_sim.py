@@ -10,6 +10,8 @@ class MockPlayerSim:
         self.min_y, self.max_y = field_loc[1], field_loc[1] + field_size[1]
         self.player_pos = self._init_players(n_agents)
         self.n_agents = len(self.player_pos)
+        # players are generated on the fly, there is no end of data
+        self.n_frames = None
 
         np.random.seed(1337)
 
@@ -20,6 +22,10 @@ class MockPlayerSim:
                                     np.random.uniform(self.min_y, self.max_y)])
         return np.array(static_pos)
 
+    def get_ball_position(self, time):
+        # there is no ball in the mock
+        return None
+
     def get_positions(self, time, randomize=False) -> np.ndarray:
         if randomize:
             deltas = np.random.normal(0, 1, size=self.n_agents * 2)
@@ -0,0 +1,90 @@
+import numpy as np
+
+from cam_control.data_type import Point3D
+
+
+class OcclusionModel:
+    """
+    Decides which players are hidden behind other players as seen from the camera.
+
+    Players are vertical cylinders standing on the ground. An occluder that is closer to the camera and whose
+    cylinder crosses the line of sight to the axis of a player hides the lower part of that player; the player
+    is hidden when less than min_visible_fraction of its height stays visible.
+
+    Line of sight tests are done in one vectorized pass: players are sorted by azimuth around the camera and
+    every player is only tested against its angular neighbours, so the cost is O(n log n + n * k) where k is
+    the number of players inside the widest angular shadow.
+
+    Args:
+        player_radius (float): Radius of the player cylinder in meters.
+        player_height (float): Height of the player cylinder in meters.
+        min_visible_fraction (float): Share of the height that must be visible to count a player as seen.
+    """
+
+    def __init__(self, player_radius: float = 0.3, player_height: float = 1.8, min_visible_fraction: float = 0.5):
+        self.player_radius = player_radius
+        self.player_height = player_height
+        self.min_visible_fraction = min_visible_fraction
+
+    def hidden_players(self, cam_pos: Point3D, players: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            cam_pos (Point3D): Camera position of shape (3,) or (..., 3) for a batch of frames.
+            players (np.ndarray): Player positions of shape (..., n, 2).
+
+        Returns:
+            np.ndarray: Boolean mask of shape (..., n), True for hidden players.
+        """
+        return self.visible_fraction(cam_pos, players) < self.min_visible_fraction
+
+    def visible_fraction(self, cam_pos: Point3D, players: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            cam_pos (Point3D): Camera position of shape (3,) or (..., 3) for a batch of frames.
+            players (np.ndarray): Player positions of shape (..., n, 2).
+
+        Returns:
+            np.ndarray: Visible share of every player's height, shape (..., n).
+        """
+        cam_pos = np.asarray(cam_pos, dtype=float)
+        players = np.asarray(players, dtype=float)
+        offset = players[..., :2] - cam_pos[..., None, :2]
+        cam_height = cam_pos[..., None, 2]
+
+        distance = np.maximum(np.hypot(offset[..., 0], offset[..., 1]), 1e-9)
+        azimuth = np.arctan2(offset[..., 1], offset[..., 0])
+        shadow = np.arcsin(np.minimum(self.player_radius / distance, 1.0))
+        n_players = players.shape[-2]
+        fraction = np.ones(np.broadcast_shapes(distance.shape, cam_height.shape))
+        if n_players < 2:
+            return fraction
+
+        order = np.argsort(azimuth, axis=-1)
+        azimuth, distance, shadow = (np.take_along_axis(np.broadcast_to(values, fraction.shape), order, axis=-1)
+                                     for values in (azimuth, distance, shadow))
+        max_shadow = shadow.max()
+
+        for shift in range(1, n_players // 2 + 1):
+            neighbours_in_reach = False
+            for step in (shift, -shift):
+                occluder_azimuth = np.roll(azimuth, -step, axis=-1)
+                occluder_distance = np.roll(distance, -step, axis=-1)
+                occluder_shadow = np.roll(shadow, -step, axis=-1)
+
+                gap = np.abs((occluder_azimuth - azimuth + np.pi) % (2 * np.pi) - np.pi)
+                neighbours_in_reach |= bool((gap <= max_shadow).any())
+                blocks = (gap < occluder_shadow) & (occluder_distance < distance)
+                fraction = np.minimum(fraction, np.where(
+                    blocks, self._fraction_above_occluder(cam_height, occluder_distance, distance), 1.0))
+            if not neighbours_in_reach:
+                break
+
+        visible = np.empty_like(fraction)
+        np.put_along_axis(visible, order, fraction, axis=-1)
+        return visible
+
+    def _fraction_above_occluder(self, cam_height: np.ndarray, occluder_distance: np.ndarray,
+                                 distance: np.ndarray) -> np.ndarray:
+        # lowest point of the player that a ray passing over the occluder's head still reaches
+        lowest_visible = cam_height - (cam_height - self.player_height) * distance / occluder_distance
+        return np.clip((self.player_height - lowest_visible) / self.player_height, 0.0, 1.0)
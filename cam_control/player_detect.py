@@ -1,13 +1,37 @@
 import numpy as np
 
 
+def are_points_inside_tetragons(points: np.ndarray, tetragons: np.ndarray) -> np.ndarray:
+    """
+    Vectorized winding number test, same rule as PlayerDetector.is_point_inside_tetragon.
+
+    Args:
+    - points: Array of shape (..., n, 2+) with the points to test.
+    - tetragons: Array of shape (..., 4, 2+) with the vertices, broadcastable with points over the leading axes.
+
+    Returns:
+    - Boolean array of shape (..., n), True where the point is inside the tetragon.
+    """
+    points = np.asarray(points, dtype=float)[..., :, None, :2]
+    start = np.asarray(tetragons, dtype=float)[..., None, :, :2]
+    end = np.roll(start, -1, axis=-2)
+
+    is_left = ((end[..., 0] - start[..., 0]) * (points[..., 1] - start[..., 1])
+               - (points[..., 0] - start[..., 0]) * (end[..., 1] - start[..., 1]))
+    upward = (start[..., 1] <= points[..., 1]) & (end[..., 1] > points[..., 1]) & (is_left > 0)
+    downward = (start[..., 1] > points[..., 1]) & (end[..., 1] <= points[..., 1]) & (is_left < 0)
+    winding_number = upward.sum(axis=-1) - downward.sum(axis=-1)
+    return winding_number != 0
+
+
 class PlayerDetector:
     def __init__(self):
         pass
 
-    def which_players_inside_fov(self, players, fov_points):
-        fov_points_no_z = np.array(fov_points)[:, [0, 1]]
-        are_players_inside_fov = np.array([self.is_point_inside_tetragon(point, fov_points_no_z) for point in players])
+    def which_players_inside_fov(self, players, fov_points, hidden=None):
+        are_players_inside_fov = are_points_inside_tetragons(players, fov_points)
+        if hidden is not None:
+            are_players_inside_fov &= ~hidden
         return np.where(are_players_inside_fov != False)
 
     def is_point_inside_tetragon(self, point, tetragon):
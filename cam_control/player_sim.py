@@ -8,6 +8,7 @@ import numpy as np
 import yaml
 import math
 import random
+from functools import lru_cache
 from typing import Tuple, List
 
 with open("cam_control/soccer_config/simulation_config.yaml", "r") as config_file:
@@ -361,6 +362,11 @@ class SoccerSimulation:
     def __init__(self, df):
         self.df = df
         self.n_agents = 22
+        self.n_frames = int(df['Frame'].max()) + 1
+        self.ball_positions = None
+        if {'Ball_x', 'Ball_y'} <= set(df.columns):
+            ball = df.groupby('Frame')[['Ball_x', 'Ball_y']].first().reindex(range(self.n_frames)).ffill()
+            self.ball_positions = ball.to_numpy()
 
     def get_positions(self, tick: int, *args) -> np.ndarray:
         positions = []
@@ -371,6 +377,11 @@ class SoccerSimulation:
 
         return np.array(positions)
 
+    def get_ball_position(self, tick: int) -> np.ndarray:
+        if self.ball_positions is None:
+            return None
+        return self.ball_positions[tick]
+
 
 # df_formations = pd.read_csv('cam_control/soccer_config/formation442.csv', header=None, names=['area_x', 'area_y', 'x', 'y'], sep=',')
 # df_team_A = df_formations.iloc[:11]
@@ -382,4 +393,18 @@ class SoccerSimulation:
 # df = match.simulate()
 # df.to_csv('soccer_sim.csv', index=False)
 
-soccer_sim = SoccerSimulation(pd.read_csv('cam_control/soccer_config/soccer_sim.csv'))
+SOCCER_SIM_PATH = 'cam_control/soccer_config/soccer_sim.csv'
+
+
+@lru_cache(maxsize=None)
+def load_soccer_sim(path: str = SOCCER_SIM_PATH) -> SoccerSimulation:
+    """
+    Reads the simulated match once per path, on first use instead of on import.
+    """
+    return SoccerSimulation(pd.read_csv(path))
+
+
+def __getattr__(name):
+    if name == 'soccer_sim':
+        return load_soccer_sim()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
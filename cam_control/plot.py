@@ -1,20 +1,38 @@
+from time import sleep
 from typing import Tuple, Dict
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.patches import Circle
-from cam_simulation.diplomagm.main_without_app import FOVCalculator
 from strategy.utils import calc_corners
 
 FULLSCREEN = False
 
 
 class Plotter:
+    """
+    Live view of the simulation.
+
+    Every artist is created once in the constructor and only its data is updated on every tick. The static
+    part of the figure (field, camera, legend, axes) is rendered once and cached as a background, every frame
+    restores the background, draws the animated artists on top of it, restores the legend over them and blits
+    the figure, so matplotlib never redraws the static artists. The background is grabbed again whenever the
+    figure is fully redrawn, e.g. after a resize.
+
+    With interactive=False the figure is rendered offscreen on an Agg canvas and every frame can be read with
+    to_rgb(), e.g. for video export.
+    """
 
     def __init__(self, field_size: Tuple[float, float], field_loc: Tuple[float, float], sleep_each_iter: float,
-                 trajectory: np.ndarray = None, aim_radius: float = 1, cam_pos: np.ndarray = None):
-        self.vis_point_plot = None
-        self.unvis_point_plot = None
-        self.fig, self.ax = plt.subplots()
+                 trajectory: np.ndarray = None, aim_radius: float = 1, cam_pos: np.ndarray = None,
+                 interactive: bool = True):
+        if interactive:
+            self.fig, self.ax = plt.subplots()
+        else:
+            self.fig = Figure()
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.subplots()
 
         # Plot camera position
         self.ax.scatter(*cam_pos[:2], color='red', marker="x", label="Camera Position")
@@ -22,33 +40,47 @@ class Plotter:
         self.field_size = field_size  # (width, height)
         self.field_loc = field_loc  # (x, y)
         self.plot_field()
-        self.fov_calculator = FOVCalculator()
-        self.ax.set_aspect('equal')
         if trajectory is not None:
-            self.plot_points(trajectory, color="r", leave_forever=True)  # trajectory
-
-        self.legend = None
-        self.lines = []
-        self.dots = []
+            self.ax.plot(trajectory[:, 0], trajectory[:, 1], marker='o', color="r", linestyle='')
         self.pause_time = sleep_each_iter
 
-        if FULLSCREEN:
+        if FULLSCREEN and interactive:
             mng = plt.get_current_fig_manager()
             mng.full_screen_toggle()
 
-        # Add legend
-        self.ax.scatter([], [], color='blue', marker="o", label="Unvisited Agent")
-        self.ax.scatter([], [], color='black', marker="o", label="Visited Agent")
-        self.ax.scatter([], [], edgecolor='yellow', facecolor='none', marker="o", label="Camera Target")
-        self.ax.scatter([], [], edgecolor='red', facecolor='none', marker="o", label="Camera Center of FOV")
-        self.ax.plot([], [], color='blue', label="FOV Side")
-        self.ax.scatter([], [], color='red', marker=".", label="FOV Corner")
-        self.ax.plot([], [], color='green', label="Field Corner")
+        # Animated artists, drawn on top of the cached background
+        self.fov_sides, = self.ax.plot([], [], color='blue', label="FOV Side", animated=True)
+        self.fov_corners, = self.ax.plot([], [], color='red', marker='o', linestyle='', label="FOV Corner",
+                                         animated=True)
+        self.unvisited_agents, = self.ax.plot([], [], color='blue', marker='o', linestyle='', label="Unvisited Agent",
+                                              animated=True)
+        self.visited_agents, = self.ax.plot([], [], color='black', marker='o', linestyle='', label="Visited Agent",
+                                            animated=True)
+        self.cur_circle = self.ax.add_patch(Circle((0, 0), self.aim_radius, edgecolor='red', fill=False,
+                                                   label="Camera Center of FOV", animated=True))
+        self.target_circle = self.ax.add_patch(Circle((0, 0), 5, edgecolor='yellow', linewidth=3, fill=False,
+                                                      label="Camera Target", animated=True))
+        self.title = self.ax.set_title("", animated=True)
 
+        self.ax.plot([], [], color='green', label="Field Corner")
         self.legend = self.ax.legend(loc='upper right')
+        self.animated_artists = [self.fov_sides, self.fov_corners, self.unvisited_agents, self.visited_agents,
+                                 self.cur_circle, self.target_circle, self.title]
+        self.ax.set_xlabel('X')
+        self.ax.set_ylabel('Y')
+        self.ax.set_aspect('equal')
+        self.ax.set_xlim([-40, 150])
+        self.ax.set_ylim([-20, 150])
         self.time_frame = 1
         self.fps = 25
 
+        self.background = None
+        self.legend_region = None
+        self.fig.canvas.mpl_connect("draw_event", self._grab_background)
+        if interactive:
+            plt.show(block=False)
+        self.fig.canvas.draw()
+
     def plot(self, fov_points: np.ndarray, observed_objects_positions: np.ndarray, visited_objects: np.array,
              camera_properties: Dict, cur_pos: Tuple[float, float], target_pos: Tuple[float, float]) -> None:
         """
@@ -61,52 +93,37 @@ class Plotter:
         Returns:
 
         """
-        # yaw, pitch = camera_properties["yaw"], camera_properties["pitch"]
-
-        self._clear_irrelevant()
         self.plot_fov(fov_points)
-        self.plot_agents(observed_objects_positions, visited_objects)  # agents
+        self.plot_agents(observed_objects_positions, visited_objects)
         self.plot_aim(cur_pos, target_pos)
-        plt.xlabel('X')
-        plt.ylabel('Y')
-        plt.axis('scaled')
-        plt.title(f"Time Frame: {self.time_frame}, seconds elapsed: {self.time_frame // self.fps}")
-        self.ax.set_xlim([-40, 150])
-        self.ax.set_ylim([-20, 150])
+        self.title.set_text(f"Time Frame: {self.time_frame}, seconds elapsed: {self.time_frame // self.fps}")
         self.time_frame += 1
-        plt.pause(self.pause_time)
-
-    def plot_fov(self, points, color="r"):
-        ax = self.ax
-
-        self.lines = []
-        self.dots = []
-        for i in range(len(points)):
-            dot = ax.scatter(points[i][0], points[i][1], c=color, marker='o')
-            line = ax.plot([points[i][0], points[(i + 1) % len(points)][0]],
-                           [points[i][1], points[(i + 1) % len(points)][1]], c='b')
-            self.dots.append(dot)
-            self.lines.append(line)
 
-    def _clear_irrelevant(self):
-        # assert len(self.dots) == len(self.lines), "dots and lines must have the same length"
-
-        # Remove all stored dots (patches)
-        for dot in self.dots:
-            dot.remove()
-
-        # Remove all stored lines
-        for line_group in self.lines:
-            for line in line_group:
-                line.remove()
-
-        # # Remove the legend if it exists
-        # if self.legend:
-        #     self.legend.remove()
+        canvas = self.fig.canvas
+        if self.background is None:
+            canvas.draw()
+        canvas.restore_region(self.background)
+        for artist in self.animated_artists:
+            self.ax.draw_artist(artist)
+        # the legend stays on top of the agents
+        canvas.restore_region(self.legend_region)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        if self.pause_time > 0:
+            sleep(self.pause_time)
+
+    def to_rgb(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Last rendered frame, (height, width, 3) uint8.
+        """
+        return np.asarray(self.fig.canvas.buffer_rgba())[..., :3]
 
-        # Clear the lists
-        self.dots.clear()
-        self.lines.clear()
+    def plot_fov(self, points):
+        points = np.asarray(points)[:, :2]
+        closed = np.vstack([points, points[:1]])
+        self.fov_sides.set_data(closed[:, 0], closed[:, 1])
+        self.fov_corners.set_data(points[:, 0], points[:, 1])
 
     def plot_field(self):
         ax = self.ax
@@ -122,62 +139,19 @@ class Plotter:
 
     def plot_agents(self, observed_objects_positions: np.ndarray,
                     visited_objects: np.array):
-        visited_objects_positions = observed_objects_positions[visited_objects == 1]
-        unvisited_objects_positions = observed_objects_positions[visited_objects == 0]
-        self.plot_points(unvisited_objects_positions, color="b")
-        self.plot_points(visited_objects_positions, color="black", visited=True)
-
-    def plot_points(self, observed_objects_positions: np.ndarray, color: str = "b", leave_forever=False,
-                    visited=False):
-        ax = self.ax
-
-        if visited:
-            # Clear previous points if they exist
-            if self.vis_point_plot:
-                for point in self.vis_point_plot:
-                    point.remove()
-        else:
-            if self.unvis_point_plot:
-                for point in self.unvis_point_plot:
-                    point.remove()
-
-        x_coords = observed_objects_positions[:, 0]
-        y_coords = observed_objects_positions[:, 1]
-
-        # Plot agents with customized line plot
-        # Here, linestyle='' means no connecting lines between markers
-        point_plot = ax.plot(x_coords, y_coords, marker='o', color=color, linestyle='')
-
-        if not leave_forever:
-            if visited:
-                self.vis_point_plot = point_plot
-            else:
-                self.unvis_point_plot = point_plot
-
-    def plot_legend(self, yaw, pitch):
-        ax = self.ax
-
-        # Create a legend
-        legend_label = "yaw = {}, pitch = {}".format(yaw, pitch)
-        ax.plot([], [], label=legend_label)  # Assuming x_data, y_data are your plotting data
-        # Display the legend on the plot
-        self.legend = ax.legend()
+        visited = np.asarray(visited_objects) == 1
+        self.unvisited_agents.set_data(observed_objects_positions[~visited, 0],
+                                       observed_objects_positions[~visited, 1])
+        self.visited_agents.set_data(observed_objects_positions[visited, 0], observed_objects_positions[visited, 1])
 
     def plot_aim(self, cur_pos: Tuple[float, float], target_pos: Tuple[float, float]):
-        # Create an empty red circle at cur_pos
-        cur_circle = Circle(cur_pos, self.aim_radius, edgecolor='red', fill=False)  # Adjust radius as needed
-        self.ax.add_patch(cur_circle)
-        # Save the circle to self.dots for later removal
-        self.dots.append(cur_circle)
-
-        # Create an empty yellow circle at target_pos
-        target_circle = Circle(target_pos, 5, edgecolor='yellow', linewidth=3, fill=False)  # Adjust radius as needed
-        self.ax.add_patch(target_circle)
-        # Save the circle to self.dots for later removal
-        self.dots.append(target_circle)
-
-        # Draw the plot to ensure the circles are visible
-        self.fig.canvas.draw()
+        self.cur_circle.set_center(cur_pos)
+        self.target_circle.set_center(target_pos)
+
+    def _grab_background(self, event=None):
+        # the background is everything but the animated artists, which are skipped by full redraws
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.legend_region = self.fig.canvas.copy_from_bbox(self.legend.get_window_extent())
 
     def __del__(self):
         plt.close(self.fig)
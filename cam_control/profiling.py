@@ -0,0 +1,138 @@
+import cProfile
+import heapq
+import io
+import json
+import os
+import pstats
+from collections import defaultdict
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+PROFILE_ENV = "CAM_PROFILE"
+# bin i of a histogram counts durations of [2^(i - 1), 2^i) nanoseconds
+N_BINS = 40
+
+
+def profiling_enabled(profile: bool = None) -> bool:
+    """
+    profile if given, otherwise whether the CAM_PROFILE environment variable is set to something else than 0.
+    """
+    if profile is not None:
+        return profile
+    return os.environ.get(PROFILE_ENV, "0") not in ("", "0")
+
+
+class StageProfiler:
+    """
+    Histograms of the durations of the stages of the control loop.
+
+    Durations are integer nanoseconds from perf_counter_ns, counted in log2 bins, so the memory does not grow
+    with the number of ticks and quantiles are interpolated inside a bin. Totals, counts and maxima are exact.
+    With n_slowest, every tick runs under cProfile and the statistics of the n slowest ticks are kept.
+
+    Args:
+        n_slowest (int): Number of the slowest ticks whose cProfile statistics are kept, 0 disables cProfile.
+    """
+
+    def __init__(self, n_slowest: int = 0):
+        self.n_slowest = n_slowest
+        self.histograms = defaultdict(lambda: np.zeros(N_BINS, dtype=np.int64))
+        self.total_ns = defaultdict(int)
+        self.max_ns = defaultdict(int)
+        self.slowest_ticks: List[Tuple[int, int, str]] = []
+        self._cprofile = None
+
+    def add(self, stage: str, duration_ns: int) -> None:
+        self.histograms[stage][min(duration_ns.bit_length(), N_BINS - 1)] += 1
+        self.total_ns[stage] += duration_ns
+        self.max_ns[stage] = max(self.max_ns[stage], duration_ns)
+
+    def begin_tick(self) -> None:
+        if self.n_slowest:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def end_tick(self, tick: int, duration_ns: int) -> None:
+        self.add("tick", duration_ns)
+        if self._cprofile is None:
+            return
+        self._cprofile.disable()
+        if len(self.slowest_ticks) < self.n_slowest or duration_ns > self.slowest_ticks[0][0]:
+            # the statistics are only formatted for the ticks that get into the slowest ones
+            stream = io.StringIO()
+            pstats.Stats(self._cprofile, stream=stream).sort_stats("cumulative").print_stats(20)
+            entry = (duration_ns, tick, stream.getvalue())
+            if len(self.slowest_ticks) < self.n_slowest:
+                heapq.heappush(self.slowest_ticks, entry)
+            else:
+                heapq.heapreplace(self.slowest_ticks, entry)
+        self._cprofile = None
+
+    def merge(self, other: "StageProfiler") -> None:
+        """
+        Adds the durations of another profiler, e.g. of another episode.
+        """
+        for stage, histogram in other.histograms.items():
+            self.histograms[stage] += histogram
+            self.total_ns[stage] += other.total_ns[stage]
+            self.max_ns[stage] = max(self.max_ns[stage], other.max_ns[stage])
+        if self.n_slowest:
+            self.slowest_ticks = heapq.nlargest(self.n_slowest, self.slowest_ticks + other.slowest_ticks)
+            heapq.heapify(self.slowest_ticks)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per stage: count, total milliseconds, share of the tick time, mean, median, p90, p99 and max microseconds.
+        """
+        tick_ns = self.total_ns.get("tick", 0) or sum(self.total_ns.values())
+        rows = {}
+        for stage, histogram in self.histograms.items():
+            count = int(histogram.sum())
+            rows[stage] = {
+                "count": count,
+                "total_ms": self.total_ns[stage] / 1e6,
+                "share": self.total_ns[stage] / tick_ns if tick_ns else np.nan,
+                "mean_us": self.total_ns[stage] / count / 1e3,
+                **{f"p{round(100 * q)}_us": min(self._quantile_ns(histogram, q), self.max_ns[stage]) / 1e3
+                   for q in (0.5, 0.9, 0.99)},
+                "max_us": self.max_ns[stage] / 1e3,
+            }
+        return pd.DataFrame.from_dict(rows, orient="index").sort_values("total_ms", ascending=False)
+
+    def export(self, path: str) -> None:
+        """
+        Writes the summary to a .csv or .json file, the JSON also has the histograms and the cProfile statistics
+        of the slowest ticks.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        summary = self.summary()
+        if path.endswith(".csv"):
+            summary.to_csv(path, index_label="stage")
+        else:
+            report = {
+                "summary": summary.to_dict(orient="index"),
+                "histograms_log2_ns": {stage: histogram.tolist() for stage, histogram in self.histograms.items()},
+                "slowest_ticks": [{"tick": tick, "duration_ms": duration_ns / 1e6, "cprofile": stats}
+                                  for duration_ns, tick, stats in sorted(self.slowest_ticks, reverse=True)],
+            }
+            with open(path, "w") as file:
+                json.dump(report, file, indent=2)
+        logger.info("Profile summary written to {}", path)
+
+    def log_summary(self) -> None:
+        with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format",
+                               "{:.2f}".format):
+            logger.info("Stage profile:\n{}", self.summary())
+
+    @staticmethod
+    def _quantile_ns(histogram: np.ndarray, q: float) -> float:
+        # linear interpolation inside the bin that holds the quantile
+        cumulative = np.cumsum(histogram)
+        rank = q * cumulative[-1]
+        i = int(np.searchsorted(cumulative, rank))
+        lower, upper = (2 ** (i - 1) if i else 0), 2 ** i
+        before = cumulative[i - 1] if i else 0
+        return float(lower + (upper - lower) * (rank - before) / histogram[i])
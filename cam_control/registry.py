@@ -0,0 +1,95 @@
+"""
+Named builders of the strategies, solvers and datasets that CamSimulation can be assembled from.
+
+Builders take the CamSimulation under construction and read what they need from it (field, camera, eps,
+the dataset for the number of agents, the solver's visit mode), so a new algorithm is plugged in with
+one decorated function:
+
+    @register(STRATEGIES, "my_strategy")
+    def my_strategy(sim):
+        return MyStrategy(sim.field_size, sim.field_loc, ...)
+"""
+from typing import Callable, Dict
+
+from cam_control.cam_aim import calc_fov_middle
+from cam_control.fov_batch import BatchFOVCalculator
+from cam_control.mock_player_sim import MockPlayerSim
+from cam_control.player_sim import load_soccer_sim
+from cam_control.strategy.follower import FollowerStrategy
+from cam_control.strategy.mpc import MPCStrategy
+from cam_control.strategy.sweep import SweepStrategy
+from cam_control.strategy.trajectory import TrajectoryStrategy
+from cam_control.tsp_solver.neighbor import NeighborSolver
+from cam_control.tsp_solver.patrol import PatrolSolver
+from cam_control.tsp_solver.set_cover import PoseTable, SetCoverSolver
+
+STRATEGIES: Dict[str, Callable] = {}
+SOLVERS: Dict[str, Callable] = {}
+DATASETS: Dict[str, Callable] = {}
+
+
+def register(registry: Dict[str, Callable], name: str) -> Callable:
+    def decorator(builder: Callable) -> Callable:
+        registry[name] = builder
+        return builder
+
+    return decorator
+
+
+def build(registry: Dict[str, Callable], name: str, sim):
+    if name not in registry:
+        raise ValueError(f"Unknown name {name}, expected one of {sorted(registry)}")
+    return registry[name](sim)
+
+
+@register(STRATEGIES, "follower")
+def follower_strategy(sim):
+    return FollowerStrategy(sim.field_size, sim.field_loc, sim.cam_pos, sim.focal_length, sim.image_sensor,
+                            cam_aim_func=calc_fov_middle, eps=sim.eps)
+
+
+@register(STRATEGIES, "mpc")
+def mpc_strategy(sim):
+    return MPCStrategy(sim.field_size, sim.field_loc, sim.cam_pos, sim.focal_length, sim.image_sensor,
+                       eps=sim.eps, cover_radius=sim.eps if sim.solver.visit_mode == "aim" else None,
+                       fov_calculator=sim.batch_fov,
+                       zoom_range=(sim.resolution_estimator.min_zoom, sim.resolution_estimator.max_zoom),
+                       resolution_estimator=sim.resolution_estimator, min_player_pixels=sim.min_player_pixels)
+
+
+@register(STRATEGIES, "sweep")
+def sweep_strategy(sim):
+    return SweepStrategy(sim.field_size, sim.field_loc, sim.cam_pos, sim.focal_length, sim.image_sensor,
+                         eps=sim.eps, fov_calculator=BatchFOVCalculator.from_fov_calculator(sim.fov_calculator))
+
+
+@register(STRATEGIES, "trajectory")
+def trajectory_strategy(sim):
+    return TrajectoryStrategy(sim.field_size, sim.field_loc, sim.cam_pos, sim.focal_length, sim.image_sensor,
+                              eps=sim.eps)
+
+
+@register(SOLVERS, "neighbor")
+def neighbor_solver(sim):
+    return NeighborSolver(n_observed_agents=sim.player_sim.n_agents, eps=sim.eps, visit_mode=sim.visit_mode)
+
+
+@register(SOLVERS, "set_cover")
+def set_cover_solver(sim):
+    return SetCoverSolver(n_observed_agents=sim.player_sim.n_agents,
+                          pose_table=PoseTable.from_fov_calculator(sim.fov_calculator))
+
+
+@register(SOLVERS, "patrol")
+def patrol_solver(sim):
+    return PatrolSolver(n_observed_agents=sim.player_sim.n_agents, eps=sim.eps, visit_mode=sim.visit_mode)
+
+
+@register(DATASETS, "soccer_sim")
+def soccer_sim_dataset(sim):
+    return load_soccer_sim()
+
+
+@register(DATASETS, "mock")
+def mock_dataset(sim):
+    return MockPlayerSim(sim.field_size, sim.field_loc, random_seed=sim.random_seed)
@@ -0,0 +1,74 @@
+"""
+Offline video rendering of episode logs, see cam_control.episode_log.
+
+Every worker process draws its segment of the ticks on its own offscreen Plotter, see cam_control.video.
+
+    python -m cam_control.render episode.camlog review.mp4 --jobs 4
+"""
+import argparse
+import sys
+from functools import partial
+from time import perf_counter
+
+import numpy as np
+from loguru import logger
+
+# simulation extends sys.path for the strategy modules the plotter needs, it has to be imported first
+import cam_control.simulation  # noqa: F401
+from cam_control.episode_log import read_episode_log
+from cam_control.video import render_parallel
+from plot import Plotter
+
+
+class EpisodeRenderer:
+    """
+    Frame source of an episode log, draws a tick the way the live Plotter does.
+    """
+
+    def __init__(self, log_path: str):
+        header, self.records = read_episode_log(log_path)
+        scene = header["scene"]
+        self.plotter = Plotter(field_size=tuple(scene["field_size"]), field_loc=tuple(scene["field_loc"]),
+                               sleep_each_iter=0, aim_radius=scene["aim_radius"], cam_pos=np.array(scene["cam_pos"]),
+                               interactive=False)
+        self.plotter.fps = scene["framerate"]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __call__(self, i: int) -> np.ndarray:
+        record = self.records[i]
+        self.plotter.time_frame = int(record["tick"]) + 1
+        self.plotter.plot(record["fov"], record["positions"], record["visited"], camera_properties=None,
+                          cur_pos=tuple(record["aim"]), target_pos=tuple(record["target"]))
+        return self.plotter.to_rgb()
+
+
+def render_episode(log_path: str, output: str, n_jobs: int = None, fps: float = None) -> None:
+    """
+    Renders an episode log to an MP4 file, by default at the framerate of the episode.
+    """
+    header, records = read_episode_log(log_path)
+    if not len(records):
+        raise ValueError(f"{log_path} has no ticks")
+    render_parallel(partial(EpisodeRenderer, log_path), len(records), output,
+                    fps=fps or header["scene"]["framerate"], n_jobs=n_jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render an episode log to MP4")
+    parser.add_argument("log_path")
+    parser.add_argument("output")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes, by default the number of CPUs")
+    parser.add_argument("--fps", type=float, default=None, help="by default the framerate of the episode")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO", filter=lambda record: record["name"] == __name__)
+    start = perf_counter()
+    render_episode(args.log_path, args.output, n_jobs=args.jobs, fps=args.fps)
+    logger.info("Rendered {} to {} in {:.1f} s", args.log_path, args.output, perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+from typing import Dict, Tuple
+
+import numpy as np
+
+from cam_control.data_type import Point2D, Point3D
+from cam_control.fov_batch import DEFAULT_ROLL, aim_angles, batch_rotation_matrix
+
+# Zoom range of the lens relative to the rig focal length, the rig file does not describe it. 30 is the limit of
+# CameraDynamics; below 0.5 the far corners of the default rig's footprint leave the ground at its pitch of 8
+# degrees and the FOV turns unbounded.
+DEFAULT_ZOOM_RANGE = (0.5, 30.0)
+
+
+class ResolutionEstimator:
+    """
+    Estimates how many pixels a player occupies on the image sensor for given camera poses.
+
+    Players are vertical segments from the ground to player_height, projected with a pinhole model of the rig
+    camera. Besides the per pose estimate, it provides a field grid map of the minimum zoom needed to get
+    a given number of pixels on a player standing in each cell, with the camera aimed at that cell.
+
+    Zooms are clamped to the lens range [min_zoom, max_zoom]. With min_zoom below 1 the camera zooms out of the
+    rig focal length wherever the players are still resolved there; cells that need more than max_zoom (or are
+    behind the camera) get max_zoom, the closest the lens can get.
+
+    Args:
+        cam_pos (Point3D): Camera position in meters.
+        focal_length (float): Focal length of the lens in mm at zoom 1.
+        pixel_size (float): Pixel size of the image sensor in micrometers.
+        field_size (Tuple[float, float]): Field (width, length) in meters.
+        field_loc (Point2D): Field corner coordinates in meters.
+        player_height (float): Player height in meters.
+        zoom_range (Tuple[float, float]): Minimum and maximum zoom of the lens, see DEFAULT_ZOOM_RANGE.
+    """
+
+    def __init__(self, cam_pos: Point3D, focal_length: float, pixel_size: float,
+                 field_size: Tuple[float, float], field_loc: Point2D, player_height: float = 1.8,
+                 zoom_range: Tuple[float, float] = DEFAULT_ZOOM_RANGE):
+        self.cam_pos = np.asarray(cam_pos, dtype=float)
+        self.focal_length = focal_length
+        self.pixel_size_mm = pixel_size / 1000.0
+        self.field_size = field_size
+        self.field_loc = field_loc
+        self.player_height = player_height
+        self.min_zoom, self.max_zoom = zoom_range
+        self._zoom_maps: Dict[Tuple[float, float], np.ndarray] = {}
+
+    @classmethod
+    def from_fov_calculator(cls, fov_calculator, player_height: float = 1.8,
+                            zoom_range: Tuple[float, float] = DEFAULT_ZOOM_RANGE) -> "ResolutionEstimator":
+        return cls(cam_pos=fov_calculator.get_cam_pos(), focal_length=fov_calculator.get_focal_length(),
+                   pixel_size=fov_calculator.get_image_sensor()["pixel_size"],
+                   field_size=fov_calculator.get_field_size(), field_loc=fov_calculator.get_field_loc(),
+                   player_height=player_height, zoom_range=zoom_range)
+
+    def player_height_pixels(self, yaw, pitch, players: np.ndarray, zoom=1.0) -> np.ndarray:
+        """
+        Projected player height in pixels.
+
+        Args:
+            yaw: Camera yaw in degrees, scalar or array of poses of shape (...).
+            pitch: Camera pitch in degrees, broadcastable with yaw.
+            players (np.ndarray): Player positions of shape (n, 2) or (..., n, 2).
+            zoom: Zoom coefficient (focal_length * zoom), broadcastable with yaw.
+
+        Returns:
+            np.ndarray: Pixels per player of shape (..., n), 0 for players behind the camera.
+        """
+        rotation = batch_rotation_matrix(pitch, yaw, DEFAULT_ROLL)
+        players = np.asarray(players, dtype=float)
+        feet = np.concatenate([players[..., :2], np.zeros(players.shape[:-1] + (1,))], axis=-1) - self.cam_pos
+        head = feet + np.array([0.0, 0.0, self.player_height])
+
+        # world -> camera frame, x is the optical axis and z points up on the sensor
+        feet_cam = feet @ rotation
+        head_cam = head @ rotation
+        focal_length = self.focal_length * np.asarray(zoom, dtype=float)[..., None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            feet_v = feet_cam[..., 2] / feet_cam[..., 0]
+            head_v = head_cam[..., 2] / head_cam[..., 0]
+        in_front = (feet_cam[..., 0] > 0) & (head_cam[..., 0] > 0)
+        return np.where(in_front, focal_length * np.abs(head_v - feet_v) / self.pixel_size_mm, 0.0)
+
+    def min_zoom_map(self, n_pixels: float, cell_size: float = 1.0) -> np.ndarray:
+        """
+        Minimum zoom that resolves a player in every field cell with n_pixels, with the camera aimed at the cell.
+        Maps are computed once per (n_pixels, cell_size) and cached.
+
+        Returns:
+            np.ndarray: Grid of shape (width / cell_size, length / cell_size) indexed as [x, y], values in
+                [min_zoom, max_zoom].
+        """
+        key = (n_pixels, cell_size)
+        if key not in self._zoom_maps:
+            width, length = self.field_size
+            x = self.field_loc[0] + (np.arange(int(np.ceil(width / cell_size))) + 0.5) * cell_size
+            y = self.field_loc[1] + (np.arange(int(np.ceil(length / cell_size))) + 0.5) * cell_size
+            cells = np.stack(np.meshgrid(x, y, indexing="ij"), axis=-1)
+
+            yaw, pitch = aim_angles(self.cam_pos, cells, target_height=self.player_height / 2)
+            pixels = self.player_height_pixels(yaw, pitch, cells[..., None, :])[..., 0]
+            with np.errstate(divide="ignore"):
+                self._zoom_maps[key] = np.clip(n_pixels / pixels, self.min_zoom, self.max_zoom)
+        return self._zoom_maps[key]
+
+    def required_zoom(self, players: np.ndarray, n_pixels: float, cell_size: float = 1.0) -> np.ndarray:
+        """
+        Minimum zoom per player, looked up in the precomputed map.
+
+        Returns:
+            np.ndarray: Zoom of shape (..., n).
+        """
+        zoom_map = self.min_zoom_map(n_pixels, cell_size)
+        players = np.asarray(players, dtype=float)
+        ix = np.clip(((players[..., 0] - self.field_loc[0]) / cell_size).astype(int), 0, zoom_map.shape[0] - 1)
+        iy = np.clip(((players[..., 1] - self.field_loc[1]) / cell_size).astype(int), 0, zoom_map.shape[1] - 1)
+        return zoom_map[ix, iy]
+
+    def widest_zoom(self, players: np.ndarray, n_pixels: float, cell_size: float = 1.0) -> float:
+        """
+        Widest zoom that still resolves every given player with n_pixels, min_zoom without players.
+        """
+        return float(np.max(self.required_zoom(players, n_pixels, cell_size), initial=self.min_zoom))
@@ -0,0 +1,241 @@
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from cam_control.cam_simulation.diplomagm.main_without_app import FOVCalculator
+from cam_control.fov_batch import BatchFOVCalculator, aim_angles
+from cam_control.player_detect import are_points_inside_tetragons
+
+OBJECTIVES = ("sweep", "coverage")
+CANDIDATE_COLUMNS = ["x", "y", "z", "focal_length"]
+
+
+def trajectories_from_df(df: pd.DataFrame, frame_step: int = 1) -> np.ndarray:
+    """
+    Reshape SoccerMatch.simulate output (one row per player per frame) to an array of positions.
+
+    Args:
+        df (pd.DataFrame): Frame with 'Frame', 'X' and 'Y' columns and the same players on every frame.
+        frame_step (int): Take every frame_step-th frame.
+
+    Returns:
+        np.ndarray: Player positions of shape (frames, players, 2).
+    """
+    df = df.sort_values("Frame", kind="stable")
+    n_frames = df["Frame"].nunique()
+    positions = df[["X", "Y"]].to_numpy(dtype=float).reshape(n_frames, -1, 2)
+    return positions[::frame_step]
+
+
+class RigOptimizer:
+    """
+    Searches the panoramic system placement (x, y, height and focal length) over a dataset of player
+    trajectories, instead of checking every placement by eye in the app.
+
+    Candidates are evaluated in vectorized batches with BatchFOVCalculator. Two objectives are supported:
+    "sweep" estimates the number of ticks needed to see every player once (greedy nearest player in angle
+    space, every stop credits all players inside the FOV), "coverage" is the share of players inside the FOV
+    of the home pose aimed at the field centre.
+
+    Args:
+        trajectories (np.ndarray): Player positions of shape (frames, players, 2).
+        fov_calculator (FOVCalculator): Rig with the camera (sensor, lens) and the field to place it at.
+        objective (str): One of OBJECTIVES.
+        n_frames (int): Number of frames sampled evenly from trajectories for evaluation.
+        max_angular_speed (float): Degrees per tick the camera turns around each axis.
+        wait_frames (int): Ticks the camera stays on every stop, as FollowerStrategy does.
+        min_player_pixels (float): If set, players projected smaller than this are never counted as seen.
+        player_height (float): Player height in meters, used for the pixel estimate.
+        batch_size (int): Number of candidates evaluated in one vectorized call.
+        n_jobs (int): Number of processes evaluating batches in parallel.
+    """
+
+    def __init__(self, trajectories: np.ndarray, fov_calculator: FOVCalculator = None, objective: str = "sweep",
+                 n_frames: int = 50, max_angular_speed: float = 2.4, wait_frames: int = 5,
+                 min_player_pixels: float = None, player_height: float = 1.8, batch_size: int = 64,
+                 n_jobs: int = 1):
+        assert objective in OBJECTIVES, f"Unknown objective: {objective}, expected one of {OBJECTIVES}"
+        self.fov_calculator = FOVCalculator() if fov_calculator is None else fov_calculator
+        self.batch_fov = BatchFOVCalculator.from_fov_calculator(self.fov_calculator)
+        self.objective = objective
+        self.max_angular_speed = max_angular_speed
+        self.wait_frames = wait_frames
+        self.min_player_pixels = min_player_pixels
+        self.player_height = player_height
+        self.pixel_size_mm = self.fov_calculator.get_image_sensor()["pixel_size"] / 1000.0
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+
+        frames = np.linspace(0, len(trajectories) - 1, min(n_frames, len(trajectories))).astype(int)
+        self.players = np.asarray(trajectories, dtype=float)[frames]
+
+        field_width, field_length = self.fov_calculator.get_field_size()
+        field_x, field_y = self.fov_calculator.get_field_loc()
+        self.field_center = np.array([field_x + field_width / 2, field_y + field_length / 2])
+
+        # score per candidate and player angles per camera position, both reused between searches
+        self._score_cache: Dict[Tuple, float] = {}
+        self._angles_cache: Dict[Tuple, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def evaluate(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            candidates (np.ndarray): Rows of (x, y, z, focal_length).
+
+        Returns:
+            np.ndarray: Score per candidate, expected ticks for "sweep" and share of seen players for "coverage".
+        """
+        candidates = np.atleast_2d(np.asarray(candidates, dtype=float))
+        keys = [self._cache_key(candidate) for candidate in candidates]
+        missing = [i for i, key in enumerate(keys) if key not in self._score_cache]
+
+        batches = [candidates[missing[i:i + self.batch_size]] for i in range(0, len(missing), self.batch_size)]
+        if self.n_jobs > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                results = list(executor.map(self._evaluate_batch, batches))
+        else:
+            results = [self._evaluate_batch(batch) for batch in batches]
+
+        for i, score in zip(missing, np.concatenate(results) if results else []):
+            self._score_cache[keys[i]] = score
+        return np.array([self._score_cache[key] for key in keys])
+
+    def search(self, x: Iterable[float], y: Iterable[float], z: Iterable[float], focal_length: Iterable[float],
+               refine_iterations: int = 0, refine_samples: int = 64, random_seed: int = 42) -> pd.DataFrame:
+        """
+        Grid search over every combination of the given values, optionally refined by random sampling
+        around the best candidate with a shrinking spread.
+
+        Returns:
+            pd.DataFrame: Evaluated candidates with a 'score' column, best first.
+        """
+        axes = [np.asarray(list(values), dtype=float) for values in (x, y, z, focal_length)]
+        candidates = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 4)
+        logger.info(f"Evaluating {len(candidates)} rig candidates, objective: {self.objective}")
+        result = self._to_frame(candidates, self.evaluate(candidates))
+
+        rng = np.random.default_rng(random_seed)
+        lower = np.array([values.min() for values in axes])
+        upper = np.array([values.max() for values in axes])
+        spread = np.array([np.ptp(values) / max(len(values) - 1, 1) for values in axes])
+        for iteration in range(refine_iterations):
+            best = result.iloc[0][CANDIDATE_COLUMNS].to_numpy(dtype=float)
+            samples = np.clip(best + rng.uniform(-spread, spread, size=(refine_samples, 4)), lower, upper)
+            result = pd.concat([result, self._to_frame(samples, self.evaluate(samples))], ignore_index=True)
+            result = self._sort(result)
+            spread /= 2
+            logger.info(f"Refinement {iteration + 1}/{refine_iterations}, best score: {result.iloc[0]['score']}")
+        return result
+
+    def save_rig(self, candidate: pd.Series, path: str) -> Dict:
+        """
+        Write a candidate as a rig JSON, using the loaded rig as a template and aiming it at the field centre.
+        """
+        with open(self.fov_calculator.path_to_camera, "r") as template_file:
+            rig = json.load(template_file)
+
+        x, y, z, focal_length = (float(candidate[column]) for column in CANDIDATE_COLUMNS)
+        yaw, pitch = aim_angles(np.array([x, y, z]), self.field_center)
+        panoramic_system = rig["list_of_panoramic_systems"][0]
+        panoramic_system["coordinates"] = {"x": x, "y": y, "z": z}
+        panoramic_system["axis"].update({"pitch": float(pitch), "yaw": float(yaw)})
+        panoramic_system["list_of_cameras"][0]["lens"]["focal_length"] = focal_length
+
+        with open(path, "w") as rig_file:
+            json.dump(rig, rig_file)
+        logger.info(f"Rig saved to {path}")
+        return rig
+
+    def _evaluate_batch(self, candidates: np.ndarray) -> np.ndarray:
+        cam_pos, focal_length = candidates[:, :3], candidates[:, 3]
+        yaw, pitch, distance = self._player_angles(cam_pos)
+        pixels = focal_length[:, None, None] * self.player_height / (distance * self.pixel_size_mm)
+        resolved = np.ones_like(pixels, dtype=bool) if self.min_player_pixels is None \
+            else pixels >= self.min_player_pixels
+        home_yaw, home_pitch = aim_angles(cam_pos, self.field_center)
+
+        if self.objective == "coverage":
+            fov = self.batch_fov.get_points_of_fov(cam_pos, home_yaw, home_pitch, focal_length=focal_length)
+            inside = are_points_inside_tetragons(self.players, fov[:, None])
+            return (inside & resolved).mean(axis=(1, 2))
+        return self._sweep_ticks(cam_pos, focal_length, yaw, pitch, resolved, home_yaw, home_pitch)
+
+    def _sweep_ticks(self, cam_pos, focal_length, yaw, pitch, resolved, home_yaw, home_pitch) -> np.ndarray:
+        n_candidates, n_frames, n_players = yaw.shape
+        aim_yaw = np.repeat(home_yaw[:, None], n_frames, axis=1)
+        aim_pitch = np.repeat(home_pitch[:, None], n_frames, axis=1)
+        # unresolved players can never be seen, they make the whole frame infeasible
+        visited = ~resolved
+        travel = np.zeros((n_candidates, n_frames))
+        stops = np.zeros((n_candidates, n_frames))
+
+        for _ in range(n_players + 1):
+            fov = self.batch_fov.get_points_of_fov(cam_pos[:, None], aim_yaw, aim_pitch,
+                                                   focal_length=focal_length[:, None])
+            visited |= are_points_inside_tetragons(self.players, fov)
+            active = ~visited.all(axis=-1)
+            if not active.any():
+                break
+
+            # pan and tilt move simultaneously, so the time to reach a player is the larger of the two
+            delta_yaw = np.abs((yaw - aim_yaw[..., None] + 180.0) % 360.0 - 180.0)
+            angular_distance = np.maximum(delta_yaw, np.abs(pitch - aim_pitch[..., None]))
+            angular_distance[visited] = np.inf
+            closest = angular_distance.argmin(axis=-1)[..., None]
+
+            travel += np.where(active, np.take_along_axis(angular_distance, closest, axis=-1)[..., 0], 0)
+            stops += active
+            aim_yaw = np.where(active, np.take_along_axis(yaw, closest, axis=-1)[..., 0], aim_yaw)
+            aim_pitch = np.where(active, np.take_along_axis(pitch, closest, axis=-1)[..., 0], aim_pitch)
+            np.put_along_axis(visited, closest, True, axis=-1)
+
+        ticks = travel / self.max_angular_speed + stops * self.wait_frames
+        ticks[~resolved.all(axis=-1)] = np.inf
+        return ticks.mean(axis=1)
+
+    def _player_angles(self, cam_pos: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Yaw, pitch and distance from every camera position to every sampled player, shape (candidates, frames, players).
+        """
+        keys = [self._cache_key(position) for position in cam_pos]
+        missing = [i for i, key in enumerate(keys) if key not in self._angles_cache]
+        if missing:
+            positions = cam_pos[missing][:, None, None, :]
+            yaw, pitch = aim_angles(positions, self.players[None], target_height=self.player_height / 2)
+            offset = self.players[None] - positions[..., :2]
+            distance = np.sqrt(np.sum(offset ** 2, axis=-1) + (positions[..., 2] - self.player_height / 2) ** 2)
+            for j, i in enumerate(missing):
+                self._angles_cache[keys[i]] = yaw[j], pitch[j], distance[j]
+        return tuple(np.stack([self._angles_cache[key][k] for key in keys]) for k in range(3))
+
+    def _to_frame(self, candidates: np.ndarray, scores: np.ndarray) -> pd.DataFrame:
+        result = pd.DataFrame(candidates, columns=CANDIDATE_COLUMNS)
+        result["score"] = scores
+        return self._sort(result)
+
+    def _sort(self, result: pd.DataFrame) -> pd.DataFrame:
+        ascending = self.objective == "sweep"
+        return result.sort_values("score", ascending=ascending, kind="stable").reset_index(drop=True)
+
+    @staticmethod
+    def _cache_key(values: np.ndarray) -> Tuple:
+        return tuple(np.round(values, 6))
+
+
+if __name__ == '__main__':
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    fov_calculator = FOVCalculator()
+    trajectories = trajectories_from_df(pd.read_csv('cam_control/soccer_config/soccer_sim.csv'))
+    optimizer = RigOptimizer(trajectories, fov_calculator, objective="sweep", min_player_pixels=50)
+    result = optimizer.search(x=np.linspace(-40, -5, 8), y=np.linspace(0, 100, 11), z=np.linspace(5, 25, 5),
+                              focal_length=np.linspace(8, 50, 8), refine_iterations=3)
+    logger.success(f"Best rig candidates:\n{result.head(10)}")
+    optimizer.save_rig(result.iloc[0], fov_calculator.path_to_folders +
+                       'lists of panoramic systems/hse_1_camera_optimized.json')
@@ -7,94 +7,230 @@ sys.path.append(cam_dir)
 cam_sim = cam_dir + "/cam_simulation/diplomagm"
 sys.path.append(cam_sim)
 
-from cam_control.metric import Metric
-from cam_control.strategy.follower import FollowerStrategy
-from cam_control.tsp_solver.neighbor import NeighborSolver
+from cam_control.metric import Metric, StalenessMetric
+from cam_control.registry import DATASETS, SOLVERS, STRATEGIES, build
 from cam_control.cam_aim import calc_fov_middle, calc_princ_axis_intersection
 from player_detect import PlayerDetector
-# from cam_control.strategy.trajectory import TrajectoryStrategy
-# from strategy.strategy import CameraMovementStrategy
+from cam_control.camera_dynamics import CameraDynamics
+from cam_control.occlusion import OcclusionModel
+from cam_control.resolution import ResolutionEstimator
+from cam_control.fov_batch import BatchFOVCalculator
+from cam_control.tracing import Tracer
+from cam_control.profiling import StageProfiler, profiling_enabled
+from cam_control.episode_log import EpisodeLogWriter
+from cam_control.player_sim import framerate
 from cam_simulation.diplomagm.main_without_app import FOVCalculator
 from plot import Plotter
+import numpy as np
+from collections import defaultdict
 from loguru import logger
-from time import sleep
-from mock_player_sim import MockPlayerSim
-from player_sim import soccer_sim
+from time import perf_counter_ns, sleep
 
 
 class CamSimulation:
-    def __init__(self, random_seed=42, start_from_frame=0, plot=True):
+    def __init__(self, random_seed=42, start_from_frame=0, plot=True, occlusion=False, min_player_pixels=None,
+                 camera_dynamics=False, strategy="follower",
+                 visit_mode="aim", solver="neighbor", dataset="soccer_sim", max_ticks=None, trace=None,
+                 profile=None, profile_slowest=0, profile_path=None, recorder=None, log_path=None):
+        """
+        Strategy, solver and dataset are names from cam_control.registry. The simulation stops after max_ticks
+        or at the end of the dataset even if not every player was visited, see self.finished. trace is the
+        level of self.tracer, see cam_control.tracing. With profile (by default from the CAM_PROFILE environment
+        variable) stage durations are collected in self.profiler, with cProfile statistics of the profile_slowest
+        slowest ticks, and the summary is written to profile_path (.json or .csv) at the end of simulate().
+        recorder gets the decisions of every tick and the score, see cam_control.golden.EpisodeRecorder.
+        With log_path every tick is appended to a binary episode log that cam_control.render turns into a video.
+        """
         self.fov_calculator = FOVCalculator()
 
         CLOSE_ENOUGH_EPS = 2
         SLEEP_EACH_ITER = 0.000001
 
-        field_size = self.fov_calculator.get_field_size()
-        field_loc = self.fov_calculator.get_field_loc()
-        image_sensor = self.fov_calculator.get_image_sensor()
+        self.eps = CLOSE_ENOUGH_EPS
+        self.random_seed = random_seed
+        self.visit_mode = visit_mode
+        self.field_size = self.fov_calculator.get_field_size()
+        self.field_loc = self.fov_calculator.get_field_loc()
+        self.image_sensor = self.fov_calculator.get_image_sensor()
         self.cam_pos = self.fov_calculator.get_cam_pos()
         self.focal_length = self.fov_calculator.get_focal_length()
         logger.debug(f"Cam pos: {self.cam_pos}, focal length: {self.focal_length}")
 
-        self.strategy = FollowerStrategy(field_size, field_loc, self.cam_pos, self.focal_length, image_sensor,
-                                         cam_aim_func=calc_fov_middle, eps=CLOSE_ENOUGH_EPS)
-        self.plotter = Plotter(field_size=field_size, field_loc=field_loc, sleep_each_iter=SLEEP_EACH_ITER,
-                               aim_radius=CLOSE_ENOUGH_EPS, cam_pos=self.cam_pos)
+        # if set, pick the widest zoom of the lens that still resolves the target and the players the planned
+        # view covers with this many pixels unless the strategy commands the zoom itself, in "fov" visit mode
+        # players that get fewer pixels are not credited
+        self.min_player_pixels = min_player_pixels
+        self.resolution_estimator = ResolutionEstimator.from_fov_calculator(self.fov_calculator)
+        # stateless footprints of poses the camera is not at, e.g. the planned one
+        self.batch_fov = BatchFOVCalculator.from_fov_calculator(self.fov_calculator)
+
+        self.player_sim = build(DATASETS, dataset, self)
+        self.solver = build(SOLVERS, solver, self)
+        self.strategy = build(STRATEGIES, strategy, self)
+        self.plotter = None
+        if plot:
+            self.plotter = Plotter(field_size=self.field_size, field_loc=self.field_loc,
+                                   sleep_each_iter=SLEEP_EACH_ITER, aim_radius=CLOSE_ENOUGH_EPS, cam_pos=self.cam_pos)
         self.player_detector = PlayerDetector()
-        self.player_sim = MockPlayerSim(field_size, field_loc, random_seed=random_seed)
-        self.player_sim = soccer_sim
-        self.solver = NeighborSolver(n_observed_agents=self.player_sim.n_agents, eps=CLOSE_ENOUGH_EPS)
+        self.occlusion_model = OcclusionModel() if occlusion else None
+        # if set, the camera follows the strategy commands with limited speed and acceleration
+        self.camera_dynamics = CameraDynamics(zoom_range=(self.resolution_estimator.min_zoom,
+                                                          self.resolution_estimator.max_zoom)) \
+            if camera_dynamics else None
         self.metric = Metric(n_players=self.player_sim.n_agents)
+        self.staleness_metric = StalenessMetric(n_players=self.player_sim.n_agents)
 
         self.to_plot = plot
         self.time = start_from_frame
+        self.max_ticks = max_ticks
+        self.finished = False
+        # total seconds spent in every stage of the loop
+        self.stage_seconds = defaultdict(float)
+        self.tracer = Tracer(level=trace)
+        self.profiler = StageProfiler(n_slowest=profile_slowest) if profiling_enabled(profile) else None
+        self.profile_path = profile_path
+        self.recorder = recorder
+        self.episode_log = None
+        if log_path is not None:
+            scene = {"field_size": [float(v) for v in self.field_size], "field_loc": [float(v) for v in self.field_loc],
+                     "cam_pos": np.asarray(self.cam_pos, dtype=float).tolist(), "aim_radius": CLOSE_ENOUGH_EPS,
+                     "framerate": framerate}
+            self.episode_log = EpisodeLogWriter(log_path, n_players=self.player_sim.n_agents, scene=scene)
         self.log_angles = True
         self.log_players = True
-        self.field_size = field_size
 
     def simulate(self):
         yaw, pitch = self.fov_calculator.get_rotation_coords()
         delta_yaw, delta_pitch = 0, 0
         zoom = 1
+        if self.camera_dynamics is not None:
+            camera_state = self.camera_dynamics.initial_state(yaw, pitch, zoom)
 
         while True:
-            yaw += delta_yaw
-            pitch += delta_pitch
+            self.tracer.begin(tick=self.metric.iter, frame=self.time)
+            if self.profiler is not None:
+                self.profiler.begin_tick()
+            tick_start = stage_start = perf_counter_ns()
+            if self.camera_dynamics is None:
+                yaw += delta_yaw
+                pitch += delta_pitch
+                cur_zoom = zoom
+            else:
+                camera_state = self.camera_dynamics.step(camera_state, (yaw + delta_yaw, pitch + delta_pitch, zoom))
+                yaw, pitch, cur_zoom = self.camera_dynamics.pose(camera_state)
 
             camera_properties = {
                 "yaw": yaw % 360.0,
                 "pitch": pitch % 360.0,
-                "zoom": zoom
+                "zoom": cur_zoom
             }
             fov_points = self.fov_calculator.get_points_of_fov(camera_properties)[0]
+            stage_start = self._record_stage("fov", stage_start)
             observed_objects_positions = self.player_sim.get_positions(self.time, True)
+            hidden_players = None
+            if self.occlusion_model is not None:
+                hidden_players = self.occlusion_model.hidden_players(self.cam_pos, observed_objects_positions)
+            if self.camera_dynamics is not None and not self.camera_dynamics.settled(camera_state):
+                # nobody is seen until the image settles after a slew
+                hidden_players = np.ones(len(observed_objects_positions), dtype=bool)
+            stage_start = self._record_stage("players", stage_start)
+            players_inside_fov = self.player_detector.which_players_inside_fov(
+                observed_objects_positions, fov_points, hidden=hidden_players
+            )
+            seen = np.zeros(len(observed_objects_positions), dtype=bool)
+            seen[players_inside_fov] = True
+            if self.min_player_pixels is not None:
+                seen &= self.resolution_estimator.player_height_pixels(
+                    yaw, pitch, observed_objects_positions, cur_zoom) >= self.min_player_pixels
+            inside_fov = seen if self.solver.visit_mode == "fov" else None
+            self.staleness_metric.update(seen)
+            stage_start = self._record_stage("detection", stage_start)
+            self.strategy.observe(observed_objects_positions, self.solver.visited_agents, zoom=cur_zoom)
             cur_target = self.solver.determine_next_position(self.strategy.intermediate_target_pos,
-                                                             observed_objects_positions)
+                                                             observed_objects_positions, hidden=hidden_players,
+                                                             inside_fov=inside_fov,
+                                                             ball=self.player_sim.get_ball_position(self.time))
+            stage_start = self._record_stage("solver", stage_start)
 
             delta_yaw, delta_pitch = self.strategy.move(fov_points, yaw, pitch, to=cur_target)
-            players_inside_fov = self.player_detector.which_players_inside_fov(
-                observed_objects_positions, fov_points
-            )
+            if self.strategy.zoom_command is not None:
+                zoom = self.strategy.zoom_command
+            elif self.min_player_pixels is not None:
+                zoom = self._widest_resolving_zoom(yaw + delta_yaw, pitch + delta_pitch, cur_target,
+                                                   observed_objects_positions)
+            stage_start = self._record_stage("strategy", stage_start)
+            if self.tracer.enabled:
+                self.tracer.record(yaw=yaw, pitch=pitch, zoom=cur_zoom, aim_x=self.strategy.intermediate_target_pos[0],
+                                   aim_y=self.strategy.intermediate_target_pos[1], target_x=cur_target[0],
+                                   target_y=cur_target[1], n_inside_fov=len(players_inside_fov[0]),
+                                   n_unvisited=self.solver.get_number_of_unvisited_agents())
+            if self.recorder is not None:
+                self.recorder.record(frame=self.time, pose=(yaw, pitch, cur_zoom), fov=fov_points, target=cur_target,
+                                     visited=self.solver.visited_agents)
+            if self.episode_log is not None:
+                self.episode_log.write(tick=self.metric.iter, frame=self.time, pose=(yaw, pitch, cur_zoom),
+                                       fov=fov_points, positions=observed_objects_positions,
+                                       visited=self.solver.visited_agents, aim=calc_fov_middle(fov_points),
+                                       target=self.strategy.final_target)
 
             if self.to_plot:
                 self.plotter.plot(
                     fov_points, observed_objects_positions, self.solver.visited_agents, camera_properties=camera_properties,
                     cur_pos=calc_fov_middle(fov_points), target_pos=self.strategy.final_target,
                 )
+                self._record_stage("plot", stage_start)
 
+            self.tracer.end()
+            if self.profiler is not None:
+                self.profiler.end_tick(self.metric.iter, perf_counter_ns() - tick_start)
             self._log(camera_properties, players_inside_fov)
             self.metric.count_iteration()
             if self.solver.get_number_of_unvisited_agents() == 0:
                 logger.success(f"Simulation finished on angle position {yaw, pitch}")
+                self.finished = True
+                break
+            if self.max_ticks is not None and self.metric.iter >= self.max_ticks:
+                logger.warning(f"Simulation stopped after {self.max_ticks} ticks")
+                break
+            if self.player_sim.n_frames is not None and self.time + 1 >= self.player_sim.n_frames:
+                logger.warning(f"Simulation stopped at the end of the dataset on frame {self.time}")
                 break
             self.time += 1
-        return self.metric.get_score()
+        logger.info("Staleness: {}", self.staleness_metric.summary())
+        if self.profiler is not None:
+            self.profiler.log_summary()
+            if self.profile_path is not None:
+                self.profiler.export(self.profile_path)
+        score = self.metric.get_score()
+        if self.recorder is not None:
+            self.recorder.finish(score)
+        if self.episode_log is not None:
+            self.episode_log.close()
+        return score
+
+    def _record_stage(self, stage: str, stage_start: int) -> int:
+        now = perf_counter_ns()
+        seconds = (now - stage_start) * 1e-9
+        self.stage_seconds[stage] += seconds
+        self.tracer.stage(stage, seconds)
+        if self.profiler is not None:
+            self.profiler.add(stage, now - stage_start)
+        return now
+
+    def _widest_resolving_zoom(self, yaw: float, pitch: float, target, players: np.ndarray) -> float:
+        # the planned pose at the widest zoom covers every player any zoom of that pose can show, so the
+        # zoom that resolves all of them and the target never loses a player to a too wide view
+        widest_fov = self.batch_fov.get_points_of_fov(self.cam_pos, yaw % 360.0, pitch % 360.0,
+                                                      self.resolution_estimator.min_zoom)
+        covered = self.player_detector.which_players_inside_fov(players, widest_fov)
+        candidates = np.vstack([np.asarray(target, dtype=float)[:2], np.asarray(players)[covered][:, :2]])
+        return self.resolution_estimator.widest_zoom(candidates, self.min_player_pixels)
 
     def _log(self, camera_properties, players_inside_fov):
         if self.log_angles:
-            logger.info(f"{camera_properties}")
+            logger.info("{}", camera_properties)
         if self.log_players:
-            logger.info(f"Players that are inside FOV: {players_inside_fov}")
+            logger.info("Players that are inside FOV: {}", players_inside_fov)
 
     @staticmethod
     def _finished(delta_yaw: float, delta_pitch: float):
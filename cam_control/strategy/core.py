@@ -24,7 +24,7 @@ class Strategy:
 
         Args:
         - line: An array of shape (2, 2) representing a line segment defined by two points.
-        - points: An array of shape (2, k) representing k points.
+        - points: An array of shape (k, 2) representing k points.
 
         Returns:
         - The minimum distance from any point in `points` to the line.
@@ -33,9 +33,7 @@ class Strategy:
         p1 = line[0, :]
         p2 = line[1, :]
 
-        distances = []
-        for point in points:
-            d = norm(np.cross(p2 - p1, p1 - point)) / norm(p2 - p1)
-            distances.append(d)
-        # logger.debug(f"Distances between points: {distances}, {min(distances)}")
-        return min(distances)
+        direction = p2 - p1
+        offsets = p1 - np.asarray(points)
+        distances = np.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / norm(direction)
+        return distances.min()
@@ -1,11 +1,11 @@
 from typing import Tuple, List, Dict, Callable
 import numpy as np
 from loguru import logger
-from queue import Queue
 from numpy.linalg import norm
 from shapely.geometry import Polygon
 
 from cam_control.data_type import Point2D, Point3D
+from cam_control.strategy.motion_profile import MotionProfile
 from cam_control.strategy.strategy import CameraMovementStrategy
 
 
@@ -26,6 +26,7 @@ class FollowerStrategy(CameraMovementStrategy):
         # therefore if a field length is 100, it is 20 meters in 1 second,
         # that is 0.8 meters in 1/25 seconds
         self.speed_meters_per_tick = 0.8
+        self.motion_profile = MotionProfile(max_speed=self.speed_meters_per_tick)
 
     def move(self, fov_corners: List[Point2D], yaw: float, pitch: float, to: Point2D) \
             -> Tuple[float, float]:
@@ -43,9 +44,9 @@ class FollowerStrategy(CameraMovementStrategy):
         self.target_pos = to
         cur_pos = self.cam_aim(fov_corners)
 
-        logger.debug(f"Current position of camera aim: {cur_pos}")
+        logger.debug("Current position of camera aim: {}", cur_pos)
         if self.is_target_reached(cur_pos):
-            logger.warning(f"Follower strategy finished traversing at position: {self.target_pos}")
+            logger.warning("Follower strategy finished traversing at position: {}", self.target_pos)
             if not self.idle:
                 self.idle = True
                 self.remaining_frames_idle = self.wait_on_every_player_frames
@@ -69,21 +70,20 @@ class FollowerStrategy(CameraMovementStrategy):
         return self._close_enough(cur_pos, self.target_pos)
 
 
-    def _plan_gradual_movement(self, cur_pos: Point2D, target_pos: Point2D) -> Queue:
-        self.gradual_movement.empty()
-        distance = norm(cur_pos - target_pos)
-        n_iterations = distance / self.speed_meters_per_tick
-        n_steps = int(max(n_iterations, 2))
-        logger.debug(f"traversing distance {distance} meters in # of iterations: {n_steps} and # of seconds: {n_steps / 25}")
-
-        lin_space = np.linspace(cur_pos, target_pos, n_steps)
+    def _plan_gradual_movement(self, cur_pos: Point2D, target_pos: Point2D) -> MotionProfile:
+        # the move takes whole ticks, the first one aims at the current position
+        n_steps = int(max(norm(np.asarray(cur_pos) - target_pos) / self.speed_meters_per_tick, 2))
+        self.motion_profile.plan(cur_pos, target_pos, start_tick=self.profile_tick, ticks=n_steps - 1)
         self.final_target = target_pos
-        for point in lin_space:
-            self.gradual_movement.put(point)
-        return self.gradual_movement
+        logger.debug("traversing distance {} meters in # of iterations: {} and # of seconds: {}",
+                     self.motion_profile.length, self.motion_profile.duration, self.motion_profile.duration / 25)
+        return self.motion_profile
 
     def _get_next_intermediate_target(self, cur_pos, target_pos):
-        if self.gradual_movement.empty():
+        if self.motion_profile.finished(self.profile_tick):
             self._plan_gradual_movement(cur_pos, target_pos)
-        intermediate_target_pos = self.gradual_movement.get(block=False)
-        return intermediate_target_pos
+        elif not self._close_enough(self.motion_profile.end, target_pos):
+            # the target moved away from the end of the running move, continue from where the aim is now
+            self.motion_profile.replan(target_pos, self.profile_tick)
+            self.final_target = target_pos
+        return self._next_gradual_position()
@@ -0,0 +1,124 @@
+import numpy as np
+
+from cam_control.data_type import Point2D
+
+
+class MotionProfile:
+    """
+    Trapezoidal velocity profile of the camera aim moving along a straight segment on the ground.
+
+    The profile is stored as three phases (accelerate, cruise, decelerate) with their start ticks, distances,
+    speeds and accelerations, so the position at any tick is answered in O(1) without precomputed waypoints.
+    Without max_acceleration the aim moves with a constant speed, either max_speed or the speed that takes
+    the requested number of ticks.
+    Replanning starts a new profile from the position and velocity at the given tick, so a moving target does
+    not reset the speed to zero.
+
+    Args:
+        max_speed (float): Maximum speed in meters per tick.
+        max_acceleration (float): Maximum acceleration in meters per tick squared, None for instant speed changes.
+    """
+
+    def __init__(self, max_speed: float, max_acceleration: float = None):
+        self.max_speed = max_speed
+        self.max_acceleration = max_acceleration
+
+        self.start = np.zeros(2)
+        self.end = np.zeros(2)
+        self.direction = np.zeros(2)
+        self.length = 0.0
+        self.start_tick = 0
+        self.duration = -1.0
+        self._phase_ticks = np.zeros(3)
+        self._phase_distances = np.zeros(3)
+        self._phase_speeds = np.zeros(3)
+        self._phase_accelerations = np.zeros(3)
+
+    def plan(self, start: Point2D, end: Point2D, start_tick: int = 0, initial_speed: float = 0.0,
+             ticks: float = None) -> None:
+        """
+        Plans a move from start to end beginning at start_tick with initial_speed along the segment.
+        Without max_acceleration, ticks fixes the duration of the move instead of max_speed.
+        """
+        self.start = np.asarray(start, dtype=float)
+        self.end = np.asarray(end, dtype=float)
+        self.start_tick = start_tick
+        self.length = float(np.linalg.norm(self.end - self.start))
+        self.direction = (self.end - self.start) / self.length if self.length > 0 else np.zeros(2)
+
+        length, max_speed = self.length, self.max_speed
+        if self.max_acceleration is None:
+            duration = length / max_speed if ticks is None else ticks
+            speed = length / duration if length > 0 else 0.0
+            self._set_phases(speed, 0.0, duration, 0.0, 0.0, 0.0)
+            return
+
+        acceleration = self.max_acceleration
+        initial_speed = min(max(initial_speed, 0.0), max_speed)
+        if initial_speed ** 2 / (2 * acceleration) >= length:
+            # too fast to stop in time with max_acceleration, brake harder
+            deceleration = initial_speed ** 2 / (2 * length) if length > 0 else 0.0
+            braking_ticks = 2 * length / initial_speed if initial_speed > 0 else 0.0
+            self._set_phases(initial_speed, 0.0, 0.0, 0.0, braking_ticks, deceleration)
+            return
+
+        peak_speed = min(max_speed, np.sqrt(acceleration * length + initial_speed ** 2 / 2))
+        acceleration_ticks = (peak_speed - initial_speed) / acceleration
+        deceleration_ticks = peak_speed / acceleration
+        accelerating = (initial_speed + peak_speed) / 2 * acceleration_ticks
+        decelerating = peak_speed / 2 * deceleration_ticks
+        cruise_ticks = (length - accelerating - decelerating) / peak_speed
+        self._set_phases(initial_speed, acceleration_ticks, cruise_ticks, acceleration, deceleration_ticks,
+                         acceleration)
+
+    def replan(self, end: Point2D, tick: int) -> None:
+        """
+        Plans a move to a new end from the position at tick, keeping the speed component towards the new end.
+        """
+        position, velocity = self.position(tick), self.velocity(tick)
+        offset = np.asarray(end, dtype=float) - position
+        distance = np.linalg.norm(offset)
+        initial_speed = float(velocity @ offset / distance) if distance > 0 else 0.0
+        self.plan(position, end, start_tick=tick, initial_speed=initial_speed)
+
+    def position(self, tick: int) -> np.ndarray:
+        return self.start + self.direction * self._distance(tick)
+
+    def velocity(self, tick: int) -> np.ndarray:
+        time = tick - self.start_tick
+        if time < 0 or time >= self.duration:
+            return np.zeros(2)
+        phase = self._phase(time)
+        speed = self._phase_speeds[phase] - self._phase_accelerations[phase] * (time - self._phase_ticks[phase])
+        return self.direction * speed
+
+    def finished(self, tick: int) -> bool:
+        """
+        True once the end position was returned for the previous tick.
+        """
+        return tick - 1 - self.start_tick >= self.duration
+
+    def _distance(self, tick: int) -> float:
+        time = tick - self.start_tick
+        if time <= 0:
+            return 0.0
+        if time >= self.duration:
+            return self.length
+        phase = self._phase(time)
+        elapsed = time - self._phase_ticks[phase]
+        return float(self._phase_distances[phase] + self._phase_speeds[phase] * elapsed
+                     - self._phase_accelerations[phase] * elapsed ** 2 / 2)
+
+    def _phase(self, time: float) -> int:
+        return int(np.searchsorted(self._phase_ticks, time, side="right")) - 1
+
+    def _set_phases(self, initial_speed: float, acceleration_ticks: float, cruise_ticks: float,
+                    acceleration: float, deceleration_ticks: float, deceleration: float) -> None:
+        # accelerations are stored with the sign of a slowdown, s = s0 + v0 * t - a * t^2 / 2
+        peak_speed = initial_speed + acceleration * acceleration_ticks
+        self._phase_ticks = np.array([0.0, acceleration_ticks, acceleration_ticks + cruise_ticks])
+        self._phase_speeds = np.array([initial_speed, peak_speed, peak_speed])
+        self._phase_accelerations = np.array([-acceleration, 0.0, deceleration])
+        accelerating = (initial_speed + peak_speed) / 2 * acceleration_ticks
+        self._phase_distances = np.array([0.0, accelerating, accelerating + peak_speed * cruise_ticks])
+        self.duration = acceleration_ticks + cruise_ticks + deceleration_ticks
@@ -0,0 +1,231 @@
+from typing import Tuple, List, Dict
+
+import numpy as np
+from loguru import logger
+
+from cam_control.cam_aim import calc_fov_middles
+from cam_control.data_type import Point2D, Point3D
+from cam_control.fov_batch import BatchFOVCalculator, aim_angles
+from cam_control.player_detect import are_points_inside_tetragons
+from cam_control.resolution import DEFAULT_ZOOM_RANGE, ResolutionEstimator
+from cam_control.strategy.strategy import CameraMovementStrategy
+
+
+class MPCStrategy(CameraMovementStrategy):
+    """
+    Model predictive camera movement.
+
+    Every tick a batch of short yaw/pitch/zoom command sequences is rolled out against the predicted player
+    positions (constant velocity from the last two observations). Candidates are sequences that pursue every
+    unvisited player, sequences with a constant angular rate in a fan of directions, and the shifted best sequence
+    of the previous tick. Each sequence is scored by the discounted number of newly covered players, the angular
+    travel, the ticks spent before covering anybody and the distance to the closest unvisited player at the end
+    of the horizon; only the first command of the best sequence is applied.
+
+    A player is covered when it is inside the predicted FOV and within cover_radius of the FOV middle, which is
+    what NeighborSolver credits in "aim" visit mode. With cover_radius None the whole FOV counts, as in "fov"
+    visit mode, and with min_player_pixels the player must also get that many pixels from resolution_estimator.
+
+    The zoom only changes what is covered when the whole FOV counts, so only then every sequence is rolled out
+    zooming in, zooming out and holding the zoom by zoom_speed_per_tick, and the zoom of the best first command
+    is commanded in zoom_command. With min_player_pixels the held zoom is instead the widest one that resolves
+    the unvisited player closest to the FOV middle. With a cover_radius the current zoom is held.
+
+    Args:
+        field_size (Tuple[float, float]): Size of the field.
+        field_loc (Point2D): Location of the field.
+        cam_pos (Point3D): Position of the camera.
+        focal_length (float): Focal length of the camera lens.
+        image_sensor (Dict): Information about the image sensor.
+        eps (float): Distance to the target that counts as reached.
+        fov_calculator (BatchFOVCalculator): Calculator for the predicted FOVs.
+        cover_radius (float): Distance from the FOV middle within which a player counts as covered.
+        horizon (int): Number of ticks in every command sequence.
+        n_directions (int): Number of constant rate sequences.
+        speed_meters_per_tick (float): Maximum speed of the FOV middle on the ground, as for FollowerStrategy.
+        discount (float): Discount of coverage in later ticks.
+        travel_weight (float): Cost per degree of angular travel.
+        idle_weight (float): Cost per tick before the first newly covered player.
+        distance_weight (float): Cost per meter between the final FOV middle and the closest unvisited player.
+        zoom_range (Tuple[float, float]): Minimum and maximum zoom of the rollouts.
+        zoom_speed_per_tick (float): Zoom change per tick of the rollouts, the default is that of CameraDynamics.
+        resolution_estimator (ResolutionEstimator): Pixels per player, used with min_player_pixels.
+        min_player_pixels (float): Pixels a covered player must get, None to credit players at any resolution.
+    """
+
+    def __init__(self, field_size: Tuple[float, float], field_loc: Point2D, cam_pos: Point3D,
+                 focal_length: float, image_sensor: Dict, eps: float, fov_calculator: BatchFOVCalculator,
+                 cover_radius: float = None, horizon: int = 20, n_directions: int = 16,
+                 speed_meters_per_tick: float = 0.8, discount: float = 0.9, travel_weight: float = 0.005,
+                 idle_weight: float = 0.02, distance_weight: float = 0.02,
+                 zoom_range: Tuple[float, float] = DEFAULT_ZOOM_RANGE, zoom_speed_per_tick: float = 0.08,
+                 resolution_estimator: ResolutionEstimator = None, min_player_pixels: float = None):
+        super().__init__(field_size=field_size, field_loc=field_loc,
+                         cam_pos=cam_pos, focal_length=focal_length, image_sensor=image_sensor, eps=eps)
+        self.fov_calculator = fov_calculator
+        self.cover_radius = np.inf if cover_radius is None else cover_radius
+        self.horizon = horizon
+        self.n_directions = n_directions
+        self.speed_meters_per_tick = speed_meters_per_tick
+        self.discount = discount
+        self.travel_weight = travel_weight
+        self.idle_weight = idle_weight
+        self.distance_weight = distance_weight
+        self.zoom_range = zoom_range
+        self.zoom_speed_per_tick = zoom_speed_per_tick
+        self.resolution_estimator = resolution_estimator
+        self.min_player_pixels = min_player_pixels
+        self.cam_pos = np.asarray(cam_pos, dtype=float)
+
+        self.intermediate_target_pos = [0, 0]
+        self.final_target = None
+        self.zoom = 1.0
+        self.agents = None
+        self.agent_velocities = None
+        self.unvisited = None
+        self._best_deltas = np.zeros((horizon, 2))
+
+    def observe(self, agents: np.ndarray, visited: np.ndarray, zoom: float = 1.0) -> None:
+        self.zoom = zoom
+        agents = np.asarray(agents, dtype=float)
+        if self.agents is None or self.agents.shape != agents.shape:
+            self.agent_velocities = np.zeros_like(agents)
+        else:
+            self.agent_velocities = agents - self.agents
+        self.agents = agents
+        self.unvisited = np.asarray(visited) == 0
+
+    def move(self, fov_corners: List[Point2D], yaw: float, pitch: float, to: Point2D = None) \
+            -> Tuple[float, float]:
+        """
+        Calculates the delta movement of the camera angle: yaw and pitch.
+
+        Args:
+            fov_corners (List[Point2D]): Corners of the field of view.
+            yaw (float): Current yaw of the camera.
+            pitch (float): Current pitch of the camera.
+            to (Point2D): Target picked by the solver, not used, the strategy picks its own targets.
+
+        Returns:
+            Tuple[float, float]: Delta yaw and delta pitch.
+        """
+        if self.agents is None or not self.unvisited.any():
+            return 0, 0
+
+        ticks = np.arange(1, self.horizon + 1)[:, None, None]
+        predicted = self.agents[self.unvisited] + ticks * self.agent_velocities[self.unvisited]
+        deltas, poses, middles, fovs = self._rollout(np.asarray(fov_corners, dtype=float), yaw, pitch, predicted)
+        scores = self._score(deltas, poses, middles, fovs, predicted)
+
+        best = int(np.argmax(scores))
+        logger.debug("MPC best candidate {} of {} with score {}", best, len(scores), scores[best])
+        self._best_deltas = deltas[best]
+        self.intermediate_target_pos = middles[best, 0]
+        self.final_target = middles[best, -1]
+        if self._samples_zoom():
+            self.zoom_command = poses[best, 0, 2]
+        return tuple(deltas[best, 0])
+
+    def _samples_zoom(self) -> bool:
+        return np.isinf(self.cover_radius)
+
+    def _rollout(self, fov_corners: np.ndarray, yaw: float, pitch: float, predicted: np.ndarray) \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Commands (candidates, horizon, 2) as
+            (delta yaw, delta pitch), poses (candidates, horizon, 3) as (yaw, pitch, zoom), FOV middles
+            (candidates, horizon, 2) and FOV corners (candidates, horizon, 4, 2) after every command.
+        """
+        n_pursuits = predicted.shape[1]
+        directions = np.linspace(0, 2 * np.pi, self.n_directions, endpoint=False)
+        constant_rates = np.concatenate([np.stack([np.cos(directions), np.sin(directions)], axis=-1),
+                                         np.zeros((1, 2))])
+        n_angular = n_pursuits + len(constant_rates) + 1
+        # every angular sequence is rolled out with every zoom rate
+        zoom_rates = np.array([0.0, -1.0, 1.0]) * self.zoom_speed_per_tick if self._samples_zoom() else np.zeros(1)
+        n_candidates = n_angular * len(zoom_rates)
+        pursuing = np.tile(np.arange(n_angular) < n_pursuits, len(zoom_rates))
+        pursued = np.tile(np.arange(n_angular), len(zoom_rates))[pursuing]
+        zoom_steps = np.repeat(zoom_rates, n_angular)
+        resolving = slice(0, n_angular) if self._samples_zoom() and self.min_player_pixels is not None else None
+
+        # angular speed limits that move the FOV middle by speed_meters_per_tick on the ground
+        middle = calc_fov_middles(fov_corners[None, :, :2])[0]
+        distance = np.hypot(*(middle - self.cam_pos[:2]))
+        height = self.cam_pos[2]
+        limits = np.degrees([self.speed_meters_per_tick / distance,
+                             self.speed_meters_per_tick * height / (height ** 2 + distance ** 2)])
+
+        warm_start = np.roll(self._best_deltas, -1, axis=0)
+        warm_start[-1] = warm_start[-2]
+        poses = np.tile([yaw, pitch, self.zoom], (n_candidates, 1)).astype(float)
+        middles = np.tile(middle, (n_candidates, 1))
+        pursuit_angles = np.stack(aim_angles(self.cam_pos, predicted), axis=-1)
+
+        deltas, all_poses, all_middles, all_fovs = [], [], [], []
+        for tick in range(self.horizon):
+            middle_angles = np.stack(aim_angles(self.cam_pos, middles[pursuing]), axis=-1)
+            pursuit = pursuit_angles[tick][pursued] - middle_angles
+            pursuit[:, 0] = (pursuit[:, 0] + 180.0) % 360.0 - 180.0
+            delta = np.empty((n_candidates, 2))
+            delta[pursuing] = pursuit / limits
+            delta[~pursuing] = np.tile(np.concatenate([constant_rates, warm_start[tick:tick + 1] / limits]),
+                                       (len(zoom_rates), 1))
+            # keep the commanded rate inside the ellipse of the speed limits
+            delta = delta / np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1.0)[:, None] * limits
+            if resolving is not None:
+                zoom_steps[resolving] = np.clip(self._resolving_zoom_gap(poses[resolving], middles[resolving],
+                                                                         predicted[tick]),
+                                                -self.zoom_speed_per_tick, self.zoom_speed_per_tick)
+            poses[:, 2] = np.clip(poses[:, 2] + zoom_steps, *self.zoom_range)
+            # the top edge of the view stays below the horizon, the wider the zoom the higher the pitch
+            min_pitch = self.fov_calculator.get_angles_of_view(poses[:, 2])[1] / 2 + 0.5
+            delta[:, 1] = np.clip(poses[:, 1] + delta[:, 1], min_pitch, 89.0) - poses[:, 1]
+            poses[:, :2] += delta
+
+            fovs = self.fov_calculator.get_points_of_fov(self.cam_pos, poses[:, 0] % 360.0, poses[:, 1],
+                                                         poses[:, 2])[..., :2]
+            middles = calc_fov_middles(fovs)
+            deltas.append(delta)
+            all_poses.append(poses.copy())
+            all_middles.append(middles)
+            all_fovs.append(fovs)
+        return (np.stack(deltas, axis=1), np.stack(all_poses, axis=1), np.stack(all_middles, axis=1),
+                np.stack(all_fovs, axis=1))
+
+    def _resolving_zoom_gap(self, poses: np.ndarray, middles: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+        """
+        Zoom change that takes the poses (n, 3) to the widest zoom of the lens that gives min_player_pixels to
+        the predicted player (m, 2) closest to their FOV middles (n, 2).
+        """
+        closest = np.argmin(np.linalg.norm(predicted[None] - middles[:, None], axis=-1), axis=1)
+        pixels = self.resolution_estimator.player_height_pixels(poses[:, 0], poses[:, 1], predicted[closest, None],
+                                                                poses[:, 2])[:, 0]
+        # pixels grow linearly with the zoom, players behind the camera ask for the closest zoom
+        with np.errstate(divide="ignore"):
+            wanted = np.clip(poses[:, 2] * self.min_player_pixels / pixels, *self.zoom_range)
+        return wanted - poses[:, 2]
+
+    def _score(self, deltas: np.ndarray, poses: np.ndarray, middles: np.ndarray, fovs: np.ndarray,
+               predicted: np.ndarray) -> np.ndarray:
+        covered = are_points_inside_tetragons(predicted[None], fovs)
+        distances = np.linalg.norm(predicted[None] - middles[:, :, None], axis=-1)
+        covered &= distances <= self.cover_radius
+        if self.min_player_pixels is not None:
+            covered &= self.resolution_estimator.player_height_pixels(
+                poses[..., 0], poses[..., 1], predicted, poses[..., 2]) >= self.min_player_pixels
+
+        # every player counts once, on the first tick it is covered
+        covered_so_far = np.logical_or.accumulate(covered, axis=1).sum(axis=-1)
+        newly_covered = np.diff(covered_so_far, axis=1, prepend=0)
+        coverage = (newly_covered * self.discount ** np.arange(self.horizon)).sum(axis=-1)
+
+        travel = np.abs(deltas).sum(axis=(1, 2))
+        idle = np.where(covered_so_far[:, -1] > 0, np.argmax(covered_so_far > 0, axis=1), self.horizon)
+        if self._samples_zoom() and self.min_player_pixels is not None:
+            # ticks the zoom still needs after the horizon to resolve the closest unvisited player
+            gap = self._resolving_zoom_gap(poses[:, -1], middles[:, -1], predicted[-1])
+            idle = idle + np.abs(gap) / self.zoom_speed_per_tick
+        closest = distances[:, -1].min(axis=-1)
+        return coverage - self.travel_weight * travel - self.idle_weight * idle - self.distance_weight * closest
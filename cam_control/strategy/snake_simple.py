@@ -91,5 +91,5 @@ class SnakeStrategySimple(Strategy):
         if to == Direction.UP:
             self.went_up_iterations_in_a_row = 0
 
-        logger.debug(f"{self.step}: Changing direction to {self.direction.name}")
+        logger.debug("{}: Changing direction to {}", self.step, self.direction.name)
         return to
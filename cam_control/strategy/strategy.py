@@ -2,10 +2,10 @@ from typing import Tuple, List, Dict
 import numpy as np
 from numpy.linalg import norm
 from strategy.core import Strategy
+from cam_control.strategy.motion_profile import MotionProfile
 from math import atan
 import math
 from loguru import logger
-from queue import Queue
 from abc import ABC, abstractmethod
 
 Point2D = Tuple[float, float] | np.array
@@ -26,7 +26,8 @@ class CameraMovementStrategy(Strategy):
     Attributes:
         trajectory (np.array): Trajectory of the camera movement.
         step (int): Current step in the trajectory.
-        gradual_movement (Queue): Queue for storing gradual movement points.
+        motion_profile (MotionProfile): Velocity profile of the gradual movement to the target.
+        profile_tick (int): Tick of the motion profile returned next.
         vert_aov (float): Vertical angle of view.
         furthest_corners (List[int]): Indices of the furthest corners of the field of view.
         debug (bool): Debug mode flag.
@@ -57,12 +58,26 @@ class CameraMovementStrategy(Strategy):
         self.step = -1
         self.eps = eps
 
-        self.gradual_movement = Queue()
+        self.motion_profile = MotionProfile(max_speed=1.0)
+        self.profile_tick = 0
         self.vert_aov = self._calculate_vert_aov(focal_length, image_sensor["height"], image_sensor["width"])
 
         self.furthest_corners = [1, 2]
         self.debug = False
         self.cam_pos = cam_pos
+        # absolute zoom commanded by the last move, None keeps the zoom the simulation picks
+        self.zoom_command = None
+
+    def observe(self, agents: np.ndarray, visited: np.ndarray, zoom: float = 1.0) -> None:
+        """
+        Called every tick before move with the observed players, for strategies that plan around them.
+
+        Args:
+            agents (np.ndarray): Player positions of shape (n, 2).
+            visited (np.ndarray): Solver visit flags of shape (n,), 0 for unvisited players.
+            zoom (float): Current zoom of the camera.
+        """
+        pass
 
     @abstractmethod
     def move(self, fov_corners: List[Point2D], yaw: float, pitch: float) \
@@ -98,8 +113,8 @@ class CameraMovementStrategy(Strategy):
                                                        cam_pitch=pitch, init_pos=cur_pos,
                                                        target_pos=target_pos)
 
-        logger.debug(f"Pitch: {pitch}+({delta_pitch}), Yaw: {yaw}+({delta_yaw})")
-        logger.debug(f"init_pos: {cur_pos}, target_pos: {target_pos}")
+        logger.debug("Pitch: {}+({}), Yaw: {}+({})", pitch, delta_pitch, yaw, delta_yaw)
+        logger.debug("init_pos: {}, target_pos: {}", cur_pos, target_pos)
         # sleep(0.5)
         return delta_yaw, delta_pitch
 
@@ -147,10 +162,10 @@ class CameraMovementStrategy(Strategy):
         delta_pitch = corrected_target_pitch - cam_pitch
 
         # Logging for debugging
-        logger.debug(f"cam_pos: {cam_pos}, target_pos: {target_pos}")
-        logger.debug(f"horizontal_distance: {horizontal_distance}, height_difference: {height_difference}")
-        logger.debug(f"target_pitch_rad: {target_pitch_rad}, target_pitch_deg: {target_pitch_deg}")
-        logger.debug(f"corrected_target_pitch: {corrected_target_pitch}, delta_pitch: {delta_pitch}")
+        logger.debug("cam_pos: {}, target_pos: {}", cam_pos, target_pos)
+        logger.debug("horizontal_distance: {}, height_difference: {}", horizontal_distance, height_difference)
+        logger.debug("target_pitch_rad: {}, target_pitch_deg: {}", target_pitch_rad, target_pitch_deg)
+        logger.debug("corrected_target_pitch: {}, delta_pitch: {}", corrected_target_pitch, delta_pitch)
 
         return delta_yaw, delta_pitch
 
@@ -197,12 +212,14 @@ class CameraMovementStrategy(Strategy):
         dist = norm(np.array(pos_1) - np.array(pos_2))
         return dist <= self.eps + 1
 
-    def _plan_gradual_movement(self, curr_pos: Point2D, target_pos: Point2D) -> Queue:
-        self.gradual_movement.empty()
+    def _plan_gradual_movement(self, curr_pos: Point2D, target_pos: Point2D) -> MotionProfile:
+        self.motion_profile.plan(curr_pos, target_pos, start_tick=self.profile_tick)
+        return self.motion_profile
 
-        n_steps = int(norm(curr_pos, target_pos))
-        print(n_steps)
-        lin_space = np.linspace(curr_pos, target_pos, n_steps)
-        for point in lin_space:
-            self.gradual_movement.put(point)
-        return self.gradual_movement
+    def _next_gradual_position(self) -> np.ndarray:
+        """
+        Position of the gradual movement for the current tick, advances the motion profile by one tick.
+        """
+        position = self.motion_profile.position(self.profile_tick)
+        self.profile_tick += 1
+        return position
@@ -0,0 +1,164 @@
+import hashlib
+import os
+from typing import Tuple, List, Dict
+
+import numpy as np
+from loguru import logger
+
+from cam_control.cam_aim import calc_fov_middles
+from cam_control.data_type import Point2D, Point3D
+from cam_control.fov_batch import BatchFOVCalculator, aim_angles
+from cam_control.strategy.strategy import CameraMovementStrategy
+
+CACHE_DIR = "cam_control/cache"
+
+
+class SweepPlanner:
+    """
+    Serpentine (boustrophedon) coverage sweep of the field in yaw/pitch space.
+
+    Sweeping the yaw at a constant pitch covers the ring between the distances where the near and the far
+    edge of the footprint cross the principal axis. Lanes are such rings: the pitch of every lane is picked
+    from the real footprints so that its near edge overlaps the previous lane's far edge by overlap of the
+    lane width, starting from the field point closest to the camera until the farthest one is covered. Every
+    lane is swept only over the yaw range where the ring intersects the field, in alternating directions,
+    and the path is sampled per tick with max_angular_speed on the slower axis.
+
+    Paths only depend on the rig and the parameters, they are computed once and cached to disk.
+
+    Args:
+        fov_calculator (BatchFOVCalculator): Calculator of the rig footprints.
+        cam_pos (Point3D): Panoramic system position.
+        field_size (Tuple[float, float]): Size of the field.
+        field_loc (Point2D): Location of the field.
+        zoom (float): Zoom of the sweep.
+        overlap (float): Overlap of neighbouring lanes as a share of the lane width.
+        max_angular_speed (float): Pan and tilt speed in degrees per tick.
+        cache_dir (str): Directory of the cached paths, None disables the cache.
+    """
+
+    def __init__(self, fov_calculator: BatchFOVCalculator, cam_pos: Point3D, field_size: Tuple[float, float],
+                 field_loc: Point2D, zoom: float = 1.0, overlap: float = 0.1, max_angular_speed: float = 1.0,
+                 cache_dir: str = CACHE_DIR):
+        self.fov_calculator = fov_calculator
+        self.cam_pos = np.asarray(cam_pos, dtype=float)
+        self.field_size = field_size
+        self.field_loc = field_loc
+        self.zoom = zoom
+        self.overlap = overlap
+        self.max_angular_speed = max_angular_speed
+        self.cache_dir = cache_dir
+
+    def plan(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (yaw, pitch) for every tick of the sweep, shape (n_ticks, 2).
+        """
+        path = self._cache_path()
+        if path is not None and os.path.exists(path):
+            return np.load(path)
+
+        lanes = self._lanes()
+        logger.info(f"Sweep with {len(lanes)} lanes at pitches {[round(pitch, 2) for pitch, _, _ in lanes]}")
+        waypoints = []
+        for i, (pitch, yaw_start, yaw_end) in enumerate(lanes):
+            if i % 2:
+                yaw_start, yaw_end = yaw_end, yaw_start
+            waypoints += [(yaw_start, pitch), (yaw_end, pitch)]
+        sweep = self._sample(np.array(waypoints))
+
+        if path is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.save(path, sweep)
+        return sweep
+
+    def _lanes(self) -> List[Tuple[float, float, float]]:
+        width, length = self.field_size
+        x = self.field_loc[0] + np.linspace(0, width, int(width) * 2 + 1)
+        y = self.field_loc[1] + np.linspace(0, length, int(length) * 2 + 1)
+        field_points = np.stack(np.meshgrid(x, y), axis=-1).reshape(-1, 2)
+        field_yaw, _ = aim_angles(self.cam_pos, field_points)
+        centre_yaw, _ = aim_angles(self.cam_pos, np.array(self.field_loc) + np.array(self.field_size) / 2)
+        field_yaw = (field_yaw - centre_yaw + 180.0) % 360.0 - 180.0
+        field_distance = np.hypot(*(field_points - self.cam_pos[:2]).T)
+
+        # ring covered by every pitch, measured on the principal axis of the real footprints
+        _, vertical_aov = self.fov_calculator.get_angles_of_view(self.zoom)
+        pitches = np.arange(vertical_aov / 2 + 0.05, 89.0, 0.01)
+        footprints = self.fov_calculator.get_points_of_fov(self.cam_pos, centre_yaw, pitches, self.zoom)
+        near = np.hypot(*((footprints[:, 0, :2] + footprints[:, 3, :2]) / 2 - self.cam_pos[:2]).T)
+        far = np.hypot(*((footprints[:, 1, :2] + footprints[:, 2, :2]) / 2 - self.cam_pos[:2]).T)
+
+        lanes = []
+        covered_to = field_distance.min()
+        while covered_to < field_distance.max():
+            # the flattest pitch whose near edge is still in front of the covered distance
+            lane = np.flatnonzero(near <= covered_to)
+            lane = lane[0] if len(lane) else len(pitches) - 1
+            in_ring = (field_distance >= near[lane]) & (field_distance <= far[lane])
+            if in_ring.any():
+                lanes.append((float(pitches[lane]), float(centre_yaw + field_yaw[in_ring].min()),
+                              float(centre_yaw + field_yaw[in_ring].max())))
+            next_covered_to = far[lane] - self.overlap * (far[lane] - near[lane])
+            if next_covered_to <= covered_to:
+                break
+            covered_to = next_covered_to
+        return lanes
+
+    def _sample(self, waypoints: np.ndarray) -> np.ndarray:
+        # pan and tilt move at the same time, the slower axis decides the number of ticks of a segment
+        ticks = [waypoints[:1]]
+        for start, end in zip(waypoints[:-1], waypoints[1:]):
+            n_ticks = max(int(np.ceil(np.abs(end - start).max() / self.max_angular_speed)), 1)
+            ticks.append(start + (end - start) * np.arange(1, n_ticks + 1)[:, None] / n_ticks)
+        sweep = np.concatenate(ticks)
+        sweep[:, 0] %= 360.0
+        return sweep
+
+    def _cache_path(self) -> str:
+        if self.cache_dir is None:
+            return None
+        fov = self.fov_calculator
+        key = repr((self.cam_pos.round(6).tolist(), fov.sensor_width, fov.sensor_height, fov.focal_length,
+                    fov.cam_offset.round(9).tolist(), fov.cam_rotation.round(9).tolist(), tuple(self.field_size),
+                    tuple(self.field_loc), self.zoom, self.overlap, self.max_angular_speed))
+        return os.path.join(self.cache_dir, f"sweep_{hashlib.sha1(key.encode()).hexdigest()[:16]}.npy")
+
+
+class SweepStrategy(CameraMovementStrategy):
+    """
+    Replays the sweep of SweepPlanner from its first pose, and starts over when it is finished. It is the
+    fallback when there is nobody to track, so the solver target is not used.
+    """
+
+    def __init__(self, field_size: Tuple[float, float], field_loc: Point2D, cam_pos: Point3D,
+                 focal_length: float, image_sensor: Dict, eps: float, fov_calculator: BatchFOVCalculator,
+                 zoom: float = 1.0, **planner_kwargs):
+        super().__init__(field_size=field_size, field_loc=field_loc,
+                         cam_pos=cam_pos, focal_length=focal_length, image_sensor=image_sensor, eps=eps)
+        self.sweep = SweepPlanner(fov_calculator, cam_pos, field_size, field_loc, zoom=zoom,
+                                  **planner_kwargs).plan()
+        footprints = fov_calculator.get_points_of_fov(cam_pos, self.sweep[:, 0], self.sweep[:, 1], zoom)
+        self.sweep_middles = calc_fov_middles(footprints[..., :2])
+        self.intermediate_target_pos = self.sweep_middles[0]
+        self.final_target = self.sweep_middles[-1]
+
+    def move(self, fov_corners: List[Point2D], yaw: float, pitch: float, to: Point2D = None) \
+            -> Tuple[float, float]:
+        """
+        Calculates the delta movement of the camera angle: yaw and pitch.
+
+        Args:
+            fov_corners (List[Point2D]): Corners of the field of view.
+            yaw (float): Current yaw of the camera.
+            pitch (float): Current pitch of the camera.
+            to (Point2D): Target picked by the solver, not used.
+
+        Returns:
+            Tuple[float, float]: Delta yaw and delta pitch.
+        """
+        self.step = (self.step + 1) % len(self.sweep)
+        target_yaw, target_pitch = self.sweep[self.step]
+        self.intermediate_target_pos = self.sweep_middles[self.step]
+        delta_yaw = (target_yaw - yaw + 180.0) % 360.0 - 180.0
+        return delta_yaw, target_pitch - pitch
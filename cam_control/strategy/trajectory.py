@@ -2,6 +2,7 @@ from cam_control.strategy.strategy import CameraMovementStrategy
 import numpy as np
 from typing import Tuple, List, Dict
 from loguru import logger
+from cam_control.cam_aim import calc_fov_middle
 from cam_control.data_type import Point2D, Point3D
 
 
@@ -10,13 +11,19 @@ class TrajectoryStrategy(CameraMovementStrategy):
                                  [90, 40], [90, 60], [60, 60], [60, 80], [90, 80]])
 
     def __init__(self, field_size: Tuple[float, float], field_loc: Point2D, cam_pos: Point3D,
-                 focal_length: float, image_sensor: Dict, trajectory: np.ndarray = SNAKE_TRAJECTORY):
+                 focal_length: float, image_sensor: Dict, eps: float, trajectory: np.ndarray = SNAKE_TRAJECTORY):
         super().__init__(field_size=field_size, field_loc=field_loc,
-                         cam_pos=cam_pos, focal_length=focal_length, image_sensor=image_sensor)
+                         cam_pos=cam_pos, focal_length=focal_length, image_sensor=image_sensor, eps=eps)
 
         self.trajectory = trajectory
         self.trajectory = np.concatenate([self.trajectory, self.trajectory[::-1]])
-        self._change_target_pos(cam_pos[:2])
+        # the camera is first brought to the start of the trajectory, from wherever it aims on the first move
+        self.step = 0
+        self.curr_target_pos = self.trajectory[0]
+        self.intermediate_target_pos = self.trajectory[0]
+        self.final_target = self.curr_target_pos
+        self.started = False
+        self.last_delta = (0.0, 0.0)
 
     def get_trajectory(self) -> np.array:
         """
@@ -27,7 +34,7 @@ class TrajectoryStrategy(CameraMovementStrategy):
         """
         return self.trajectory
 
-    def move(self, fov_corners: List[Point2D], yaw: float, pitch: float) \
+    def move(self, fov_corners: List[Point2D], yaw: float, pitch: float, to: Point2D = None) \
             -> Tuple[float, float]:
         """
         Calculates the delta movement of the camera angle: yaw and pitch.
@@ -36,27 +43,40 @@ class TrajectoryStrategy(CameraMovementStrategy):
             fov_corners (List[Point2D]): Corners of the field of view.
             yaw (float): Current yaw of the camera.
             pitch (float): Current pitch of the camera.
+            to (Point2D): Target picked by the solver, not used, the trajectory is fixed.
 
         Returns:
             Tuple[float, float]: Delta yaw and delta pitch.
         """
-        corner1, corner2 = np.array(fov_corners)[self.furthest_corners]
-        principal_axis_intersection = (corner1[0] + corner2[0]) / 2, (corner1[1] + corner2[1]) / 2
+        # the point _move steers, arrival is checked on it as well
+        cur_pos = calc_fov_middle(fov_corners)
 
-        if self._close_enough(principal_axis_intersection, self.curr_target_pos):
-            self._change_target_pos()
+        if not self.started:
+            self.started = True
+            self._plan_gradual_movement(cur_pos, self.curr_target_pos)
+        elif self._close_enough(cur_pos, self.curr_target_pos) or self._settled():
+            self._change_target_pos(cur_pos)
 
-        intermediate_target_pos = self.gradual_movement.get(block=True)
+        self.intermediate_target_pos = self._next_gradual_position()
+        self.final_target = self.curr_target_pos
 
-        delta_yaw, delta_pitch = self._move(principal_axis_intersection, intermediate_target_pos, yaw, pitch)
+        delta_yaw, delta_pitch = self._move(cur_pos, self.intermediate_target_pos, yaw, pitch)
+        self.last_delta = (delta_yaw, delta_pitch)
         return delta_yaw, delta_pitch
 
+    def _settled(self, tolerance: float = 1e-3) -> bool:
+        # _move sets the pitch from the distance to the target, far waypoints leave the FOV middle short of or
+        # beyond them, the camera is as close as it gets once the move is over and it stopped turning
+        return (self.motion_profile.finished(self.profile_tick)
+                and abs(self.last_delta[0]) < tolerance and abs(self.last_delta[1]) < tolerance)
+
     def _change_target_pos(self, prev_target_pos: Point2D = None) -> None:
         """
         Change the target position for the camera movement.
 
         Args:
-            prev_target_pos (Point2D, optional): Previous target position. Defaults to None.
+            prev_target_pos (Point2D, optional): Start of the move to the next target, the previous target
+                position if None.
         """
         if prev_target_pos is None:
             self.prev_target_pos = self.curr_target_pos
@@ -65,8 +85,6 @@ class TrajectoryStrategy(CameraMovementStrategy):
 
         self.step = (self.step + 1) % len(self.trajectory)
         self.curr_target_pos = self.trajectory[self.step]
-        self.gradual_movement.empty()
-
         self._plan_gradual_movement(self.prev_target_pos, self.curr_target_pos)
-        logger.info(f"Switched to target position: {self.curr_target_pos}")
+        logger.info("Switched to target position: {}", self.curr_target_pos)
 
@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# "tick" keeps a record per tick, "debug" also logs every record at the debug level
+TRACE_LEVELS = {"off": 0, "tick": 1, "debug": 2}
+TRACE_STAGES = ("fov", "players", "detection", "solver", "strategy", "plot")
+TRACE_DTYPE = np.dtype([
+    ("tick", np.int64), ("frame", np.int64),
+    ("yaw", np.float32), ("pitch", np.float32), ("zoom", np.float32),
+    ("aim_x", np.float32), ("aim_y", np.float32), ("target_x", np.float32), ("target_y", np.float32),
+    ("n_inside_fov", np.int16), ("n_unvisited", np.int16),
+    *((f"{stage}_ms", np.float32) for stage in TRACE_STAGES),
+])
+
+
+class Tracer:
+    """
+    Per-tick structured records of the control loop in a preallocated ring buffer.
+
+    A tick is opened with begin(), filled with record() and stage() and closed with end(); fields that are not
+    set stay NaN (or -1 for counters). Nothing is formatted while tracing: the buffer is a numpy structured
+    array and is only converted to a DataFrame by to_frame() or dump(). When the level is "off" every call
+    returns right away, the level can be changed at any time with set_level().
+
+    Args:
+        capacity (int): Number of the most recent ticks kept.
+        level (str): One of TRACE_LEVELS, by default from the CAM_TRACE environment variable or "off".
+    """
+
+    def __init__(self, capacity: int = 1 << 16, level: str = None):
+        self.records = np.zeros(capacity, dtype=TRACE_DTYPE)
+        self.count = 0
+        self._row = None
+        self.set_level(level or os.environ.get("CAM_TRACE", "off"))
+
+    def set_level(self, level: str) -> None:
+        assert level in TRACE_LEVELS, f"unknown trace level {level}, expected one of {tuple(TRACE_LEVELS)}"
+        self.level = TRACE_LEVELS[level]
+
+    @property
+    def enabled(self) -> bool:
+        return self.level > 0
+
+    def begin(self, tick: int, frame: int) -> None:
+        if not self.level:
+            self._row = None
+            return
+        self._row = self.count % len(self.records)
+        self.count += 1
+        record = self.records[self._row]
+        for name in TRACE_DTYPE.names:
+            record[name] = -1 if TRACE_DTYPE[name].kind == "i" else np.nan
+        record["tick"] = tick
+        record["frame"] = frame
+
+    def record(self, **fields) -> None:
+        if self._row is None:
+            return
+        record = self.records[self._row]
+        for name, value in fields.items():
+            record[name] = value
+
+    def stage(self, stage: str, seconds: float) -> None:
+        if self._row is not None:
+            self.records[self._row][f"{stage}_ms"] = 1000 * seconds
+
+    def end(self) -> None:
+        if self._row is not None and self.level > 1:
+            logger.opt(lazy=True).debug("Trace {}", lambda row=self._row: self._format(row))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Stored records from the oldest to the newest.
+        """
+        capacity = len(self.records)
+        if self.count <= capacity:
+            records = self.records[:self.count]
+        else:
+            start = self.count % capacity
+            records = np.concatenate([self.records[start:], self.records[:start]])
+        return pd.DataFrame.from_records(records)
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the stored records to a Parquet file, requires pyarrow or fastparquet.
+        """
+        self.to_frame().to_parquet(path, index=False)
+        logger.info("Dumped {} trace records to {}", min(self.count, len(self.records)), path)
+
+    def _format(self, row: int) -> str:
+        record = self.records[row]
+        return ", ".join(f"{name}={record[name]}" for name in TRACE_DTYPE.names)
@@ -5,27 +5,80 @@ import numpy as np
 from numpy.linalg import norm
 
 
+VISIT_MODES = ("aim", "fov")
+
+
+def visible_agents(seen: np.ndarray, hidden: np.ndarray = None) -> np.ndarray:
+    """
+    Args:
+        seen: np.ndarray[bool], agents in view
+        hidden: np.ndarray[bool], agents occluded by other agents
+    Returns: np.ndarray[bool], a new mask of the seen agents that are not hidden, the given masks are not modified
+    """
+    visible = np.array(seen, dtype=bool)
+    if hidden is not None:
+        visible &= ~hidden
+    return visible
+
+
 class NeighborSolver:
-    def __init__(self, n_observed_agents: int, eps: float):
+    """
+    Greedy solver that moves the camera to the closest unvisited agent.
+
+    In "aim" visit mode an agent is visited when the camera aim is within eps of it. In "fov" visit mode every
+    agent inside the frame is visited at once, and the solver retargets to the nearest cluster of unvisited
+    agents: the unvisited agents within cluster_radius of an unvisited agent, the cheapest cluster has the
+    lowest distance per agent.
+    """
+
+    def __init__(self, n_observed_agents: int, eps: float, visit_mode: str = "aim", cluster_radius: float = 10.0):
+        assert visit_mode in VISIT_MODES, f"unknown visit mode {visit_mode}, expected one of {VISIT_MODES}"
         self.visited_agents = np.zeros(n_observed_agents)
         self.eps = eps
+        self.visit_mode = visit_mode
+        self.cluster_radius = cluster_radius
 
 
-    def determine_next_position(self, cur_pos: Point2D, agents: np.ndarray[Point2D]) -> Point2D:
+    def determine_next_position(self, cur_pos: Point2D, agents: np.ndarray[Point2D],
+                                hidden: np.ndarray = None, inside_fov: np.ndarray = None,
+                                ball: Point2D = None) -> Point2D:
         """
         Args:
             cur_pos: Tuple[float, float]
             agents: np.ndarray[Point2D]
+            hidden: np.ndarray[bool], agents occluded by other agents, they are not marked as visited
+            inside_fov: np.ndarray[bool], agents seen in the frame, required in "fov" visit mode
+            ball: Tuple[float, float], ball position, not used
         Returns: Tuple[float] (x,y)
         """
+        if self.visit_mode == "fov":
+            return self._determine_next_cluster(np.array(cur_pos), agents, hidden, inside_fov)
 
         agent_index, closest_point = self._find_closest_agent(np.array(cur_pos), agents)
         if agent_index is None:
             return cur_pos
-        self._update_visited_agents(agent_index, agents[agent_index], cur_pos)
-        logger.debug(f"Moving to agent #{agent_index} with position {closest_point}")
+        if hidden is None or not hidden[agent_index]:
+            self._update_visited_agents(agent_index, agents[agent_index], cur_pos)
+        logger.debug("Moving to agent #{} with position {}", agent_index, closest_point)
         return closest_point
 
+    def _determine_next_cluster(self, cur_pos: Point2D, agents: np.ndarray[Point2D], hidden: np.ndarray,
+                                inside_fov: np.ndarray) -> Point2D:
+        self.visited_agents[visible_agents(inside_fov, hidden)] = 1
+
+        unvisited_agents = agents[self.visited_agents == 0]
+        if len(unvisited_agents) == 0:
+            return cur_pos
+
+        in_cluster = norm(unvisited_agents[:, None] - unvisited_agents[None], axis=-1) <= self.cluster_radius
+        cluster_size = in_cluster.sum(axis=1)
+        cluster_middle = in_cluster @ unvisited_agents / cluster_size[:, None]
+        cost = norm(cluster_middle - cur_pos, axis=1) / cluster_size
+        closest_cluster = np.argmin(cost)
+        logger.debug("Moving to cluster of {} agents with middle {}", cluster_size[closest_cluster],
+                     cluster_middle[closest_cluster])
+        return cluster_middle[closest_cluster]
+
     def get_number_of_unvisited_agents(self):
         return np.sum(self.visited_agents == 0)
 
@@ -0,0 +1,157 @@
+from typing import Dict, Tuple
+
+import numpy as np
+from loguru import logger
+
+from cam_control.cam_aim import calc_fov_middles
+from cam_control.data_type import Point2D, Point3D
+from cam_control.fov_batch import BatchFOVCalculator, aim_angles
+from cam_control.player_detect import are_points_inside_tetragons
+from cam_control.tsp_solver.neighbor import visible_agents
+
+
+class PoseTable:
+    """
+    Discretized camera poses with their precomputed ground footprints.
+
+    Yaw and pitch are sampled over the range that aims the FOV middle at the field, with a step of
+    (1 - overlap) of the angle of view at every zoom level. Poses whose footprint does not fully hit the
+    ground or whose middle is off the field are dropped. Tables only depend on the rig and the grid, so they
+    are cached and shared by every episode.
+
+    Attributes:
+        cam_pos (np.ndarray): Panoramic system position.
+        poses (np.ndarray): (yaw, pitch, zoom) of shape (n_poses, 3).
+        footprints (np.ndarray): FOV corners of shape (n_poses, 4, 2).
+        middles (np.ndarray): FOV middles of shape (n_poses, 2).
+        middle_angles (np.ndarray): (yaw, pitch) that aims the optical axis at the middles, shape (n_poses, 2).
+    """
+
+    _cache: Dict[Tuple, "PoseTable"] = {}
+
+    def __init__(self, fov_calculator: BatchFOVCalculator, cam_pos: Point3D, field_size: Tuple[float, float],
+                 field_loc: Point2D, zoom_levels: Tuple[float, ...] = (1.0,), overlap: float = 0.5):
+        cam_pos = np.asarray(cam_pos, dtype=float)
+        width, length = field_size
+        field_corners = np.array(field_loc) + np.array([[0, 0], [width, 0], [width, length], [0, length]])
+        corner_yaw, _ = aim_angles(cam_pos, field_corners)
+        centre_yaw, _ = aim_angles(cam_pos, np.array(field_loc) + np.array(field_size) / 2)
+        relative_yaw = (corner_yaw - centre_yaw + 180.0) % 360.0 - 180.0
+        _, max_pitch = aim_angles(cam_pos, np.clip(cam_pos[:2], field_corners[0], field_corners[2]))
+
+        poses = []
+        for zoom in zoom_levels:
+            horizontal_aov, vertical_aov = fov_calculator.get_angles_of_view(zoom)
+            yaw_step, pitch_step = (1 - overlap) * horizontal_aov, (1 - overlap) * vertical_aov
+            yaws = centre_yaw + np.arange(relative_yaw.min(), relative_yaw.max() + yaw_step, yaw_step)
+            # the far edge of the FOV has to stay below the horizon
+            pitches = np.arange(vertical_aov / 2 + pitch_step / 2, min(max_pitch, 89.0) + pitch_step, pitch_step)
+            yaw_grid, pitch_grid = np.meshgrid(yaws % 360.0, pitches, indexing="ij")
+            poses.append(np.stack([yaw_grid.ravel(), pitch_grid.ravel(), np.full(yaw_grid.size, zoom)], axis=-1))
+        poses = np.concatenate(poses)
+
+        footprints = fov_calculator.get_points_of_fov(cam_pos, poses[:, 0], poses[:, 1], poses[:, 2])
+        on_ground = np.all(np.abs(footprints[..., :2]) < 10 * max(field_size), axis=(1, 2))
+        footprints = footprints[on_ground, :, :2]
+        middles = calc_fov_middles(footprints)
+        on_field = np.all((middles >= field_corners[0]) & (middles <= field_corners[2]), axis=1)
+
+        self.cam_pos = cam_pos
+        self.poses = poses[on_ground][on_field]
+        self.footprints = footprints[on_field]
+        self.middles = middles[on_field]
+        self.middle_angles = np.stack(aim_angles(cam_pos, self.middles), axis=-1)
+        logger.info(f"Pose table with {len(self.poses)} poses")
+
+    @classmethod
+    def from_fov_calculator(cls, fov_calculator, zoom_levels: Tuple[float, ...] = (1.0,),
+                            overlap: float = 0.5) -> "PoseTable":
+        """
+        Pose table for the rig loaded by FOVCalculator, built once per rig and grid.
+        """
+        cam_pos, field_size, field_loc = (fov_calculator.get_cam_pos(), fov_calculator.get_field_size(),
+                                          fov_calculator.get_field_loc())
+        key = (tuple(cam_pos), fov_calculator.get_focal_length(),
+               tuple(fov_calculator.get_image_sensor().items()), tuple(field_size), tuple(field_loc),
+               tuple(zoom_levels), overlap)
+        if key not in cls._cache:
+            cls._cache[key] = cls(BatchFOVCalculator.from_fov_calculator(fov_calculator), cam_pos, field_size,
+                                  field_loc, zoom_levels=zoom_levels, overlap=overlap)
+        return cls._cache[key]
+
+
+class SetCoverSolver:
+    """
+    Plans over camera poses instead of players.
+
+    Every player inside the frame is visited, as in the "fov" visit mode of NeighborSolver. The solver keeps
+    an ordered plan of poses from the pose table that together see every unvisited player, built by a greedy
+    set cover in which the next pose maximizes newly covered players per degree of angular travel from the
+    previous pose (plus pose_cost for the stop itself). The plan is rebuilt when its first pose no longer
+    covers any unvisited player, and the middle of the first pose is returned as the target.
+
+    Args:
+        n_observed_agents (int): Number of players.
+        pose_table (PoseTable): Candidate poses.
+        pose_cost (float): Cost of a stop in degrees of angular travel.
+    """
+
+    visit_mode = "fov"
+
+    def __init__(self, n_observed_agents: int, pose_table: PoseTable, pose_cost: float = 1.0):
+        self.visited_agents = np.zeros(n_observed_agents)
+        self.pose_table = pose_table
+        self.pose_cost = pose_cost
+        self.plan = []
+
+    def determine_next_position(self, cur_pos: Point2D, agents: np.ndarray[Point2D],
+                                hidden: np.ndarray = None, inside_fov: np.ndarray = None,
+                                ball: Point2D = None) -> Point2D:
+        """
+        Args:
+            cur_pos: Tuple[float, float]
+            agents: np.ndarray[Point2D]
+            hidden: np.ndarray[bool], agents occluded by other agents, they are not marked as visited
+            inside_fov: np.ndarray[bool], agents seen in the frame
+            ball: Tuple[float, float], ball position, not used
+        Returns: Tuple[float] (x,y)
+        """
+        if inside_fov is not None:
+            self.visited_agents[visible_agents(inside_fov, hidden)] = 1
+
+        unvisited_agents = np.asarray(agents)[self.visited_agents == 0]
+        if len(unvisited_agents) == 0:
+            return cur_pos
+
+        if not self.plan or not are_points_inside_tetragons(unvisited_agents,
+                                                            self.pose_table.footprints[self.plan[0]]).any():
+            self.plan = self._plan(np.asarray(cur_pos, dtype=float), unvisited_agents)
+            logger.debug("Planned {} poses to cover {} players", len(self.plan), len(unvisited_agents))
+        if not self.plan:
+            # nobody left that a pose from the table sees, go to the closest player directly
+            return unvisited_agents[np.argmin(np.linalg.norm(unvisited_agents - np.asarray(cur_pos), axis=1))]
+        return self.pose_table.middles[self.plan[0]]
+
+    def get_number_of_unvisited_agents(self):
+        return np.sum(self.visited_agents == 0)
+
+    def _plan(self, cur_pos: np.ndarray, agents: np.ndarray) -> list:
+        covers = are_points_inside_tetragons(agents, self.pose_table.footprints)
+        uncovered = covers.any(axis=0)
+        angles = np.stack(aim_angles(self.pose_table.cam_pos, cur_pos), axis=-1)
+
+        plan = []
+        while uncovered.any():
+            gain = (covers & uncovered).sum(axis=1)
+            travel = self._angular_distance(angles, self.pose_table.middle_angles)
+            best = int(np.argmax(gain / (travel + self.pose_cost)))
+            plan.append(best)
+            uncovered &= ~covers[best]
+            angles = self.pose_table.middle_angles[best]
+        return plan
+
+    @staticmethod
+    def _angular_distance(angles: np.ndarray, other_angles: np.ndarray) -> np.ndarray:
+        # pan and tilt move at the same time, so the slower axis decides
+        delta_yaw = np.abs((other_angles[..., 0] - angles[..., 0] + 180.0) % 360.0 - 180.0)
+        return np.maximum(delta_yaw, np.abs(other_angles[..., 1] - angles[..., 1]))
@@ -0,0 +1,69 @@
+"""
+Parallel MP4 export of rendered frames.
+
+The frame range is split into contiguous segments that worker processes render with their own frame source
+and pipe as raw RGB frames to ffmpeg (imageio-ffmpeg), the segments are then concatenated without re-encoding.
+"""
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List
+
+import imageio_ffmpeg
+import numpy as np
+
+# a frame source maps a frame index to a (height, width, 3) uint8 image
+FrameSource = Callable[[int], np.ndarray]
+
+
+def render_segment(source_factory: Callable[[], FrameSource], start: int, stop: int, path: str, fps: float) -> str:
+    source = source_factory()
+    writer = None
+    for i in range(start, stop):
+        frame = np.ascontiguousarray(source(i))
+        if writer is None:
+            writer = imageio_ffmpeg.write_frames(path, size=(frame.shape[1], frame.shape[0]), fps=fps,
+                                                 codec="libx264", macro_block_size=1,
+                                                 ffmpeg_log_level="error")
+            writer.send(None)
+        writer.send(frame)
+    if writer is not None:
+        writer.close()
+    return path
+
+
+def concat_segments(paths: List[str], output: str) -> None:
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        listing.writelines(f"file '{os.path.abspath(path)}'\n" for path in paths)
+    try:
+        subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                        "-i", listing.name, "-c", "copy", output], check=True)
+    finally:
+        os.remove(listing.name)
+
+
+def render_parallel(source_factory: Callable[[], FrameSource], n_frames: int, output: str, fps: float,
+                    n_jobs: int = None) -> None:
+    """
+    Renders frames 0 to n_frames - 1 of the sources made by source_factory to an MP4 file, in n_jobs processes.
+
+    Args:
+        source_factory (Callable): Picklable callable that makes the frame source of a worker, e.g. a partial.
+        n_frames (int): Number of frames.
+        output (str): MP4 file.
+        fps (float): Frames per second of the video.
+        n_jobs (int): Number of worker processes, by default the number of CPUs.
+    """
+    n_jobs = max(1, min(n_jobs or os.cpu_count(), n_frames))
+    bounds = np.linspace(0, n_frames, n_jobs + 1).astype(int)
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(output) or ".") as segment_dir:
+        paths = [os.path.join(segment_dir, f"segment_{i:03d}.mp4") for i in range(n_jobs)]
+        jobs = [(source_factory, start, stop, path, fps) for start, stop, path in zip(bounds[:-1], bounds[1:], paths)]
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                list(executor.map(render_segment, *zip(*jobs)))
+        else:
+            render_segment(*jobs[0])
+        concat_segments(paths, output)
@@ -4,20 +4,28 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 
 from cam_control.simulation import CamSimulation
+from cam_control.profiling import StageProfiler, profiling_enabled
 from loguru import logger as log
 
 N = 100
+# with CAM_PROFILE=1 stage durations are collected, with cProfile statistics of the slowest ticks of every run
+PROFILE_SLOWEST = 5
 
 if __name__ == "__main__":
     scores = []
     start_from_frame = 0
+    profile = profiling_enabled()
+    profiler = StageProfiler(n_slowest=PROFILE_SLOWEST) if profile else None
 
     for i in range(N):
         log.info(f"Iteration {i + 1} of {N}")
-        sim = CamSimulation(random_seed=i, start_from_frame=start_from_frame, plot=False)
+        sim = CamSimulation(random_seed=i, start_from_frame=start_from_frame, plot=False, profile=profile,
+                            profile_slowest=PROFILE_SLOWEST if profile else 0)
         score = sim.simulate()
         scores.append(score)
         start_from_frame += score
+        if profiler is not None:
+            profiler.merge(sim.profiler)
 
     scores_seconds = np.array(scores) / 25.0
     sns.histplot(scores_seconds, kde=True)
@@ -25,5 +33,9 @@ if __name__ == "__main__":
     plt.savefig("scores_histogram.svg", format="svg", bbox_inches="tight")
 
     np.savetxt("scores_seconds.txt", scores_seconds)
+    if profiler is not None:
+        profiler.export("profile_summary.json")
+        profiler.export("profile_summary.csv")
+        profiler.log_summary()
     avg_score = np.mean(scores)
     log.success(f"Average score of algorithm for N={N} is {avg_score} \nStats: {pd.Series(scores).describe()}")
@@ -1,108 +1,108 @@
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-import warnings 
-warnings.filterwarnings("ignore")
-
-df_sim = pd.read_csv('soccer_sim.csv')
-df_game = pd.read_csv('heatmaps/clear_data.csv')
-df_game = df_game[df_game['Period'] == 1]
-
-def calculate_player_stats_sim(player_id: int, team: str, dt: float, sim_num: int):
-    filename = f'soccer_simulations/soccer_sim_{sim_num}.csv'
-
-    df_sim = pd.read_csv(filename)
-    player_df = df_sim[(df_sim['Player'] == player_id) & (df_sim['Team'] == team)]
-
-    player_df['Vx'] = player_df['X'].diff() / dt
-    player_df['Vy'] = player_df['Y'].diff() / dt
-
-    player_df['Speed'] = np.sqrt(player_df['Vx']**2 + player_df['Vy']**2)
-
-    mean_speed = player_df['Speed'].mean()
-    speed_variance = player_df['Speed'].var()
-
-    player_df['Direction_X'] = np.arctan2(player_df['Vy'], player_df['Vx'])
-    player_df['Direction_Y'] = np.arctan2(player_df['Vy'], player_df['Vx'])
-
-    avg_direction_vector = [player_df['Direction_X'].mean(), player_df['Direction_Y'].mean()]
-
-    return mean_speed, speed_variance, avg_direction_vector
-
-def calculate_player_stats_game(player_id: str, dt: float):
-    player_df = df_game[['Time [s]', player_id + '_x', player_id + '_y']]
-
-    player_df['Vx'] = player_df[player_id + '_x'].diff() / dt
-    player_df['Vy'] = player_df[player_id + '_y'].diff() / dt
-
-    player_df['Speed'] = np.sqrt(player_df['Vx']**2 + player_df['Vy']**2)
-
-    mean_speed = player_df['Speed'].mean()
-    speed_variance = player_df['Speed'].var()
+from heatmaps.tracking_cache import load_tracking
 
-    player_df['Direction_X'] = np.arctan2(player_df['Vy'], player_df['Vx'])
-    player_df['Direction_Y'] = np.arctan2(player_df['Vy'], player_df['Vy'])
-
-    avg_direction_vector = [player_df['Direction_X'].mean(), player_df['Direction_Y'].mean()]
-
-    return mean_speed, speed_variance, avg_direction_vector
-
-def calculate_all_players_stats(dt: float, num_sims: int):
-    player_teams = df_sim[['Player', 'Team']].drop_duplicates().values
-    avg_stats_sim = []
-
-    avg_stats_sim = pd.DataFrame(columns=['Player_id', 'Team', 'Mean', 'Variance', 'Direction'])
-    stats_df_game = pd.DataFrame(columns=['Player_id', 'Mean', 'Variance', 'Direction'])
-
-    for player_id, team in player_teams:
-        mean_speed_sum = 0
-        speed_variance_sum = 0
-        avg_direction_vector_sum = np.zeros(2)
-        
-        for sim_number in range(1, num_sims + 1):
-            mean_speed_sim, speed_variance_sim, avg_direction_vector_sim = calculate_player_stats_sim(player_id, team, dt, sim_number)
-            
-            mean_speed_sum += mean_speed_sim
-            speed_variance_sum += speed_variance_sim
-            avg_direction_vector_sum += np.array(avg_direction_vector_sim)
-        
-        num_sims_float = float(num_sims)
-        avg_mean_speed = mean_speed_sum / num_sims_float
-        avg_speed_variance = speed_variance_sum / num_sims_float
-        avg_direction_vector = avg_direction_vector_sum / num_sims_float
-
-        new_row = pd.DataFrame({
-            'Player_id': [f"Player{player_id + 1}"],
-            'Team': [team],
-            'Mean': [mean_speed_sim],
-            'Variance': [speed_variance_sim],
-            'Direction': [avg_direction_vector_sim]
-        })
-
-        avg_stats_sim = pd.concat([avg_stats_sim, new_row], ignore_index=True) 
-
-    for i in range(1, 23):
-        player_id_game = 'Player' + str(i)
-        mean_speed_game, speed_variance_game, avg_direction_vector_game = calculate_player_stats_game(player_id_game, dt)
-
-        new_row = pd.DataFrame({
-            'Player_id': [player_id_game],
-            'Mean': [mean_speed_game],
-            'Variance': [speed_variance_game],
-            'Direction': [avg_direction_vector_game]
-        })
-
-        stats_df_game = pd.concat([stats_df_game, new_row], ignore_index=True)
-
-    return avg_stats_sim, stats_df_game
-
-dt = 0.04
-num_sims = 20
-stats_df_sim, stats_df_game = calculate_all_players_stats(dt, num_sims)  
-stats_df_sim['Player_id'] = stats_df_game['Player_id']
-stats_df_sim.drop(['Team'], axis=1, inplace=True)
-stats_df_sim.to_csv('results/stats_sim.csv', index=False)
-stats_df_game.to_csv('results/stats_game.csv', index=False)
-print("Simulation Stats:\n", stats_df_sim)
-print("Game Stats:\n", stats_df_game)
+import warnings
+warnings.filterwarnings("ignore")
 
+SIM_COLUMNS = ['Frame', 'Team', 'Player', 'X', 'Y']
+N_GAME_PLAYERS = 22
+
+
+def load_simulation(sim_num: int) -> pd.DataFrame:
+    return pd.read_csv(f'soccer_simulations/soccer_sim_{sim_num}.csv', usecols=SIM_COLUMNS)
+
+
+def load_game(period: int = 1) -> pd.DataFrame:
+    return load_tracking().xs(period, level='Period')
+
+
+def calculate_sim_stats(sim_num: int, dt: float) -> pd.DataFrame:
+    """
+    Speed mean and variance and mean heading of every player of a simulation, from a single read of its CSV.
+
+    :return: DataFrame indexed by (Team, Player) in the order of the CSV with Mean, Variance and Direction columns
+    """
+    df_sim = load_simulation(sim_num)
+    players = df_sim.groupby(['Team', 'Player'], sort=False)
+    velocity = players[['X', 'Y']].diff().to_numpy() / dt
+
+    df_sim['Speed'] = np.hypot(velocity[:, 0], velocity[:, 1])
+    df_sim['Direction'] = np.arctan2(velocity[:, 1], velocity[:, 0])
+    return players.agg(Mean=('Speed', 'mean'), Variance=('Speed', 'var'), Direction=('Direction', 'mean'))
+
+
+def calculate_game_stats(df_game: pd.DataFrame, dt: float) -> pd.DataFrame:
+    """
+    The same statistics for the players of the real game, all players at once.
+    """
+    player_ids = [f'Player{i}' for i in range(1, N_GAME_PLAYERS + 1)]
+    x = df_game[[f'{player_id}_x' for player_id in player_ids]].to_numpy(dtype=float)
+    y = df_game[[f'{player_id}_y' for player_id in player_ids]].to_numpy(dtype=float)
+    vx = np.diff(x, axis=0) / dt
+    vy = np.diff(y, axis=0) / dt
+
+    speed = np.hypot(vx, vy)
+    return pd.DataFrame({
+        'Player_id': player_ids,
+        'Mean': np.nanmean(speed, axis=0),
+        'Variance': np.nanvar(speed, axis=0, ddof=1),
+        'Direction': np.nanmean(np.arctan2(vy, vx), axis=0),
+    })
+
+
+def calculate_all_players_stats(dt: float, num_sims: int, n_jobs: int = None):
+    """
+    Statistics of every player averaged over the simulations 1 to num_sims and the statistics of the real game.
+    """
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        per_sim = list(executor.map(partial(calculate_sim_stats, dt=dt), range(1, num_sims + 1)))
+    avg_stats = pd.concat(per_sim).groupby(level=['Team', 'Player'], sort=False).mean()
+
+    stats_df_sim = pd.DataFrame({
+        'Player_id': [f"Player{player_id + 1}" for _, player_id in avg_stats.index],
+        'Team': avg_stats.index.get_level_values('Team'),
+        'Mean': avg_stats['Mean'].to_numpy(),
+        'Variance': avg_stats['Variance'].to_numpy(),
+        'Direction': avg_stats['Direction'].to_numpy(),
+    })
+    return stats_df_sim, calculate_game_stats(load_game(), dt)
+
+
+def compare_stats(stats_df_sim: pd.DataFrame, stats_df_game: pd.DataFrame) -> pd.DataFrame:
+    """
+    Simulated against real statistics, the players are matched by their position in the tables.
+    """
+    columns = ['Mean', 'Variance', 'Direction']
+    sim = stats_df_sim[columns].to_numpy()
+    game = stats_df_game[columns].to_numpy()
+    comparison = pd.DataFrame({'Player_id': stats_df_game['Player_id'].to_numpy()})
+    for i, column in enumerate(columns):
+        comparison[f'{column}_sim'] = sim[:, i]
+        comparison[f'{column}_game'] = game[:, i]
+        comparison[f'{column}_diff'] = sim[:, i] - game[:, i]
+    return comparison
+
+
+def _direction_vectors(stats_df: pd.DataFrame) -> pd.DataFrame:
+    # the tables keep the mean heading in both components of the Direction column
+    stats_df = stats_df.copy()
+    stats_df['Direction'] = [[direction, direction] for direction in stats_df['Direction']]
+    return stats_df
+
+
+if __name__ == '__main__':
+    dt = 0.04
+    num_sims = 20
+    stats_df_sim, stats_df_game = calculate_all_players_stats(dt, num_sims)
+    comparison = compare_stats(stats_df_sim, stats_df_game)
+    stats_df_sim['Player_id'] = stats_df_game['Player_id']
+    stats_df_sim.drop(['Team'], axis=1, inplace=True)
+    _direction_vectors(stats_df_sim).to_csv('results/stats_sim.csv', index=False)
+    _direction_vectors(stats_df_game).to_csv('results/stats_game.csv', index=False)
+    print("Simulation Stats:\n", stats_df_sim)
+    print("Game Stats:\n", stats_df_game)
+    print("Simulation - Game:\n", comparison)
@@ -0,0 +1,126 @@
+"""
+Heatmaps of all players at once.
+
+Positions of shape (frames, players) are binned in a single np.bincount pass into a (players, W, H) tensor of
+counts, with the bin edges of np.histogram2d. Window sums over the counts come from integral images and the
+count tensors are cached on disk, keyed by a hash of the positions and the binning.
+"""
+import hashlib
+import os
+from typing import Tuple
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         "cam_control", "cache", "heatmaps")
+
+
+def bin_positions(x: np.ndarray, y: np.ndarray, bins: Tuple[int, int],
+                  extent: Tuple[Tuple[float, float], Tuple[float, float]]) -> np.ndarray:
+    """
+    Counts of positions per cell, the same as np.histogram2d(x[:, p], y[:, p], bins, extent) for every player p.
+
+    :param x: x coordinates, (frames, players), NaN for missing positions
+    :param y: y coordinates, (frames, players)
+    :param bins: number of cells along x and y
+    :param extent: ((x_min, x_max), (y_min, y_max)), positions outside are not counted
+    :return: (players, bins[0], bins[1]) int64 counts
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n_players = x.shape[1]
+    n_cells = n_players * bins[0] * bins[1]
+    flat = np.arange(n_players) * (bins[0] * bins[1])
+    valid = np.ones(x.shape, dtype=bool)
+    for values, n_bins, (low, high), step in zip((x, y), bins, extent, (bins[1], 1)):
+        index = _cell_index(values, n_bins, low, high)
+        valid &= (index >= 0) & (index < n_bins)
+        flat = flat + index * step
+    # positions outside the extent are counted in an extra cell that is dropped
+    flat = np.where(valid, flat, n_cells)
+    return np.bincount(flat.ravel(), minlength=n_cells + 1)[:n_cells].reshape(n_players, *bins)
+
+
+def _cell_index(values: np.ndarray, n_bins: int, low: float, high: float) -> np.ndarray:
+    # cell of every value between the edges np.linspace(low, high, n_bins + 1), -1 or n_bins outside of them
+    edges = np.linspace(low, high, n_bins + 1)
+    with np.errstate(invalid="ignore"):
+        index = np.floor((values - low) * (n_bins / (high - low)))
+    index = np.clip(np.nan_to_num(index, nan=-1), -1, n_bins).astype(np.intp)
+    # the scaled value can be one cell off the rounded edges, they decide like np.searchsorted does
+    padded_edges = np.concatenate([[-np.inf], edges, [np.inf]])
+    index -= values < padded_edges[index + 1]
+    index += values >= padded_edges[index + 2]
+    # the upper edge belongs to the last cell, as in np.histogram2d
+    index[values == high] = n_bins - 1
+    return index
+
+
+def cached_counts(x: np.ndarray, y: np.ndarray, bins: Tuple[int, int],
+                  extent: Tuple[Tuple[float, float], Tuple[float, float]], cache_dir: str = CACHE_DIR) -> np.ndarray:
+    """
+    bin_positions, loaded from cache_dir if the same positions were binned the same way before.
+    """
+    x, y = np.ascontiguousarray(x, dtype=float), np.ascontiguousarray(y, dtype=float)
+    key = hashlib.sha256()
+    for part in (x, y, np.array(x.shape), np.array(bins), np.array(extent, dtype=float)):
+        key.update(memoryview(part))
+    path = os.path.join(cache_dir, f"{key.hexdigest()}.npy")
+    if os.path.exists(path):
+        return np.load(path)
+    counts = bin_positions(x, y, bins, extent)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(path, counts)
+    return counts
+
+
+def probabilities(counts: np.ndarray) -> np.ndarray:
+    """
+    Counts normalized to a probability matrix per player.
+    """
+    return counts / counts.sum(axis=(1, 2), keepdims=True)
+
+
+def integral_images(counts: np.ndarray) -> np.ndarray:
+    """
+    (players, W + 1, H + 1) integral images, [p, i, j] is the sum of counts[p, :i, :j].
+    """
+    integral = np.zeros((counts.shape[0], counts.shape[1] + 1, counts.shape[2] + 1), dtype=counts.dtype)
+    np.cumsum(np.cumsum(counts, axis=1), axis=2, out=integral[:, 1:, 1:])
+    return integral
+
+
+def window_sums(counts: np.ndarray, window: Tuple[int, int], stride: Tuple[int, int]) -> np.ndarray:
+    """
+    Sums of the windows counts[p, i:i + window[0], j:j + window[1]] for i and j on the stride grid, windows
+    are cut at the border like numpy slices.
+
+    :return: (players, len(range(0, W, stride[0])), len(range(0, H, stride[1]))) sums
+    """
+    integral = integral_images(counts)
+    width, height = counts.shape[1:]
+    i0 = np.arange(0, width, stride[0])
+    j0 = np.arange(0, height, stride[1])
+    i1 = np.minimum(i0 + window[0], width)
+    j1 = np.minimum(j0 + window[1], height)
+    return (integral[:, i1[:, None], j1] - integral[:, i0[:, None], j1]
+            - integral[:, i1[:, None], j0] + integral[:, i0[:, None], j0])
+
+
+def best_windows(counts: np.ndarray, window: Tuple[int, int], stride: Tuple[int, int]) -> np.ndarray:
+    """
+    Start cell of the window with the most counts of every player, the first one in row-major order on ties.
+
+    :return: (players, 2) start cells
+    """
+    sums = window_sums(counts, window, stride)
+    best = sums.reshape(len(sums), -1).argmax(axis=1)
+    rows, cols = np.unravel_index(best, sums.shape[1:])
+    return np.stack([rows * stride[0], cols * stride[1]], axis=1)
+
+
+def peak_cells(counts: np.ndarray) -> np.ndarray:
+    """
+    (players, 2) cell with the most counts of every player, the first one in row-major order on ties.
+    """
+    best = counts.reshape(len(counts), -1).argmax(axis=1)
+    return np.stack(np.unravel_index(best, counts.shape[1:]), axis=1)
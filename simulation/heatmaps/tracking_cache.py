@@ -0,0 +1,143 @@
+"""
+Typed cache of the raw Metrica tracking data of the sample game.
+
+The raw CSVs of both teams are cleaned once (substitutes merged into the players they replaced, both teams
+joined, positions in grid units) and stored as an uncompressed Arrow IPC file with float32 positions. Loading
+memory-maps the file and indexes it by (Period, Frame). The SHA-256 of the raw files is kept in the file
+metadata and the cache is rebuilt when they change; the files are only hashed again when their size or
+modification time differs from the ones stored next to the hash.
+"""
+import hashlib
+import json
+import os
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+HEATMAPS_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_HOME = os.path.join(HEATMAPS_DIR, 'raw_data', 'Sample_Game_1_RawTrackingData_Home_Team.csv')
+RAW_AWAY = os.path.join(HEATMAPS_DIR, 'raw_data', 'Sample_Game_1_RawTrackingData_Away_Team.csv')
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(HEATMAPS_DIR)), 'cam_control', 'cache', 'tracking',
+                          'Sample_Game_1.arrow')
+
+COLUMN_LIST_AWAY = ['Period', 'Frame', 'Time [s]', 'Player25_x', 'Player25_y', 'Player15_x', 'Player15_y', 'Player16_x', 'Player16_y', 'Player17_x', 'Player17_y', \
+              'Player18_x', 'Player18_y', 'Player19_x', 'Player19_y', 'Player20_x', 'Player20_y', 'Player21_x', 'Player21_y', 'Player22_x', 'Player22_y', \
+              'Player23_x', 'Player23_y', 'Player24_x', 'Player24_y', 'Player26_x', 'Player26_y', 'Player27_x', 'Player27_y', 'Player28_x', 'Player28_y','Ball_x', 'Ball_y']
+COLUMN_LIST_HOME = ['Period', 'Frame', 'Time [s]', 'Player11_x', 'Player11_y', 'Player1_x', 'Player1_y', 'Player2_x', 'Player2_y', 'Player3_x', 'Player3_y', \
+              'Player4_x', 'Player4_y', 'Player5_x', 'Player5_y', 'Player6_x', 'Player6_y', 'Player7_x', 'Player7_y', 'Player8_x', 'Player8_y', \
+              'Player9_x', 'Player9_y', 'Player10_x', 'Player10_y', 'Player12_x', 'Player12_y', 'Player13_x', 'Player13_y', 'Player14_x', 'Player14_y', 'Ball_x', 'Ball_y']
+# substitute -> replaced player
+SUBSTITUTES_HOME = {'Player12': 'Player1', 'Player13': 'Player6', 'Player14': 'Player10'}
+SUBSTITUTES_AWAY = {'Player28': 'Player19', 'Player26': 'Player24', 'Player27': 'Player22'}
+POSITION_COLUMNS = [f"Player{i}_{j}" for i in range(1, 23) for j in ('x', 'y')] + ['Ball_x', 'Ball_y']
+
+
+def clean_tracking(raw_home: str = RAW_HOME, raw_away: str = RAW_AWAY) -> pd.DataFrame:
+    """
+    Clean the raw tracking data of both teams.
+
+    Assumption: the new, substitute players have the same positions as the players they replace.
+
+    :param raw_home: The raw tracking CSV of the home team.
+    :type raw_home: str
+    :param raw_away: The raw tracking CSV of the away team.
+    :type raw_away: str
+    :return: Period, Frame, Time [s] and the positions of players 1 to 22 and of the ball in grid units.
+    :rtype: pandas.DataFrame
+    """
+
+    # the first three lines are the team, jersey number and column headers
+    data_home = pd.read_csv(raw_home, skiprows=3, header=None, names=COLUMN_LIST_HOME)
+    data_away = pd.read_csv(raw_away, skiprows=3, header=None, names=COLUMN_LIST_AWAY)
+    for data_team, substitutes in ((data_home, SUBSTITUTES_HOME), (data_away, SUBSTITUTES_AWAY)):
+        for substitute, player in substitutes.items():
+            for axis in ('x', 'y'):
+                data_team[f'{player}_{axis}'] = data_team[f'{player}_{axis}'].combine_first(
+                    data_team[f'{substitute}_{axis}'])
+
+    data_home = data_home.drop([f'{substitute}_{axis}' for substitute in SUBSTITUTES_HOME for axis in ('x', 'y')]
+                               + ['Ball_x', 'Ball_y'], axis=1)
+    data_away = data_away.drop([f'{substitute}_{axis}' for substitute in SUBSTITUTES_AWAY for axis in ('x', 'y')],
+                               axis=1)
+    reorder_home = ['Player11_x', 'Player11_y']
+    reorder_away = ['Player25_x', 'Player25_y', 'Ball_x', 'Ball_y']
+    data_home = data_home[[col for col in data_home.columns if col not in reorder_home] + reorder_home]
+    data_away = data_away[[col for col in data_away.columns if col not in reorder_away] + reorder_away]
+
+    data_away.columns = ['Period', 'Frame', 'Time [s]'] + [f"Player{i}_{j}" for i in range(12, 23) for j in ('x', 'y')] + ['Ball_x', 'Ball_y']
+    data = data_home.merge(data_away, on=['Period', 'Frame', 'Time [s]'])
+
+    for column in POSITION_COLUMNS:
+        data[column] = pd.to_numeric(data[column], errors='coerce') * 100
+    return data[['Period', 'Frame', 'Time [s]'] + POSITION_COLUMNS]
+
+
+def source_stat(paths: Iterable[str]) -> str:
+    return json.dumps([[os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in paths])
+
+
+def source_hash(paths: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def build_cache(raw_home: str = RAW_HOME, raw_away: str = RAW_AWAY, cache_path: str = CACHE_PATH) -> None:
+    """
+    Clean the raw tracking data and store it typed: int32 Period and Frame, float64 time and float32 positions.
+    """
+
+    data = clean_tracking(raw_home, raw_away)
+    table = pa.table({
+        'Period': data['Period'].to_numpy(dtype=np.int32),
+        'Frame': data['Frame'].to_numpy(dtype=np.int32),
+        'Time [s]': data['Time [s]'].to_numpy(dtype=np.float64),
+        **{column: data[column].to_numpy(dtype=np.float32) for column in POSITION_COLUMNS},
+    }).replace_schema_metadata({'source_hash': source_hash([raw_home, raw_away]),
+                                'source_stat': source_stat([raw_home, raw_away])})
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # written next to the cache and renamed, so a reader never sees a partial file
+    with pa.OSFile(cache_path + '.tmp', 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(cache_path + '.tmp', cache_path)
+
+
+def load_tracking(raw_home: str = RAW_HOME, raw_away: str = RAW_AWAY, cache_path: str = CACHE_PATH) -> pd.DataFrame:
+    """
+    The cleaned tracking data indexed by (Period, Frame), built from the raw files if the cache is missing or
+    was built from other files.
+
+    :return: Time [s] and float32 positions of players 1 to 22 and of the ball, NaN where they are missing.
+    :rtype: pandas.DataFrame
+    """
+
+    if not _cache_is_valid(cache_path, [raw_home, raw_away]):
+        build_cache(raw_home, raw_away, cache_path)
+    # the columns of the memory-mapped table have no nulls, so they are not copied by to_pandas
+    table = pa.ipc.open_file(pa.memory_map(cache_path)).read_all()
+    index = _period_frame_index(table['Period'].to_numpy(), table['Frame'].to_numpy())
+    return table.drop_columns(['Period', 'Frame']).to_pandas(split_blocks=True).set_axis(index)
+
+
+def _cache_is_valid(cache_path: str, sources: List[str]) -> bool:
+    if not os.path.exists(cache_path):
+        return False
+    metadata = pa.ipc.open_file(pa.memory_map(cache_path)).schema.metadata or {}
+    if metadata.get(b'source_stat', b'').decode() == source_stat(sources):
+        return True
+    return metadata.get(b'source_hash', b'').decode() == source_hash(sources)
+
+
+def _period_frame_index(period: np.ndarray, frame: np.ndarray) -> pd.MultiIndex:
+    if len(frame) and np.all(np.diff(frame) > 0):
+        # frames are numbered through the whole game, the codes of sorted unique frames are their positions
+        periods, period_codes = np.unique(period, return_inverse=True)
+        return pd.MultiIndex(levels=[periods, frame], codes=[period_codes, np.arange(len(frame))],
+                             names=['Period', 'Frame'], verify_integrity=False)
+    return pd.MultiIndex.from_arrays([period, frame], names=['Period', 'Frame'])
@@ -0,0 +1,87 @@
+"""
+Pitch ownership: which player is first at every cell of the grid.
+
+All cell centres (x + 0.5, y + 0.5) are labelled at once with a broadcast argmin over a (players, cells) cost
+matrix. The cost is the distance to the player (Voronoi cells) or, with speeds, the time to reach the cell
+after the reaction time (pitch control). Rows are kept between updates and only the rows of the players that
+moved are recomputed. On equal costs the cell belongs to the first player, as with min() over the players.
+"""
+import numpy as np
+
+
+class PitchControl:
+    """
+    Args:
+        width (int): Number of cells along x.
+        height (int): Number of cells along y.
+        reaction_time (float): Seconds before a player starts running, only used with speeds, during it the
+            player keeps moving with the given velocity.
+    """
+
+    def __init__(self, width: int, height: int, reaction_time: float = 0.0):
+        xs, ys = np.meshgrid(np.arange(width) + 0.5, np.arange(height) + 0.5, indexing='ij')
+        self.centers_x = xs.ravel()
+        self.centers_y = ys.ravel()
+        self.shape = (width, height)
+        self.reaction_time = reaction_time
+        self.positions = None
+        self.speeds = None
+        self.costs = None
+        self.owners = None
+
+    def update(self, positions: np.ndarray, speeds: np.ndarray = None, velocities: np.ndarray = None) -> np.ndarray:
+        """
+        Args:
+            positions (np.ndarray): (players, 2) positions.
+            speeds (np.ndarray): (players,) top speeds in cells per second, None for Voronoi cells.
+            velocities (np.ndarray): (players, 2) current velocities, used with speeds and a reaction time.
+
+        Returns:
+            np.ndarray: (width, height) index of the player that owns every cell.
+        """
+        positions = np.array(positions, dtype=float)
+        if speeds is not None:
+            speeds = np.asarray(speeds, dtype=float)
+            if velocities is not None:
+                positions += self.reaction_time * np.asarray(velocities, dtype=float)
+
+        if (self.positions is None or positions.shape != self.positions.shape
+                or (speeds is None) != (self.speeds is None)):
+            moved = np.arange(len(positions))
+            self.costs = np.empty((len(positions), len(self.centers_x)))
+        else:
+            changed = np.any(positions != self.positions, axis=1)
+            if speeds is not None:
+                changed |= speeds != self.speeds
+            moved = np.flatnonzero(changed)
+
+        if len(moved) or self.owners is None:
+            self.costs[moved] = self._costs(positions[moved], None if speeds is None else speeds[moved])
+            self.owners = self.costs.argmin(axis=0).reshape(self.shape)
+        self.positions = positions
+        self.speeds = speeds
+        return self.owners
+
+    def player_areas(self) -> np.ndarray:
+        """
+        (players,) number of cells owned by every player.
+        """
+        return np.bincount(self.owners.ravel(), minlength=len(self.positions))
+
+    def team_areas(self, teams: np.ndarray) -> np.ndarray:
+        """
+        Number of cells owned by every team.
+
+        Args:
+            teams (np.ndarray): (players,) team index of every player.
+        """
+        teams = np.asarray(teams)
+        return np.bincount(teams[self.owners.ravel()], minlength=teams.max() + 1)
+
+    def _costs(self, positions: np.ndarray, speeds: np.ndarray) -> np.ndarray:
+        dx = positions[:, 0, None] - self.centers_x
+        dy = positions[:, 1, None] - self.centers_y
+        distances = np.sqrt(dx * dx + dy * dy)
+        if speeds is None:
+            return distances
+        return self.reaction_time + distances / speeds[:, None]
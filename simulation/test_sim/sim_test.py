@@ -6,6 +6,7 @@ import random
 from typing import Tuple, List
 from scipy.stats import truncnorm
 import time
+from pitch_control import PitchControl
 
 '''
 TODO: implement logic of self-confidence, when hitting; risk of the pass, look article
@@ -23,21 +24,32 @@ framerate = sim_config["framerate"]
 acc = sim_config["acceleration"]
 
 class Grid:
-    def __init__(self, width, height):
+    def __init__(self, width, height, time_to_reach=False):
         self.width = width
         self.height = height
-        self.cells = [[None for _ in range(height)] for _ in range(width)]
+        # with time_to_reach a cell belongs to the player that reaches it first at their speed
+        self.time_to_reach = time_to_reach
+        self.pitch_control = PitchControl(width, height)
+        self.players = []
+        self.owners = np.zeros((width, height), dtype=int)
+        self.areas = np.zeros(0, dtype=int)
+
+    @property
+    def cells(self):
+        return [[self.players[owner] for owner in column] for column in self.owners]
 
     def update_cells(self, teams):
-        for x in range(self.width):
-            for y in range(self.height):
-                cell_center_x = x + 0.5
-                cell_center_y = y + 0.5
-                closest_player = min(
-                    (player for team in teams for player in team.players),
-                    key=lambda player: np.linalg.norm(np.array(player.current_position) - np.array([cell_center_x, cell_center_y]) )
-                )
-                self.cells[x][y] = closest_player
+        self.players = [player for team in teams for player in team.players]
+        positions = [player.current_position for player in self.players]
+        speeds = [player.speed * framerate for player in self.players] if self.time_to_reach else None
+        self.owners = self.pitch_control.update(positions, speeds=speeds)
+        self.areas = self.pitch_control.player_areas()
+
+    def area_of(self, player):
+        for i, other in enumerate(self.players):
+            if other is player:
+                return int(self.areas[i])
+        return 0
         
 class Entity:
     def __init__(self, position, grid):
@@ -101,11 +113,7 @@ class Player(Entity):
         self.area = 0
 
     def calc_area(self):
-        self.area = sum(
-                cell is self
-                for row in self.grid.cells
-                for cell in row
-        )
+        self.area = self.grid.area_of(self)
         return self.area
 
 
@@ -418,7 +426,7 @@ class SoccerMatch:
     def simulate(self):
         data = []
         for i in range(framerate * sim_length_sec):
-            #self.grid.update_cells((self.team1, self.team2))
+            self.grid.update_cells((self.team1, self.team2))
             self.team1.update_mode(self.ball)
             self.team1.move(self.grid, self.ball)
             self.team2.update_mode(self.ball)
@@ -1,51 +1,103 @@
-import pandas as pd
-import matplotlib.animation as animation
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import yaml
+import argparse
+import os
+import sys
 import time
+from functools import partial
 
-INTERVAL = 1000/25
+import numpy as np
+import pandas as pd
+import yaml
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
-df = pd.read_csv('soccer_sim.csv')
+# the parallel MP4 writer lives in cam_control
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cam_control.video import render_parallel
 
 with open("simulation_config.yaml", "r") as config_file:
     sim_config = yaml.safe_load(config_file)
 
 grid_height = sim_config["height"]
 grid_width = sim_config["width"]
+framerate = sim_config["framerate"]
+
+
+def load_match(path: str):
+    """
+    Groups the rows of a simulated match by frame.
+
+    :return: frame numbers (frames,), player positions (frames, players, 2), team A mask (players,) and
+        ball positions (frames, 2)
+    """
+    df = pd.read_csv(path).sort_values(['Frame', 'Team', 'Player'], kind='stable')
+    frames = df['Frame'].unique()
+    n_players = len(df) // len(frames)
+    assert n_players * len(frames) == len(df), "every frame has to have the same players"
+
+    positions = df[['X', 'Y']].to_numpy().reshape(len(frames), n_players, 2)
+    team_a = df['Team'].to_numpy()[:n_players] == 'Team A'
+    ball = df[['Ball_x', 'Ball_y']].to_numpy()[::n_players]
+    return frames, positions, team_a, ball
+
+
+class MatchRenderer:
+    """
+    Draws the frames of a match on an offscreen figure.
 
-fig, ax = plt.subplots()
-ax.set_xlim([0, grid_width])
-ax.set_ylim([0, grid_height])
+    The axes, labels and legend are drawn once and cached, every frame only moves the persistent markers and
+    redraws them with the title over the cached background.
+    """
 
-scatters = [ax.scatter([], [], color=('red' if i < 11 else 'blue')) for i in range(0, 22)]
-ball_scatter = ax.scatter([], [], color='black')
+    def __init__(self, frames: np.ndarray, positions: np.ndarray, team_a: np.ndarray, ball: np.ndarray):
+        self.frames = frames
+        self.team1_positions = positions[:, team_a]
+        self.team2_positions = positions[:, ~team_a]
+        self.ball = ball
 
-def animate(frame_number: int):
-    ax.clear()
-    frame_data = df[df['Frame'] == frame_number]
+        self.fig = Figure()
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+        # marker-only lines draw much faster than scatter collections
+        self.team1, = self.ax.plot([], [], 'o', color='blue', label='Team 1', animated=True)
+        self.team2, = self.ax.plot([], [], 'o', color='red', label='Team 2', animated=True)
+        self.ball_marker, = self.ax.plot([], [], 'o', color='black', label='Ball', animated=True)
+        self.title = self.ax.set_title('', animated=True)
+        self.legend = self.ax.legend(loc='upper right')
+        self.ax.set_xlabel('X')
+        self.ax.set_ylabel('Y')
+        self.ax.set_xlim([0, grid_width])
+        self.ax.set_ylim([0, grid_height])
 
-    team1_data = frame_data[frame_data['Team'] == 'Team A']
-    ax.scatter(team1_data['X'], team1_data['Y'], color='blue', label='Team 1')
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.legend_region = self.fig.canvas.copy_from_bbox(self.legend.get_window_extent())
 
-    team2_data = frame_data[frame_data['Team'] == 'Team B']
-    ax.scatter(team2_data['X'], team2_data['Y'], color='red', label='Team 2')
+    def __call__(self, i: int) -> np.ndarray:
+        self.team1.set_data(self.team1_positions[i].T)
+        self.team2.set_data(self.team2_positions[i].T)
+        self.ball_marker.set_data(self.ball[i:i + 1].T)
+        self.title.set_text(f'Player positions in frame {self.frames[i]}')
 
-    ax.scatter(team2_data['Ball_x'].values[0], team2_data['Ball_y'].values[0], color='black', label='Ball')
-    ax.legend()
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        for artist in (self.team1, self.team2, self.ball_marker, self.title):
+            self.ax.draw_artist(artist)
+        # the legend stays on top of the players
+        canvas.restore_region(self.legend_region)
+        return np.asarray(canvas.buffer_rgba())[..., :3]
 
-    ax.set_xlabel('X')
-    ax.set_ylabel('Y')
-    ax.set_title(f'Player positions in frame {frame_number}')
 
-    ax.set_xlim([0, grid_width])
-    ax.set_ylim([0, grid_height])   
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export a simulated match to MP4")
+    parser.add_argument('input', nargs='?', default='soccer_sim.csv')
+    parser.add_argument('output', nargs='?', default='soccer_match_simulation.mp4')
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes, by default the number of CPUs")
+    args = parser.parse_args()
 
-start = time.time()
-ani = animation.FuncAnimation(fig, animate, frames=range(df['Frame'].min(), df['Frame'].max() + 1), interval=INTERVAL)
-ani.save('soccer_match_simulation.mp4', writer='ffmpeg')
-plt.close(fig)
-end = time.time()
+    start = time.time()
+    frames, positions, team_a, ball = load_match(args.input)
+    render_parallel(partial(MatchRenderer, frames, positions, team_a, ball), len(frames), args.output,
+                    fps=framerate, n_jobs=args.jobs)
+    end = time.time()
 
-print(f"Time taken to animate: {(end - start):.2f} seconds")
+    print(f"Time taken to animate: {(end - start):.2f} seconds")
@@ -0,0 +1,57 @@
+from time import sleep
+
+from loguru import logger
+
+# simulation extends sys.path for the strategy and detector modules, it has to be imported first
+from cam_control.simulation import CamSimulation
+from cam_control.controller import CameraController, ReplayTracker
+
+
+class SlowTracker(ReplayTracker):
+    def __init__(self, player_sim, delay: float):
+        super().__init__(player_sim)
+        self.delay = delay
+
+    def read(self, tick: int):
+        sleep(self.delay)
+        return super().read(tick)
+
+
+def _controller(**kwargs) -> CameraController:
+    logger.remove()
+    return CameraController.from_simulation(CamSimulation(plot=False, dataset="mock"), **kwargs)
+
+
+def test_controller_keeps_its_deadlines():
+    controller = _controller(framerate=10)
+    first_pose = controller.camera.pose()
+    controller.run(n_ticks=5)
+
+    assert controller.tick == 5
+    assert controller.deadline_misses == 0
+    assert controller.skipped_plans == 0
+    assert controller.camera.pose() != first_pose
+
+
+def test_controller_counts_deadline_misses_and_skips_slots():
+    controller = _controller(framerate=100)
+    controller.tracker = SlowTracker(controller.tracker.player_sim, delay=0.025)
+    controller.run(n_ticks=10)
+
+    # every tick that ran took longer than its slot
+    ran_ticks = controller.tick - controller.skipped_ticks
+    assert controller.skipped_ticks > 0
+    assert controller.deadline_misses == ran_ticks
+    assert controller.stage_overruns["tracker"] == ran_ticks
+
+
+def test_controller_reuses_the_last_pose_without_time_to_plan():
+    # the planning budget alone is longer than the tick period
+    controller = _controller(budget_shares={"plan": 1.5})
+    first_pose = controller.camera.pose()
+    for _ in range(5):
+        assert not controller.step()
+
+    assert controller.skipped_plans == 5
+    assert controller.camera.pose() == first_pose
+    assert controller.solver.visited_agents.sum() == 0
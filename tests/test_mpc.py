@@ -0,0 +1,28 @@
+from loguru import logger
+
+# simulation extends sys.path for the strategy and detector modules, it has to be imported first
+from cam_control.simulation import CamSimulation
+
+
+def _simulation(**kwargs) -> CamSimulation:
+    logger.remove()
+    return CamSimulation(plot=False, dataset="mock", strategy="mpc", max_ticks=5, **kwargs)
+
+
+def test_mpc_commands_the_zoom_in_fov_mode():
+    sim = _simulation(visit_mode="fov")
+    sim.simulate()
+
+    # the strategy plans from the zoom the camera reached after its last command
+    assert sim.strategy.zoom_command is not None
+    assert sim.strategy.zoom != 1.0
+    min_zoom, max_zoom = sim.strategy.zoom_range
+    assert min_zoom <= sim.strategy.zoom_command <= max_zoom
+
+
+def test_mpc_holds_the_zoom_in_aim_mode():
+    sim = _simulation(visit_mode="aim")
+    sim.simulate()
+
+    assert sim.strategy.zoom_command is None
+    assert sim.strategy.zoom == 1.0
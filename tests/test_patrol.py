@@ -0,0 +1,27 @@
+import numpy as np
+
+from cam_control.tsp_solver.patrol import PatrolSolver
+
+AGENTS = np.array([[0.0, 0.0], [100.0, 0.0]])
+BALL = (0.0, 0.0)
+
+
+def _first_tick_targeting_far_player(solver: PatrolSolver, n_ticks: int) -> int:
+    # the player at the ball is seen every 10 ticks, the far one never
+    for tick in range(1, n_ticks + 1):
+        target = solver.determine_next_position((0.0, 0.0), AGENTS, inside_fov=np.array([tick % 10 == 0, False]),
+                                                ball=BALL)
+        if tuple(target) == tuple(AGENTS[1]):
+            return tick
+    return -1
+
+
+def test_far_player_overtakes_the_ball():
+    solver = PatrolSolver(n_observed_agents=2, eps=2, visit_mode="fov", ball_weight=1.0)
+    # the weight at the ball is at most 2, the far player wins once it is twice as stale
+    assert 0 < _first_tick_targeting_far_player(solver, 100) <= 21
+
+
+def test_overdue_player_is_targeted_whatever_the_ball_weight():
+    solver = PatrolSolver(n_observed_agents=2, eps=2, visit_mode="fov", ball_weight=1e6, max_staleness=50)
+    assert _first_tick_targeting_far_player(solver, 100) == 49
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from cam_control.tsp_solver.neighbor import NeighborSolver
+from cam_control.tsp_solver.patrol import PatrolSolver
+
+AGENTS = np.array([[0.0, 0.0], [5.0, 0.0], [50.0, 0.0]])
+
+
+@pytest.mark.parametrize("solver", [NeighborSolver(n_observed_agents=3, eps=2, visit_mode="fov"),
+                                    PatrolSolver(n_observed_agents=3, eps=2, visit_mode="fov")])
+def test_hidden_agents_are_not_visited_and_masks_are_kept(solver):
+    inside_fov = np.array([True, True, False])
+    hidden = np.array([False, True, False])
+    solver.determine_next_position((0.0, 0.0), AGENTS, hidden=hidden, inside_fov=inside_fov)
+
+    assert solver.visited_agents.tolist() == [1, 0, 0]
+    assert inside_fov.tolist() == [True, True, False]
+    assert hidden.tolist() == [False, True, False]
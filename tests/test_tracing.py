@@ -0,0 +1,23 @@
+from loguru import logger
+
+# simulation extends sys.path for the strategy and detector modules, it has to be imported first
+from cam_control.simulation import CamSimulation
+
+
+def test_traced_players_inside_fov_match_the_detector():
+    logger.remove()
+    sim = CamSimulation(plot=False, dataset="mock", visit_mode="fov", max_ticks=50, trace="tick")
+    detect = sim.player_detector.which_players_inside_fov
+    detected = []
+
+    def which_players_inside_fov(*args, **kwargs):
+        players_inside_fov = detect(*args, **kwargs)
+        detected.append(len(players_inside_fov[0]))
+        return players_inside_fov
+
+    sim.player_detector.which_players_inside_fov = which_players_inside_fov
+    sim.simulate()
+
+    traced = sim.tracer.to_frame()["n_inside_fov"].tolist()
+    assert traced == detected
+    assert len(set(traced)) > 1
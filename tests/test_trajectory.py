@@ -0,0 +1,24 @@
+from loguru import logger
+
+# simulation extends sys.path for the strategy and detector modules, it has to be imported first
+from cam_control.simulation import CamSimulation
+
+
+def test_trajectory_advances_past_first_waypoint():
+    logger.remove()
+    sim = CamSimulation(plot=False, strategy="trajectory", dataset="mock", max_ticks=300)
+    sim.log_angles = sim.log_players = False
+    move = sim.strategy.move
+    steps = []
+
+    def recording_move(*args, **kwargs):
+        delta = move(*args, **kwargs)
+        steps.append(sim.strategy.step)
+        return delta
+
+    sim.strategy.move = recording_move
+    sim.simulate()
+
+    assert steps[0] == 0
+    assert max(steps) >= 3
+    assert sim.staleness_metric.summary()["mean_coverage"] > 0